@@ -0,0 +1,200 @@
+"""
+ApiProviders - Adaptadores paginados para las APIs gratuitas de velas.
+
+Cada adaptador declara cuántas velas devuelve como máximo por llamada, cómo
+avanza su cursor (startTime / since / toTs), su mapeo de intervalos y hasta
+dónde llega su histórico. fetch_range() recorre cualquier rango pedido con el
+mínimo de llamadas HTTP necesarias para devolverlo completo.
+"""
+import math
+import time
+
+import pandas as pd
+
+from RateLimiter import http
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+INTERVAL_SECONDS = {'HOUR': 3600, 'MINUTE': 60}
+
+
+def epoch_seconds(ts):
+    """Segundos epoch de un datetime/Timestamp tz-aware."""
+    return int(pd.Timestamp(ts).timestamp())
+
+
+class ProviderAdapter:
+    """
+    Adaptador base. Las subclases definen la petición de una página y
+    fetch_range() encadena páginas hasta cubrir el rango.
+
+    fetch_range() retorna:
+    - DataFrame OHLCV (índice Datetime UTC) con las velas del rango
+    - DataFrame vacío si la API respondió sin velas
+    - None si alguna petición falló (el rango quedaría incompleto)
+    """
+    name = None
+    symbol = None           # Par tal como lo nombra la API
+    url = None
+    max_candles = None      # Velas máximas por llamada
+    cursor = None           # Parámetro de paginación de la API
+    intervals = {}          # Intervalo lógico (HOUR/MINUTE) → valor de la API
+    max_lookback = {}       # Intervalo lógico → velas hacia atrás disponibles (None = sin límite)
+    request_weight = 1      # Peso de cada llamada en el token bucket del host
+    timeout = 15
+
+    def supports(self, interval):
+        return interval in self.intervals
+
+    def can_serve(self, start, end, interval):
+        """True si la API puede devolver el rango completo (intervalo y profundidad de histórico)."""
+        if not self.supports(interval):
+            return False
+        lookback = self.max_lookback.get(interval)
+        if lookback is None:
+            return True
+        oldest = time.time() - lookback * INTERVAL_SECONDS[interval]
+        return epoch_seconds(start) >= oldest
+
+    def calls_needed(self, start, end, interval):
+        """Número mínimo de llamadas para cubrir el rango."""
+        candles = (epoch_seconds(end) - epoch_seconds(start)) // INTERVAL_SECONDS[interval] + 1
+        return max(1, math.ceil(candles / self.max_candles))
+
+    def _get(self, params, url=None):
+        """GET JSON; retorna None si la respuesta no es 200."""
+        response = http.get(url or self.url, params=params, timeout=self.timeout, weight=self.request_weight)
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+    def fetch_range(self, start, end, interval):
+        raise NotImplementedError
+
+    @staticmethod
+    def _to_frame(rows, start, end):
+        """rows: lista de [epoch_s, open, high, low, close, volume]"""
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=['timestamp'] + OHLCV)
+        df['Datetime'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
+        df = df[['Datetime'] + OHLCV]
+        df[OHLCV] = df[OHLCV].astype(float)
+        df = df[(df['Datetime'] >= start) & (df['Datetime'] <= end)]
+        df.set_index('Datetime', inplace=True)
+        df.sort_index(inplace=True)
+        return df[~df.index.duplicated(keep='last')]
+
+
+class BinanceAdapter(ProviderAdapter):
+    """Binance Spot: cursor hacia adelante con startTime (ms), 1000 velas por llamada."""
+    name = 'binance'
+    symbol = 'ETHUSDT'
+    url = "https://api.binance.com/api/v3/klines"
+    max_candles = 1000
+    cursor = 'startTime'
+    intervals = {'HOUR': '1h', 'MINUTE': '1m'}
+    request_weight = 2
+
+    def fetch_range(self, start, end, interval):
+        step_ms = INTERVAL_SECONDS[interval] * 1000
+        cursor = epoch_seconds(start) * 1000
+        end_ms = epoch_seconds(end) * 1000
+        rows = []
+        while cursor <= end_ms:
+            page = self._get({
+                'symbol': self.symbol,
+                'interval': self.intervals[interval],
+                'startTime': cursor,
+                'endTime': end_ms,
+                'limit': self.max_candles,
+            })
+            if page is None:
+                return None
+            if not page:
+                break
+            rows.extend([k[0] // 1000, k[1], k[2], k[3], k[4], k[5]] for k in page)
+            if len(page) < self.max_candles:
+                break
+            cursor = page[-1][0] + step_ms
+        return self._to_frame(rows, start, end)
+
+
+class KrakenAdapter(ProviderAdapter):
+    """
+    Kraken: cursor hacia adelante con since (s) y el campo 'last' de la respuesta.
+    Sólo sirve las 720 velas más recientes de cada intervalo.
+    """
+    name = 'kraken'
+    symbol = 'ETHUSD'
+    url = "https://api.kraken.com/0/public/OHLC"
+    max_candles = 720
+    cursor = 'since'
+    intervals = {'HOUR': 60, 'MINUTE': 1}
+    max_lookback = {'HOUR': 720, 'MINUTE': 720}
+
+    def fetch_range(self, start, end, interval):
+        end_s = epoch_seconds(end)
+        since = epoch_seconds(start) - 1  # Kraken devuelve velas posteriores a since
+        rows = []
+        for _ in range(self.calls_needed(start, end, interval) + 1):
+            data = self._get({'pair': self.symbol, 'interval': self.intervals[interval], 'since': since})
+            if data is None or data.get('error'):
+                return None
+            result = data.get('result', {})
+            pair_key = next(iter([k for k in result.keys() if 'ETH' in k]), None)
+            if not pair_key:
+                return None
+            page = result[pair_key]
+            if not page:
+                break
+            # Columnas Kraken: time, open, high, low, close, vwap, volume, count
+            rows.extend([int(k[0]), k[1], k[2], k[3], k[4], k[6]] for k in page)
+            last = result.get('last')
+            if int(page[-1][0]) >= end_s or last is None or int(last) <= since:
+                break
+            since = int(last)
+        return self._to_frame(rows, start, end)
+
+
+class CryptoCompareAdapter(ProviderAdapter):
+    """CryptoCompare: cursor hacia atrás con toTs (s), 2000 velas por llamada."""
+    name = 'cryptocompare'
+    symbol = 'ETH/USD'
+    max_candles = 2000
+    cursor = 'toTs'
+    intervals = {
+        'HOUR': "https://min-api.cryptocompare.com/data/v2/histohour",
+        'MINUTE': "https://min-api.cryptocompare.com/data/v2/histominute",
+    }
+    max_lookback = {'MINUTE': 7 * 24 * 60}  # histominute gratuito: 7 días
+
+    def fetch_range(self, start, end, interval):
+        url = self.intervals[interval]
+        fsym, tsym = self.symbol.split('/')
+        step = INTERVAL_SECONDS[interval]
+        start_s = epoch_seconds(start)
+        to_ts = epoch_seconds(end)
+        rows = []
+        while to_ts >= start_s:
+            # Pedir sólo las velas que faltan (la API devuelve limit + 1)
+            limit = min(self.max_candles, max(1, (to_ts - start_s) // step))
+            data = self._get({'fsym': fsym, 'tsym': tsym, 'limit': limit, 'toTs': to_ts}, url)
+            if data is None or data.get('Response') != 'Success':
+                return None
+            page = data['Data']['Data']
+            if not page:
+                break
+            rows.extend([c['time'], c['open'], c['high'], c['low'], c['close'], c['volumefrom']] for c in page)
+            earliest = page[0]['time']
+            if earliest <= start_s or earliest >= to_ts:
+                break
+            to_ts = earliest - step
+        return self._to_frame(rows, start, end)
+
+
+# Registro de adaptadores (orden por defecto del router)
+PROVIDERS = {
+    'binance': BinanceAdapter(),
+    'kraken': KrakenAdapter(),
+    'cryptocompare': CryptoCompareAdapter(),
+}
@@ -0,0 +1,102 @@
+"""
+CandleSchema - Esquema de tipos compacto para los DataFrames de velas e indicadores.
+
+Se aplica una vez al entrar los datos al almacén (DataEth.prepare_for_export,
+DataLoader.save_to_parquet, JSON legacy) y se conserva en Parquet y en la
+caché compartida, así que todas las copias posteriores del pipeline son más
+pequeñas:
+
+    precios, EMAs, MACD, ATR, OBV     float64 (escala de precio/volumen acumulado)
+    osciladores y ratios              float32 (RSI 0-100, ADX, STOCH, ratios...)
+    OBV_Trend                         int8 (-1, 0, 1)
+    Market_Regime                     category (TRENDING / RANGING / CHOPPY)
+    índice Datetime                   datetime64[ns, UTC] (epoch int64)
+
+memory_report guarda por nombre de frame el tamaño antes/después.
+"""
+import numpy as np
+import pandas as pd
+
+# float32: ~7 cifras significativas, de sobra para osciladores acotados y ratios
+FLOAT32_COLUMNS = (
+    'RSI', 'RSI_5', 'RSI_7', 'STOCH', 'ADX', 'BB_width', 'ATR_Pct',
+    'VolumeChange', 'Volume_Ratio', 'log_return', 'Dist_Support_Pct', 'Dist_Resistance_Pct',
+)
+INT8_COLUMNS = ('OBV_Trend',)
+REGIMES = ('TRENDING', 'RANGING', 'CHOPPY')
+CATEGORY_COLUMNS = {'Market_Regime': REGIMES}
+
+memory_report = {}   # nombre -> {'rows', 'before_mb', 'after_mb', 'saved_pct'}
+
+
+def frame_bytes(df):
+    """Memoria real del DataFrame (incluye strings e índice)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def _category_dtype(series, categories):
+    if isinstance(series.dtype, pd.CategoricalDtype) and list(series.dtype.categories) == list(categories):
+        return series.dtype
+    extra = sorted(set(series.dropna().astype(str).unique()) - set(categories))
+    return pd.CategoricalDtype(list(categories) + extra)   # Valores inesperados no se pierden
+
+
+def _target_dtype(col, series):
+    if col in FLOAT32_COLUMNS and pd.api.types.is_numeric_dtype(series.dtype):
+        return np.dtype(np.float32)
+    if col in INT8_COLUMNS and pd.api.types.is_numeric_dtype(series.dtype):
+        return np.dtype(np.int8) if series.notna().all() else np.dtype(np.float32)
+    if col in CATEGORY_COLUMNS:
+        return _category_dtype(series, CATEGORY_COLUMNS[col])
+    return None
+
+
+def apply_schema(df, name=None):
+    """
+    DataFrame con los tipos compactos (sin cambios si ya los tiene).
+    Con name registra la reducción en memory_report y la imprime.
+    """
+    if df is None or df.empty:
+        return df
+    before = frame_bytes(df) if name else None
+
+    changes = {}
+    for col in df.columns:
+        target = _target_dtype(col, df[col])
+        if target is not None and df[col].dtype != target:
+            changes[col] = target
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+        index = index.as_unit('ns')
+
+    if changes or not index.equals(df.index) or index.dtype != df.index.dtype:
+        df = df.copy(deep=False)
+        for col, target in changes.items():
+            if isinstance(target, pd.CategoricalDtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object).where(df[col].notna(), None).astype(target)
+            else:
+                df[col] = df[col].astype(target)
+        df.index = index
+
+    if name:
+        after = frame_bytes(df)
+        memory_report[name] = {
+            'rows': len(df),
+            'before_mb': round(before / 1024 / 1024, 2),
+            'after_mb': round(after / 1024 / 1024, 2),
+            'saved_pct': round(100 * (1 - after / before), 1) if before else 0.0,
+        }
+        r = memory_report[name]
+        print(f"[INFO] 🗜️ Esquema compacto {name}: {r['before_mb']} MB → {r['after_mb']} MB "
+              f"({-r['saved_pct']:+}%, {r['rows']} filas)")
+    return df
+
+
+def json_default(obj):
+    """default= para json.dump: escalares NumPy (float32/int8) y Timestamps."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,486 @@
+"""
+CandleStore - Almacén Parquet particionado por tiempo para las velas HTF/LTF.
+
+Cada dataset es un directorio con una partición por mes (HTF) o por día (LTF)
+y un manifest.json pequeño:
+
+    Reports/candles/htf/2025-01.parquet
+    Reports/candles/htf/manifest.json
+
+El manifiesto guarda por partición filas, primera/última vela, tamaño y CRC32
+del archivo; y a nivel de dataset el esquema (dtypes), la versión de
+indicadores y los totales (filas, límites, bytes). summary() responde
+estadísticas y frescura sin abrir ningún Parquet.
+
+Una actualización rutinaria sólo reescribe la partición abierta (la última) y
+las nuevas; las particiones anteriores se consideran selladas y no se tocan
+salvo que reciban velas que no tenían (relleno de huecos). La retención borra
+particiones completas que quedan fuera de la ventana.
+
+Escrituras atómicas (archivo temporal + os.replace) tanto de particiones como
+del manifiesto, así que un lector nunca ve un archivo a medio escribir. Los
+escritores de un mismo dataset (hilo HTF, tarea de 30 min, prepare_for_export,
+StoreMaintenance) se serializan con un lock por directorio: threading en el
+proceso y flock sobre <root>/.lock entre procesos; los temporales llevan pid e
+hilo en el nombre.
+
+Las particiones se escriben en grupos de filas pequeños: read() empuja el rango
+al lector Parquet (filtros sobre el índice) y tail() abre sólo los últimos
+grupos de filas de las últimas particiones, con las columnas pedidas.
+"""
+import json
+import os
+import threading
+import zlib
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:      # Windows: sólo el lock entre hilos del proceso
+    fcntl = None
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.lock'
+PARTITIONS = {
+    'month': {'freq': 'MS', 'fmt': '%Y-%m'},
+    'day': {'freq': 'D', 'fmt': '%Y-%m-%d'},
+}
+MANIFEST_FORMAT = 2
+ROW_GROUP_ROWS = 240   # 10 días HTF / 4 horas LTF por grupo de filas
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """CRC32 (hex) del archivo, leído por bloques."""
+    crc = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            crc = zlib.crc32(block, crc)
+    return f"{crc:08x}"
+
+
+def _utc_index(df):
+    index = df.index
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.to_datetime(index, utc=True)
+    elif index.tz is None:
+        index = index.tz_localize('UTC')
+    else:
+        index = index.tz_convert('UTC')
+    return index
+
+
+class _RootLock:
+    """Lock de escritura de un dataset: reentrante en el hilo, exclusivo entre hilos y procesos."""
+    def __init__(self, root):
+        self.path = os.path.join(root, LOCK_NAME)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, 'a')
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+        return False
+
+
+_root_locks = {}
+_root_locks_guard = threading.Lock()
+
+
+def root_lock(root):
+    """Lock único por directorio de dataset (compartido por todas las instancias del proceso)."""
+    root = os.path.abspath(root)
+    with _root_locks_guard:
+        if root not in _root_locks:
+            _root_locks[root] = _RootLock(root)
+        return _root_locks[root]
+
+
+def _tmp_name(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _schema(df):
+    """{columna: dtype} tal como se escribe en Parquet."""
+    return {str(c): str(dtype) for c, dtype in df.dtypes.items()}
+
+
+class CandleStore:
+    """Dataset Parquet particionado (mes o día) con manifiesto."""
+
+    def __init__(self, root, partition='month', compression='snappy', indicator_version=None):
+        if partition not in PARTITIONS:
+            raise ValueError(f"Partición desconocida: {partition}")
+        self.root = root
+        self.partition = partition
+        self.compression = compression
+        self.indicator_version = indicator_version   # Se registra en el manifiesto en cada escritura
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self._lock = root_lock(root)   # Mismo lock para todos los CandleStore del directorio
+        self.stats = {'partitions': 0, 'row_groups': 0, 'rows': 0}   # E/S de las lecturas parciales
+
+    def lock(self):
+        """Lock de escritura del dataset (with store.lock(): ...), reentrante."""
+        return self._lock
+
+    # ---------------------------------------------------------------- manifiesto
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def load_manifest(self):
+        """Manifiesto actual (dict vacío de particiones si no existe o está corrupto)."""
+        empty = {'version': 0, 'partitioning': self.partition, 'columns': None,
+                 'window_start': None, 'updated': None, 'partitions': {}}
+        if not self.exists():
+            return empty
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"[WARNING] Manifiesto ilegible {self.manifest_path}: {e}")
+            return empty
+        manifest.setdefault('partitions', {})
+        return manifest
+
+    def _save_manifest(self, manifest):
+        manifest['version'] = manifest.get('version', 0) + 1
+        manifest['updated'] = datetime.now(timezone.utc).isoformat()
+        tmp_path = _tmp_name(self.manifest_path)
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    # ---------------------------------------------------------------- particiones
+    def _slices(self, index):
+        """[(nombre, lo, hi)] de las particiones que cubren un índice UTC ordenado."""
+        spec = PARTITIONS[self.partition]
+        first = index[0].tz_convert(None).normalize()
+        if self.partition == 'month':
+            first = first.replace(day=1)
+        starts = pd.date_range(first, index[-1].tz_convert(None), freq=spec['freq'], tz='UTC')
+        bounds = index.searchsorted(starts).tolist() + [len(index)]
+        return [(starts[i].strftime(spec['fmt']), bounds[i], bounds[i + 1])
+                for i in range(len(starts)) if bounds[i + 1] > bounds[i]]
+
+    def _path(self, name):
+        return os.path.join(self.root, f"{name}.parquet")
+
+    def _write_partition(self, name, frame):
+        path = self._path(name)
+        tmp_path = _tmp_name(path)
+        frame.to_parquet(tmp_path, compression=self.compression, index=True, row_group_size=ROW_GROUP_ROWS)
+        checksum = file_checksum(tmp_path)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        return {'file': os.path.basename(path), 'rows': len(frame),
+                'first': frame.index[0].isoformat(), 'last': frame.index[-1].isoformat(),
+                'bytes': size, 'checksum': checksum}
+
+    def _drop_partition(self, name, meta):
+        try:
+            os.remove(os.path.join(self.root, meta.get('file', f"{name}.parquet")))
+        except FileNotFoundError:
+            pass
+
+    # ---------------------------------------------------------------- escritura
+    def write(self, df, rewrite=False):
+        """
+        Persiste df (ventana completa, ordenada) en el dataset.
+        Sin rewrite sólo escribe particiones nuevas, la abierta y las selladas que
+        ganaron velas; con rewrite (o si cambian las columnas) reescribe todas.
+        Retorna los nombres de las particiones escritas.
+        """
+        if df is None or df.empty:
+            return []
+        df = df[~df.index.duplicated(keep='last')]
+        df.index = _utc_index(df)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            manifest = self.load_manifest()
+            stored = manifest['partitions']
+            schema = _schema(df)
+            if manifest.get('columns') != list(schema) or manifest.get('schema', schema) != schema:
+                rewrite = True   # Esquema nuevo: todas las particiones deben compartirlo
+            open_name = max(stored) if stored else None
+
+            written = []
+            for name, lo, hi in self._slices(df.index):
+                meta = stored.get(name)
+                if not rewrite and meta is not None and name < open_name and hi - lo <= meta['rows']:
+                    continue   # Partición sellada sin velas nuevas
+                stored[name] = self._write_partition(name, df.iloc[lo:hi])
+                written.append(name)
+
+            if rewrite:
+                for name in [n for n in stored if n not in written]:
+                    self._drop_partition(name, stored.pop(name))
+            self._commit(manifest, df.index[0], schema, df.index.name)
+        return written
+
+    def append(self, df, keep_from=None):
+        """
+        Añade/actualiza velas sueltas fusionándolas con sus particiones (gana df).
+        keep_from (opcional) mueve el inicio de la ventana; si no, se conserva el actual.
+        """
+        if df is None or df.empty:
+            return []
+        df = df[~df.index.duplicated(keep='last')]
+        df.index = _utc_index(df)
+        df = df.sort_index()
+
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            manifest = self.load_manifest()
+            stored = manifest['partitions']
+            written = []
+            for name, lo, hi in self._slices(df.index):
+                part = df.iloc[lo:hi]
+                meta = stored.get(name)
+                if meta is not None:
+                    existing = pd.read_parquet(os.path.join(self.root, meta['file']))
+                    existing.index = _utc_index(existing)
+                    part = pd.concat([existing, part])
+                    part = part[~part.index.duplicated(keep='last')].sort_index()
+                stored[name] = self._write_partition(name, part)
+                written.append(name)
+
+            if keep_from is not None:
+                window_start = pd.Timestamp(keep_from)
+                window_start = window_start.tz_localize('UTC') if window_start.tz is None else window_start
+            elif manifest.get('window_start'):
+                window_start = pd.Timestamp(manifest['window_start'])
+            else:
+                window_start = df.index[0]
+            self._commit(manifest, window_start, manifest.get('schema') or _schema(df), df.index.name)
+        return written
+
+    def replace_partition(self, name, frame, expected_checksum=None):
+        """
+        Reescribe una partición existente con `frame` (mantenimiento: dedupe/orden/compactación).
+        Si expected_checksum no coincide con el manifiesto actual (otro proceso la
+        reescribió mientras tanto) no toca nada y retorna False. Comprobación,
+        escritura y manifiesto van bajo el lock del dataset (también entre procesos).
+        """
+        with self._lock:
+            manifest = self.load_manifest()
+            meta = manifest['partitions'].get(name)
+            if meta is None or (expected_checksum is not None and meta.get('checksum') != expected_checksum):
+                return False
+            if frame.empty:
+                self._drop_partition(name, manifest['partitions'].pop(name))
+            else:
+                manifest['partitions'][name] = self._write_partition(name, frame)
+            window_start = manifest.get('window_start')
+            window_start = pd.Timestamp(window_start) if window_start else frame.index[0]
+            self._commit(manifest, window_start, manifest.get('schema') or _schema(frame),
+                         manifest.get('index_name') or frame.index.name)
+        return True
+
+    def _commit(self, manifest, window_start, schema, index_name=None):
+        """Retención por particiones completas, totales y escritura del manifiesto."""
+        stored = manifest['partitions']
+        for name in sorted(stored):
+            if pd.Timestamp(stored[name]['last']) < window_start:
+                self._drop_partition(name, stored.pop(name))
+        manifest['format'] = MANIFEST_FORMAT
+        manifest['columns'] = list(schema)
+        manifest['schema'] = schema
+        if self.indicator_version is not None:
+            manifest['indicator_version'] = self.indicator_version
+        names = sorted(stored)
+        manifest['rows'] = sum(stored[n]['rows'] for n in names)
+        manifest['bytes'] = sum(stored[n].get('bytes', 0) for n in names)
+        manifest['first'] = max(stored[names[0]]['first'], window_start.isoformat()) if names else None
+        manifest['last'] = stored[names[-1]]['last'] if names else None
+        if index_name:
+            manifest['index_name'] = index_name   # Columna del índice en Parquet (filtros de rango)
+        manifest['partitioning'] = self.partition
+        manifest['window_start'] = window_start.isoformat()
+        self._save_manifest(manifest)
+
+    def summary(self, now=None):
+        """
+        Estadísticas del dataset leídas sólo del manifiesto (sin abrir Parquet):
+        filas, primera/última vela, antigüedad de la última, tamaño, versión.
+        """
+        if not self.exists():
+            return {'exists': False}
+        manifest = self.load_manifest()
+        partitions = manifest['partitions']
+        names = sorted(partitions)
+        last = manifest.get('last') or (partitions[names[-1]]['last'] if names else None)
+        age = None
+        if last:
+            now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+            age = round((now - pd.Timestamp(last)).total_seconds() / 60, 1)
+        return {
+            'exists': True,
+            'version': manifest.get('version'),
+            'updated': manifest.get('updated'),
+            'rows': manifest.get('rows', sum(p['rows'] for p in partitions.values())),
+            'oldest': manifest.get('first') or (partitions[names[0]]['first'] if names else None),
+            'newest': last,
+            'age_minutes': age,
+            'partitions': len(names),
+            'size_mb': round(manifest.get('bytes', 0) / 1024 / 1024, 2),
+            'columns': len(manifest.get('columns') or []),
+            'indicator_version': manifest.get('indicator_version'),
+        }
+
+    # ---------------------------------------------------------------- lectura
+    def _selected(self, manifest, start, end):
+        names = []
+        for name in sorted(manifest['partitions']):
+            meta = manifest['partitions'][name]
+            if start is not None and pd.Timestamp(meta['last']) < start:
+                continue
+            if end is not None and pd.Timestamp(meta['first']) > end:
+                continue
+            names.append((name, meta))
+        return names
+
+    def _read_partition(self, manifest, meta, columns=None, start=None, end=None):
+        """Una partición; si el rango la corta, el filtro llega al lector y salta grupos de filas."""
+        filters = []
+        index_name = manifest.get('index_name')
+        if index_name:
+            if start is not None and pd.Timestamp(meta['first']) < start:
+                filters.append((index_name, '>=', start))
+            if end is not None and pd.Timestamp(meta['last']) > end:
+                filters.append((index_name, '<=', end))
+        frame = pd.read_parquet(os.path.join(self.root, meta['file']), columns=columns, filters=filters or None)
+        self.stats['partitions'] += 1
+        self.stats['rows'] += len(frame)
+        return frame
+
+    def _read_partition_tail(self, meta, n, columns=None):
+        """Últimas n filas de una partición leyendo sólo sus últimos grupos de filas."""
+        path = os.path.join(self.root, meta['file'])
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            frame = pd.read_parquet(path, columns=columns)
+        else:
+            parquet = pq.ParquetFile(path)
+            groups, rows = [], 0
+            for i in reversed(range(parquet.metadata.num_row_groups)):
+                groups.insert(0, i)
+                rows += parquet.metadata.row_group(i).num_rows
+                if rows >= n:
+                    break
+            frame = parquet.read_row_groups(groups, columns=columns, use_pandas_metadata=True).to_pandas()
+            self.stats['row_groups'] += len(groups)
+        self.stats['partitions'] += 1
+        self.stats['rows'] += len(frame)
+        return frame.iloc[-n:]
+
+    def _window(self, manifest, start=None, end=None):
+        """(inicio, fin) UTC efectivos: el inicio nunca antes de window_start."""
+        window_start = manifest.get('window_start')
+        lo = pd.Timestamp(window_start) if window_start else None
+        if start is not None:
+            start = pd.Timestamp(start)
+            start = start.tz_localize('UTC') if start.tz is None else start
+            lo = start if lo is None else max(lo, start)
+        if end is not None:
+            end = pd.Timestamp(end)
+            end = end.tz_localize('UTC') if end.tz is None else end
+        return lo, end
+
+    @staticmethod
+    def _finish(frames, lo, end):
+        if not frames:
+            return pd.DataFrame()
+        data = pd.concat(frames) if len(frames) > 1 else frames[0]
+        data.index = _utc_index(data)
+        mask = None
+        if lo is not None:
+            mask = data.index >= lo
+        if end is not None:
+            upper = data.index <= end
+            mask = upper if mask is None else mask & upper
+        return data if mask is None or mask.all() else data.loc[mask]
+
+    def read(self, start=None, end=None, columns=None):
+        """
+        Velas de la ventana vigente (opcionalmente entre start y end) en un DataFrame.
+        Sólo abre las particiones que se solapan con el rango pedido y, dentro de
+        las de los extremos, los grupos de filas del rango.
+        """
+        for attempt in range(2):
+            manifest = self.load_manifest()
+            lo, hi = self._window(manifest, start, end)
+            try:
+                frames = [self._read_partition(manifest, meta, columns, lo, hi)
+                          for _, meta in self._selected(manifest, lo, hi)]
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+                # Otro proceso aplicó retención entre el manifiesto y la lectura: reintentar
+        return self._finish(frames, lo, hi)
+
+    def tail(self, n, columns=None):
+        """Últimas n velas de la ventana: recorre las particiones desde la más reciente."""
+        for attempt in range(2):
+            manifest = self.load_manifest()
+            lo, _ = self._window(manifest)
+            frames, rows = [], 0
+            try:
+                for _, meta in reversed(self._selected(manifest, lo, None)):
+                    if rows >= n:
+                        break
+                    frame = self._read_partition_tail(meta, n - rows, columns)
+                    frames.insert(0, frame)
+                    rows += len(frame)
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+        data = self._finish(frames, lo, None)
+        return data.iloc[-n:] if n else data.iloc[:0]
+
+    def iter_partitions(self, columns=None):
+        """(nombre, meta, DataFrame) de cada partición en orden, de una en una (memoria acotada)."""
+        manifest = self.load_manifest()
+        for name in sorted(manifest['partitions']):
+            meta = manifest['partitions'][name]
+            try:
+                frame = pd.read_parquet(os.path.join(self.root, meta['file']), columns=columns)
+            except FileNotFoundError:
+                continue   # Retención aplicada por otro proceso mientras se recorría
+            yield name, meta, frame
+
+    def read_index(self):
+        """Sólo el DatetimeIndex de la ventana (sin columnas)."""
+        data = self.read(columns=[])
+        if data.empty:
+            return pd.DatetimeIndex([], tz='UTC', name='Datetime')
+        return data.index
@@ -0,0 +1,194 @@
+"""
+ContextBus - Bus de contexto en memoria (market_context / cycle_context) con persistencia en segundo plano.
+
+Cada Strategia.decide abría y parseaba market_context.json y cycle_context.json,
+Evaluador volvía a leer market_context.json en su bucle y el dashboard otra vez
+en cada petición. Con el bus:
+
+    productor   context_bus.publish("market_context", ctx)
+                → snapshot versionado en memoria; un hilo sink escribe el JSON
+                  de forma atómica (sólo la última versión pendiente por tópico)
+    consumidor  context_bus.get("market_context")   → ContextSnapshot o None
+                context_bus.data("cycle_context")   → dict o None
+
+En el proceso productor los consumidores reciben el snapshot sin tocar disco.
+Los procesos que no publican (dashboard, cycle_context.json escrito a mano) usan
+el vigilante de archivo: como mucho un stat por tópico cada WATCH_INTERVAL
+segundos, y el JSON sólo se vuelve a parsear si cambió su mtime/tamaño.
+
+Los snapshots son de sólo lectura: los consumidores no deben modificar .data.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOPICS = {
+    'market_context': 'market_context.json',
+    'cycle_context': 'cycle_context.json',
+}
+WATCH_INTERVAL = 1.0      # Segundos mínimos entre stats del archivo de un tópico
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    topic: str
+    version: int
+    data: Dict[str, Any] = field(default_factory=dict)
+    published_at: float = 0.0      # time.time() de la publicación o mtime del archivo
+    source: str = 'memory'         # 'memory' (publicado en este proceso) | 'file'
+
+    def age(self, now=None):
+        """Segundos desde la publicación."""
+        return (now if now is not None else time.time()) - self.published_at
+
+
+class _FileWatcher:
+    """Último contenido válido del JSON de un tópico, recargado sólo si el archivo cambia."""
+    def __init__(self, topic, path):
+        self.topic = topic
+        self.path = path
+        self.signature = None        # (mtime_ns, size) del archivo parseado
+        self.snapshot = None
+        self.checked_at = None
+        self.reloads = 0             # Parseos realizados (diagnóstico)
+
+    def poll(self, now, interval):
+        if self.checked_at is not None and now - self.checked_at < interval:
+            return self.snapshot
+        self.checked_at = now
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.signature, self.snapshot = None, None
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature != self.signature:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return self.snapshot      # Archivo a medio escribir por otro proceso: conservar el anterior
+            self.signature = signature
+            self.reloads += 1
+            self.snapshot = ContextSnapshot(self.topic, self.reloads, data if isinstance(data, dict) else {},
+                                            st.st_mtime, 'file')
+        return self.snapshot
+
+
+class ContextBus:
+    """Snapshots de contexto por tópico, servidos desde memoria o desde el archivo vigilado."""
+
+    def __init__(self, base_dir=None, topics=None, watch_interval=WATCH_INTERVAL):
+        self.base_dir = base_dir or BASE_DIR
+        self.topics = dict(topics or TOPICS)
+        self.watch_interval = watch_interval
+        self.lock = threading.Lock()
+        self.snapshots = {}          # tópico -> último ContextSnapshot publicado en este proceso
+        self.watchers = {}           # tópico -> _FileWatcher
+        self.versions = {}
+        self.pending = {}            # tópico -> snapshot pendiente de persistir
+        self.writing = 0
+        self.sink_cond = threading.Condition(self.lock)
+        self.sink_thread = None
+        self.writes = 0              # Archivos escritos por el sink (diagnóstico)
+
+    def path(self, topic):
+        return os.path.join(self.base_dir, self.topics.get(topic, f"{topic}.json"))
+
+    # ------------------------------------------------------------------ productores
+    def publish(self, topic, data, persist=True):
+        """Publica un snapshot nuevo del tópico; retorna su versión."""
+        with self.lock:
+            version = self.versions.get(topic, 0) + 1
+            self.versions[topic] = version
+            snapshot = ContextSnapshot(topic, version, dict(data), time.time(), 'memory')
+            self.snapshots[topic] = snapshot
+            if persist:
+                self.pending[topic] = snapshot
+                self._ensure_sink()
+                self.sink_cond.notify()
+        return version
+
+    def _ensure_sink(self):
+        if self.sink_thread is None or not self.sink_thread.is_alive():
+            self.sink_thread = threading.Thread(target=self._sink_loop, name="ContextBusSink", daemon=True)
+            self.sink_thread.start()
+
+    def _sink_loop(self):
+        while True:
+            with self.lock:
+                while not self.pending:
+                    self.sink_cond.wait()
+                batch = list(self.pending.values())
+                self.pending.clear()
+                self.writing += 1
+            try:
+                for snapshot in batch:
+                    self._write(snapshot)
+            finally:
+                with self.lock:
+                    self.writing -= 1
+                    self.sink_cond.notify_all()
+
+    def _write(self, snapshot):
+        """Persiste el snapshot de forma atómica (tmp + replace)."""
+        path = self.path(snapshot.topic)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot.data, f, indent=2)
+            os.replace(tmp_path, path)
+            self.writes += 1
+        except Exception as e:
+            logging.warning(f"[WARNING] No se pudo guardar {os.path.basename(path)}: {e}")
+
+    def flush(self, timeout=5.0):
+        """Espera a que el sink persista lo pendiente; retorna True si terminó."""
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while self.pending or self.writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.sink_cond.wait(remaining)
+        return True
+
+    # ------------------------------------------------------------------ consumidores
+    def get(self, topic, max_age=None):
+        """
+        Último snapshot del tópico (None si no hay o si es más viejo que max_age).
+        Prioriza lo publicado en este proceso; si no, el archivo vigilado.
+        """
+        now = time.time()
+        with self.lock:
+            snapshot = self.snapshots.get(topic)
+            if snapshot is None:
+                watcher = self.watchers.get(topic)
+                if watcher is None:
+                    watcher = self.watchers[topic] = _FileWatcher(topic, self.path(topic))
+                snapshot = watcher.poll(time.monotonic(), self.watch_interval)
+        if snapshot is None or (max_age is not None and snapshot.age(now) >= max_age):
+            return None
+        return snapshot
+
+    def data(self, topic, default=None, max_age=None):
+        """Contenido del último snapshot del tópico o default."""
+        snapshot = self.get(topic, max_age)
+        return snapshot.data if snapshot is not None else default
+
+    def reset(self):
+        """Olvida snapshots y vigilantes (tests / cambio de directorio)."""
+        self.flush()
+        with self.lock:
+            self.snapshots.clear()
+            self.watchers.clear()
+
+
+context_bus = ContextBus()
+atexit.register(context_bus.flush)
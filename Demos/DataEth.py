@@ -10,8 +10,17 @@ from ta.momentum import StochasticOscillator
 from ta.trend import MACD, EMAIndicator
 from ta.volatility import BollingerBands, AverageTrueRange
 from EthSession import CapitalOP  # Importar autenticación desde EthSession
+from DataLoader import DataLoader
+from ApiProviders import PROVIDERS, INTERVAL_SECONDS
+from MissingRanges import MissingRangeIndex, missing_index
+from ResponseCache import response_cache
+from IndicatorEngine import IndicatorEngine, SR_WINDOW
+from JsonExport import json_exporter, write_json_export, LEGACY_FORMAT, EPOCH_FORMAT
+from CandleSchema import apply_schema
 from ta.momentum import RSIIndicator, StochasticOscillator
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # ========== CONSTANTES DE VENTANA DE DATOS ==========
 HTF_WINDOW = 43800    # ~5 años de velas HOUR (5 * 365 * 24)
@@ -19,237 +28,231 @@ LTF_WINDOW = 10080    # 7 días de velas MINUTE (7 * 24 * 60)
 ATTEMPT_COOLDOWN_HOURS = 4   # Cooldown entre intentos de descarga fallidos
 MAX_ATTEMPTS_PER_RANGE = 3   # Máximo intentos por rango antes de marcar permanente
 
-# ========== SISTEMA DE ROTACIÓN DE APIs ==========
-# Rotador global para balancear carga entre APIs gratuitas
-class APIRotator:
-    """Rotador de APIs para distribuir carga entre Binance, Kraken y CryptoCompare"""
-    def __init__(self):
-        self.apis = ['binance', 'kraken', 'cryptocompare']
-        self.current_index = 0
-        self.request_count = {'binance': 0, 'kraken': 0, 'cryptocompare': 0}
-        self.error_count = {'binance': 0, 'kraken': 0, 'cryptocompare': 0}
-
-    def get_next_api(self):
-        """Obtiene la siguiente API en rotación"""
-        api = self.apis[self.current_index]
-        self.current_index = (self.current_index + 1) % len(self.apis)
-        return api
-
-    def record_request(self, api, success=True):
-        """Registra una petición a una API"""
-        self.request_count[api] += 1
-        if not success:
-            self.error_count[api] += 1
+# ========== MOTORES INCREMENTALES DE INDICADORES ==========
+# Conservan el estado entre llamadas del job incremental (margen de 30 días HTF / 1 día LTF)
+htf_indicator_engine = IndicatorEngine(max_rows=HTF_WINDOW + 30 * 24)
+ltf_indicator_engine = IndicatorEngine(max_rows=LTF_WINDOW + 24 * 60)
 
-    def get_stats(self):
-        """Obtiene estadísticas de uso"""
-        return {
-            'requests': self.request_count.copy(),
-            'errors': self.error_count.copy()
-        }
-
-# Instancia global del rotador
-
-# ========== FUNCIONES DE DESCARGA POR API ==========
-def download_binance(start_date, end_date, interval='1h'):
-    """Descarga datos desde Binance Spot API"""
-    try:
-        url = "https://api.binance.com/api/v3/klines"
-
-        start_ms = int(start_date.timestamp() * 1000)
-        end_ms = int(end_date.timestamp() * 1000)
+# ========== DESCARGA CONCURRENTE DE SEGMENTOS ==========
+SEGMENT_WORKERS = 6          # Hilos máximos descargando segmentos en paralelo
+# Peticiones simultáneas permitidas por proveedor (respeta el límite de cada API)
+PROVIDER_CONCURRENCY = {'binance': 3, 'kraken': 1, 'cryptocompare': 2}
+_provider_slots = {api: threading.BoundedSemaphore(n) for api, n in PROVIDER_CONCURRENCY.items()}
 
-        params = {
-            'symbol': 'ETHUSDT',
-            'interval': interval,
-            'startTime': start_ms,
-            'endTime': end_ms,
-            'limit': 1000
-        }
+# ========== ROUTER DE APIs CON SALUD POR PROVEEDOR ==========
+ROUTER_EWMA_ALPHA = 0.2          # Peso de la última petición en las medias móviles
+ROUTER_DEFAULT_LATENCY = 1.0     # Latencia supuesta (s) para un proveedor sin historial
+CIRCUIT_FAILURE_THRESHOLD = 3    # Fallos consecutivos que abren el circuito
+CIRCUIT_OPEN_SECONDS = 300       # Tiempo que un proveedor queda fuera tras abrirse el circuito
+ROUTER_STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_router_stats.json")
 
-        response = requests.get(url, params=params, timeout=15)
 
-        if response.status_code == 200:
-            data = response.json()
-
-            if not data:
+class ProviderRouter:
+    """
+    Router persistente entre Binance, Kraken y CryptoCompare.
+
+    Mantiene por proveedor EWMAs de latencia, tasa de error y tasa de
+    respuestas vacías, y envía cada segmento al proveedor con menor coste
+    esperado (latencia / probabilidad de éxito, penalizado por las peticiones
+    en curso). Tras CIRCUIT_FAILURE_THRESHOLD errores consecutivos (None,
+    excepción, 418/429) el proveedor queda fuera CIRCUIT_OPEN_SECONDS; pasado
+    ese tiempo vuelve a probarse. Una respuesta vacía (hueco real en el
+    histórico) no es un fallo: sólo alimenta empty_rate y el coste esperado.
+    """
+    def __init__(self, apis=None, capacity=None):
+        self.apis = list(apis or ['binance', 'kraken', 'cryptocompare'])
+        self.capacity = dict(capacity or PROVIDER_CONCURRENCY)
+        self._lock = threading.Lock()
+        self.health = {api: {
+            'latency': None,
+            'error_rate': 0.0,
+            'empty_rate': 0.0,
+            'requests': 0,
+            'errors': 0,
+            'empty': 0,
+            'consecutive_failures': 0,
+            'open_until': 0.0,
+            'inflight': 0,
+        } for api in self.apis}
+
+    def _expected_cost(self, api):
+        h = self.health[api]
+        latency = h['latency'] if h['latency'] is not None else ROUTER_DEFAULT_LATENCY
+        success = max(0.05, 1.0 - h['error_rate'] - h['empty_rate'])
+        load = 1.0 + h['inflight'] / max(1, self.capacity.get(api, 1))
+        return latency / success * load
+
+    def choose(self, exclude=()):
+        """
+        Reserva el mejor proveedor disponible (circuito cerrado) que no esté en exclude.
+        Si todos los circuitos están abiertos, prueba el que antes se reabre.
+        Retorna None si no queda ninguno por probar.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [a for a in self.apis if a not in exclude]
+            if not candidates:
                 return None
-
-            df = pd.DataFrame(data, columns=[
-                'timestamp', 'Open', 'High', 'Low', 'Close', 'Volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
-
-            df['Datetime'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
-            df = df[['Datetime', 'Open', 'High', 'Low', 'Close', 'Volume']]
-            df[['Open', 'High', 'Low', 'Close', 'Volume']] = df[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float)
-            df.set_index('Datetime', inplace=True)
-            df.sort_index(inplace=True)
-
-            # api_rotator.record_request('binance', success=True)
-            return df
+            closed = [a for a in candidates if self.health[a]['open_until'] <= now]
+            if closed:
+                api = min(closed, key=self._expected_cost)
+            elif len(candidates) == len(self.apis):
+                api = min(candidates, key=lambda a: self.health[a]['open_until'])
+            else:
+                return None
+            self.health[api]['inflight'] += 1
+            return api
+
+    def record(self, api, latency, df):
+        """Registra el resultado de una petición reservada con choose()."""
+        if df is None:
+            outcome = 'error'
+        elif df.empty:
+            outcome = 'empty'
         else:
-            # api_rotator.record_request('binance', success=False)
-            return None
-    except Exception as e:
-        print(f"[WARNING] Error en Binance: {e}")
-        # api_rotator.record_request('binance', success=False)
-        return None
+            outcome = 'ok'
+        a = ROUTER_EWMA_ALPHA
+        with self._lock:
+            h = self.health[api]
+            h['inflight'] = max(0, h['inflight'] - 1)
+            h['requests'] += 1
+            h['latency'] = latency if h['latency'] is None else (1 - a) * h['latency'] + a * latency
+            h['error_rate'] = (1 - a) * h['error_rate'] + a * (outcome == 'error')
+            h['empty_rate'] = (1 - a) * h['empty_rate'] + a * (outcome == 'empty')
+            if outcome == 'ok':
+                h['consecutive_failures'] = 0
+                h['open_until'] = 0.0
+                return
+            if outcome == 'empty':
+                h['empty'] += 1     # No abre el circuito
+                return
+            h['errors'] += 1
+            h['consecutive_failures'] += 1
+            if h['consecutive_failures'] >= CIRCUIT_FAILURE_THRESHOLD:
+                h['open_until'] = time.monotonic() + CIRCUIT_OPEN_SECONDS
+                print(f"[WARNING] 🔌 Circuito abierto para {api.upper()} ({CIRCUIT_OPEN_SECONDS}s)")
 
-def download_kraken(start_date, end_date, interval=60):
-    """Descarga datos desde Kraken API"""
-    try:
-        url = "https://api.kraken.com/0/public/OHLC"
-
-        params = {
-            'pair': 'ETHUSD',
-            'interval': interval,
-            'since': int(start_date.timestamp())
+    def get_stats(self):
+        """Estadísticas por proveedor (para el dashboard)."""
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for api, h in self.health.items():
+                stats[api] = {
+                    'state': 'open' if h['open_until'] > now else 'closed',
+                    'open_for_s': round(max(0.0, h['open_until'] - now), 1),
+                    'latency_s': round(h['latency'], 3) if h['latency'] is not None else None,
+                    'error_rate': round(h['error_rate'], 3),
+                    'empty_rate': round(h['empty_rate'], 3),
+                    'requests': h['requests'],
+                    'errors': h['errors'],
+                    'empty': h['empty'],
+                    'score': round(self._expected_cost(api), 3),
+                }
+            return stats
+
+    def save_stats(self, path=ROUTER_STATS_FILE):
+        """Persiste las estadísticas de forma atómica en api_router_stats.json."""
+        payload = {
+            'timestamp': datetime.now(pytz.UTC).isoformat(),
+            'providers': self.get_stats(),
         }
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[WARNING] No se pudo guardar api_router_stats.json: {e}")
 
-        response = requests.get(url, params=params, timeout=15)
-
-        if response.status_code == 200:
-            data = response.json()
-
-            if 'error' in data and data['error']:
-                # api_rotator.record_request('kraken', success=False)
-                return None
-
-            result = data.get('result', {})
-            pair_key = next(iter([k for k in result.keys() if 'ETH' in k]), None)
-
-            if not pair_key:
-                # api_rotator.record_request('kraken', success=False)
-                return None
-
-            ohlc_data = result[pair_key]
-
-            if not ohlc_data:
-                # api_rotator.record_request('kraken', success=False)
-                return None
-
-            df = pd.DataFrame(ohlc_data, columns=[
-                'timestamp', 'Open', 'High', 'Low', 'Close', 'vwap', 'Volume', 'count'
-            ])
-            df['Datetime'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
-            df = df[['Datetime', 'Open', 'High', 'Low', 'Close', 'Volume']]
-            df[['Open', 'High', 'Low', 'Close', 'Volume']] = df[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float)
-
-            # Filtrar por rango
-            df = df[(df['Datetime'] >= start_date) & (df['Datetime'] <= end_date)]
-            df.set_index('Datetime', inplace=True)
-            df.sort_index(inplace=True)
+# Instancia global del router (vive lo que vive el proceso)
+api_router = ProviderRouter()
 
-            # api_rotator.record_request('kraken', success=True)
-            return df
-        else:
-            # api_rotator.record_request('kraken', success=False)
-            return None
+# ========== FUNCIONES DE DESCARGA POR API ==========
+# Los adaptadores de ApiProviders paginan cada rango según los límites de su API.
+def _download_provider(api, label, start_date, end_date, interval):
+    try:
+        return response_cache.fetch(PROVIDERS[api], start_date, end_date, interval)
     except Exception as e:
-        print(f"[WARNING] Error en Kraken: {e}")
-        # api_rotator.record_request('kraken', success=False)
+        print(f"[WARNING] Error en {label}: {e}")
         return None
 
-def download_cryptocompare(start_date, end_date, interval='hour'):
-    """Descarga datos desde CryptoCompare API"""
-    try:
-        url = "https://min-api.cryptocompare.com/data/v2/histohour" if interval == 'hour' else "https://min-api.cryptocompare.com/data/v2/histominute"
-
-        params = {
-            'fsym': 'ETH',
-            'tsym': 'USD',
-            'limit': 2000,
-            'toTs': int(end_date.timestamp())
-        }
-
-        response = requests.get(url, params=params, timeout=15)
-
-        if response.status_code == 200:
-            data = response.json()
+def download_binance(start_date, end_date, interval='HOUR'):
+    """Descarga datos desde Binance Spot API (paginado por startTime, 1000 velas/llamada)"""
+    return _download_provider('binance', 'Binance', start_date, end_date, interval)
 
-            if data.get('Response') != 'Success':
-                # api_rotator.record_request('cryptocompare', success=False)
-                return None
-
-            ohlc_data = data['Data']['Data']
+def download_kraken(start_date, end_date, interval='HOUR'):
+    """Descarga datos desde Kraken API (paginado por since, últimas 720 velas)"""
+    return _download_provider('kraken', 'Kraken', start_date, end_date, interval)
 
-            if not ohlc_data:
-                # api_rotator.record_request('cryptocompare', success=False)
-                return None
-
-            df = pd.DataFrame(ohlc_data)
-            df['Datetime'] = pd.to_datetime(df['time'], unit='s', utc=True)
-            df = df[['Datetime', 'open', 'high', 'low', 'close', 'volumefrom']]
-            df.rename(columns={
-                'open': 'Open',
-                'high': 'High',
-                'low': 'Low',
-                'close': 'Close',
-                'volumefrom': 'Volume'
-            }, inplace=True)
-
-            # Filtrar por rango
-            df = df[(df['Datetime'] >= start_date) & (df['Datetime'] <= end_date)]
-            df.set_index('Datetime', inplace=True)
-            df.sort_index(inplace=True)
-
-            # api_rotator.record_request('cryptocompare', success=True)
-            return df if len(df) > 0 else None
-        else:
-            # api_rotator.record_request('cryptocompare', success=False)
-            return None
-    except Exception as e:
-        print(f"[WARNING] Error en CryptoCompare: {e}")
-        # api_rotator.record_request('cryptocompare', success=False)
-        return None
+def download_cryptocompare(start_date, end_date, interval='HOUR'):
+    """Descarga datos desde CryptoCompare API (paginado hacia atrás por toTs, 2000 velas/llamada)"""
+    return _download_provider('cryptocompare', 'CryptoCompare', start_date, end_date, interval)
 
 def download_with_rotation(start_date, end_date, interval='HOUR'):
-    """Descarga datos rotando entre las 3 APIs gratuitas con fallback"""
-    # Mapeo de intervalos
-    interval_map = {
-        'HOUR': {'binance': '1h', 'kraken': 60, 'cryptocompare': 'hour'},
-        'MINUTE': {'binance': '1m', 'kraken': 1, 'cryptocompare': 'minute'}
-    }
-
-    if interval not in interval_map:
+    """Descarga datos eligiendo la API más sana según api_router, con fallback a las demás"""
+    if interval not in INTERVAL_SECONDS:
         print(f"[ERROR] Intervalo {interval} no soportado")
         return None
 
-    # Crear instancia del rotador de APIs
-    api_rotator = APIRotator()
-
-    # Intentar con las 3 APIs en orden rotativo
-    attempts = 0
-    max_attempts = 3
-
-    while attempts < max_attempts:
-        api = api_rotator.get_next_api()
+    # Descartar de entrada las APIs que no pueden servir el rango completo
+    tried = {api for api, adapter in PROVIDERS.items() if not adapter.can_serve(start_date, end_date, interval)}
+    while True:
+        api = api_router.choose(exclude=tried)
+        if api is None:
+            break
+        tried.add(api)
         print(f"[INFO] 🔄 Descargando desde {api.upper()} ({start_date.strftime('%Y-%m-%d %H:%M')} → {end_date.strftime('%Y-%m-%d %H:%M')})")
 
         df = None
-        api_interval = interval_map[interval][api]
 
-        if api == 'binance':
-            df = download_binance(start_date, end_date, api_interval)
-        elif api == 'kraken':
-            df = download_kraken(start_date, end_date, api_interval)
-        elif api == 'cryptocompare':
-            df = download_cryptocompare(start_date, end_date, api_interval)
+        # Slot por proveedor: limita las peticiones simultáneas a cada API
+        with _provider_slots[api]:
+            t0 = time.monotonic()
+            try:
+                if api == 'binance':
+                    df = download_binance(start_date, end_date, interval)
+                elif api == 'kraken':
+                    df = download_kraken(start_date, end_date, interval)
+                elif api == 'cryptocompare':
+                    df = download_cryptocompare(start_date, end_date, interval)
+            finally:
+                api_router.record(api, time.monotonic() - t0, df)
 
         if df is not None and not df.empty:
             print(f"[INFO] ✅ {api.upper()}: {len(df)} velas obtenidas")
-            time.sleep(0.5)  # Rate limiting cortés
             return df
 
-        attempts += 1
         print(f"[WARNING] {api.upper()} no devolvió datos. Intentando siguiente API...")
-        time.sleep(1)  # Esperar antes de reintentar
 
     print(f"[ERROR] ❌ Ninguna API devolvió datos para {start_date} → {end_date}")
     return None
 
+def download_segments(segments, interval='HOUR', max_workers=SEGMENT_WORKERS):
+    """
+    Descarga una lista de segmentos (start, end) en paralelo.
+
+    api_router reparte los segmentos entre Binance, Kraken y CryptoCompare según
+    su salud y carga en curso; los slots por proveedor evitan superar su límite.
+    Retorna los DataFrames en el mismo orden que `segments`
+    (None para los segmentos sin datos).
+    """
+    if not segments:
+        return []
+
+    workers = max(1, min(max_workers, len(segments)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="segment") as pool:
+        futures = [pool.submit(download_with_rotation, s, e, interval) for s, e in segments]
+        results = []
+        for fut in futures:
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                print(f"[WARNING] Error descargando segmento: {e}")
+                results.append(None)
+    api_router.save_stats()
+    return results
+
 # ========== CONFIGURACIÓN DE VENTANAS MÓVILES ==========
 
 # 🎯 Ventanas móviles optimizadas (solo mantener lo necesario)
@@ -264,88 +267,71 @@ def download_with_rotation(start_date, end_date, interval='HOUR'):
 # Ya no necesitamos Capital.com - usamos rotación de APIs gratuitas
 
 # ========== PERSISTENCIA DE TRAMOS SIN DATOS ==========
+# El registro vive en memoria (MissingRanges.missing_index) y se escribe por lotes
 def _load_missing_ranges():
-    """Carga el registro de tramos sin datos desde Reports/missing_ranges.json"""
-    missing_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Reports', 'missing_ranges.json')
-    if not os.path.exists(missing_file):
-        return {}
-    try:
-        with open(missing_file, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"[WARNING] Error al leer missing_ranges.json: {e}")
-        return {}
+    """Retorna una copia del registro de tramos sin datos (Reports/missing_ranges.json)"""
+    return missing_index.as_dict()
 
 def _save_missing_ranges(missing):
-    """Guarda el registro de tramos sin datos en Reports/missing_ranges.json"""
-    reports_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Reports')
-    os.makedirs(reports_dir, exist_ok=True)
-    missing_file = os.path.join(reports_dir, 'missing_ranges.json')
-    try:
-        with open(missing_file, 'w') as f:
-            json.dump(missing, f, indent=2, default=str)
-    except Exception as e:
-        print(f"[ERROR] Error al guardar missing_ranges.json: {e}")
+    """Reemplaza el registro de tramos sin datos y lo escribe de inmediato"""
+    missing_index.replace(missing)
+    missing_index.flush()
 
-def _should_skip_range(start, end, missing):
-    """Verifica si un rango debe ser saltado según missing_ranges.json
-    Retorna (skip: bool, reason: str)
-    """
-    key = f"{start.isoformat()}->{end.isoformat()}"
-    if key not in missing:
-        return False, ""
+def flush_missing_ranges():
+    """Escribe los cambios pendientes del registro de tramos sin datos"""
+    return missing_index.flush()
 
-    entry = missing[key]
+def _entry_skip_reason(entry, now):
+    """Motivo para saltar un tramo registrado ('' si puede reintentarse)"""
     attempts = entry.get('attempts', 0)
     last_attempt = entry.get('last_attempt')
 
     # Si ya se intentó >= MAX_ATTEMPTS_PER_RANGE veces, marcar como permanente
     if attempts >= MAX_ATTEMPTS_PER_RANGE:
-        return True, f"max_attempts ({MAX_ATTEMPTS_PER_RANGE}) alcanzados"
+        return f"max_attempts ({MAX_ATTEMPTS_PER_RANGE}) alcanzados"
 
     # Verificar cooldown
     if last_attempt:
         try:
-            last_dt = datetime.fromisoformat(last_attempt).replace(tzinfo=pytz.UTC)
-            now = datetime.now(pytz.UTC)
+            last_dt = datetime.fromisoformat(last_attempt)
+            if last_dt.tzinfo is None:
+                last_dt = last_dt.replace(tzinfo=pytz.UTC)
             elapsed_hours = (now - last_dt).total_seconds() / 3600
             if elapsed_hours < ATTEMPT_COOLDOWN_HOURS:
-                return True, f"cooldown activo ({int(ATTEMPT_COOLDOWN_HOURS - elapsed_hours)}h restantes)"
+                return f"cooldown activo ({int(ATTEMPT_COOLDOWN_HOURS - elapsed_hours)}h restantes)"
         except Exception:
             pass
+    return ""
 
-    return False, ""
-
-def _register_missing_range(start, end, reason="no-data"):
-    """Registra un tramo sin datos en missing_ranges.json"""
-    missing = _load_missing_ranges()
-    key = f"{start.isoformat()}->{end.isoformat()}"
+def _should_skip_range(start, end, missing=None):
+    """Verifica si un rango debe ser saltado según missing_ranges.json
+    El rango se salta si los tramos registrados que siguen en cooldown (o que
+    agotaron sus intentos) lo cubren por completo, aunque sus claves no
+    coincidan exactamente (tramos desplazados o solapados).
+    Retorna (skip: bool, reason: str)
+    """
+    index = missing_index if missing is None else MissingRangeIndex.from_entries(missing)
     now = datetime.now(pytz.UTC)
+    blocking = []
+    for key, entry in index.overlapping(start, end):
+        reason = _entry_skip_reason(entry, now)
+        if reason:
+            blocking.append((key, entry, reason))
+    if not blocking:
+        return False, ""
+    if not index.covered_by(start, end, [(k, e) for k, e, _ in blocking]):
+        return False, ""
+    return True, blocking[0][2]
 
-    if key in missing:
-        missing[key]['attempts'] = missing[key].get('attempts', 0) + 1
-        missing[key]['last_attempt'] = now.isoformat()
-        missing[key]['reason'] = reason
-    else:
-        missing[key] = {
-            'start': start.isoformat(),
-            'end': end.isoformat(),
-            'attempts': 1,
-            'last_attempt': now.isoformat(),
-            'reason': reason
-        }
-
-    _save_missing_ranges(missing)
-    attempts = missing[key]['attempts']
+def _register_missing_range(start, end, reason="no-data"):
+    """Registra un tramo sin datos en missing_ranges.json (escritura por lotes)"""
+    key, entry = missing_index.register(start, end, reason)
+    attempts = entry['attempts']
     print(f"[INFO] 📝 Rango {key} registrado en missing_ranges.json (intento {attempts}/{MAX_ATTEMPTS_PER_RANGE}, motivo: {reason})")
 
 def _clear_missing_range(start, end):
-    """Remueve un tramo de missing_ranges.json si ahora tiene datos"""
-    missing = _load_missing_ranges()
-    key = f"{start.isoformat()}->{end.isoformat()}"
-    if key in missing:
-        missing.pop(key)
-        _save_missing_ranges(missing)
+    """Remueve de missing_ranges.json el tramo (y los contenidos en él) si ahora tiene datos"""
+    for key in missing_index.clear(start, end):
         print(f"[INFO] ✅ Rango {key} removido de missing_ranges.json (datos obtenidos)")
 # =======================================================
 
@@ -356,15 +342,8 @@ def get_epic(symbol):
     """
     return symbol
 
-def download_data_capital(epic, interval, start_date, end_date):
-    """
-    Descarga datos históricos usando rotación de APIs gratuitas.
-    Mantiene dos DataFrames:
-    1. historical_data -> Contiene los datos históricos en la resolución original.
-    2. data -> Contiene los datos a 1 minuto con un buffer adecuado.
-    """
-    all_data = []
-    current_date = start_date
+def split_range(start_date, end_date, interval):
+    """Divide start_date -> end_date en segmentos contiguos aptos para una descarga."""
     segment_days = 10  # Descarga en segmentos
 
     # Para intervalos HOUR usar ventanas más grandes (Binance permite 1000 velas)
@@ -376,26 +355,36 @@ def download_data_capital(epic, interval, start_date, end_date):
     else:
         chunk = timedelta(days=segment_days)
 
+    segments = []
+    current_date = start_date
     while current_date < end_date:
         seg_end_date = min(current_date + chunk, end_date)
+        segments.append((current_date, seg_end_date))
+        current_date = seg_end_date
+    return segments
 
-        # Descargar usando rotación de APIs
-        df_segment = download_with_rotation(current_date, seg_end_date, interval)
+def download_data_capital(epic, interval, start_date, end_date):
+    """
+    Descarga datos históricos usando rotación de APIs gratuitas.
+    Los segmentos se descargan en paralelo (ver download_segments) y se
+    reensamblan en orden antes de deduplicar.
+    Mantiene dos DataFrames:
+    1. historical_data -> Contiene los datos históricos en la resolución original.
+    2. data -> Contiene los datos a 1 minuto con un buffer adecuado.
+    """
+    all_data = []
+    segments = split_range(start_date, end_date, interval)
 
+    # Descargar todos los segmentos en paralelo (rotación de APIs por segmento)
+    for (seg_start, seg_end_date), df_segment in zip(segments, download_segments(segments, interval)):
         if df_segment is not None and not df_segment.empty:
-            # Convertir de vuelta a formato de lista de dicts para compatibilidad
-            df_segment_reset = df_segment.reset_index()
-            segment_dicts = df_segment_reset.to_dict('records')
-            all_data.extend(segment_dicts)
+            all_data.append(df_segment.reset_index())
         else:
-            print(f"[WARNING] No se encontraron datos para {current_date} - {seg_end_date}")
-
-        current_date = seg_end_date
-        time.sleep(0.3)  # Rate limiting cortés entre segmentos
+            print(f"[WARNING] No se encontraron datos para {seg_start} - {seg_end_date}")
 
     if all_data:
         # 📌 Crear DataFrame con datos históricos (HOUR, DAY, etc.)
-        df = pd.DataFrame(all_data)
+        df = pd.concat(all_data, ignore_index=True)
         # Los datos ya vienen con columnas normalizadas (Datetime, Open, High, Low, Close, Volume)
         if 'Datetime' in df.columns:
             df["Datetime"] = pd.to_datetime(df["Datetime"], utc=True)
@@ -417,26 +406,22 @@ def download_data_capital(epic, interval, start_date, end_date):
             start_minute = last_hour - timedelta(days=minute_days)
             current_start = start_minute
 
+            minute_segments = []
             while current_start < last_hour:
                 if current_start >= now_utc:
                     break
                 seg_end = min(current_start + timedelta(days=1), last_hour, now_utc)
+                minute_segments.append((current_start, seg_end))
+                current_start = seg_end + timedelta(seconds=1)
 
-                # Usar rotación de APIs para MINUTE
-                df_minute_segment = download_with_rotation(current_start, seg_end, 'MINUTE')
-
+            for (seg_start, seg_end), df_minute_segment in zip(minute_segments, download_segments(minute_segments, 'MINUTE')):
                 if df_minute_segment is not None and not df_minute_segment.empty:
-                    df_minute_reset = df_minute_segment.reset_index()
-                    segment_dicts = df_minute_reset.to_dict('records')
-                    data_minute.extend(segment_dicts)
+                    data_minute.append(df_minute_segment.reset_index())
                 else:
-                    print(f"[WARNING] No se encontraron datos 1M para {current_start} - {seg_end}")
-
-                current_start = seg_end + timedelta(seconds=1)
-                time.sleep(0.3)  # Rate limiting
+                    print(f"[WARNING] No se encontraron datos 1M para {seg_start} - {seg_end}")
 
             if data_minute:
-                minute_df = pd.DataFrame(data_minute)
+                minute_df = pd.concat(data_minute, ignore_index=True)
                 if 'Datetime' in minute_df.columns:
                     minute_df["Datetime"] = pd.to_datetime(minute_df["Datetime"], utc=True)
                     minute_df.set_index("Datetime", inplace=True)
@@ -451,6 +436,120 @@ def download_data_capital(epic, interval, start_date, end_date):
     return pd.DataFrame(), pd.DataFrame()
 
 
+# ========== SINCRONIZACIÓN INCREMENTAL CONTRA EL STORE PARQUET ==========
+INTERVAL_STEP = {'HOUR': pd.Timedelta(hours=1), 'MINUTE': pd.Timedelta(minutes=1)}
+
+def _to_utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(pytz.UTC) if ts.tz is None else ts.tz_convert(pytz.UTC)
+
+def plan_sync(existing_index, start_date, end_date, interval='HOUR'):
+    """
+    Calcula qué tramos faltan en el store para cubrir start_date -> end_date.
+
+    Detecta los huecos con una sola pasada vectorizada sobre las diferencias
+    entre timestamps consecutivos. Retorna una lista ordenada de
+    (start, end, kind) con kind in {'head', 'gap', 'tail'}. Cada tramo incluye
+    las velas que lo delimitan (el merge deduplica), y la cola arranca en la
+    última vela guardada para refrescarla por si estaba abierta.
+    """
+    start = _to_utc(start_date)
+    end = _to_utc(end_date)
+    step_ns = INTERVAL_STEP[interval].value
+
+    if existing_index is None or len(existing_index) == 0:
+        return [(start, end, 'tail')]
+
+    idx = pd.DatetimeIndex(existing_index)
+    idx = idx.tz_localize(pytz.UTC) if idx.tz is None else idx.tz_convert(pytz.UTC)
+    idx = idx.as_unit('ns')
+    values = np.unique(idx.asi8)
+    values = values[(values >= start.value) & (values <= end.value)]
+    if len(values) == 0:
+        return [(start, end, 'tail')]
+
+    def _ts(v):
+        return pd.Timestamp(int(v), tz=pytz.UTC)
+
+    plan = []
+    if values[0] - start.value > step_ns:
+        plan.append((start, _ts(values[0]), 'head'))
+
+    gap_pos = np.flatnonzero(np.diff(values) > step_ns)
+    for a, b in zip(values[gap_pos], values[gap_pos + 1]):
+        plan.append((_ts(a), _ts(b), 'gap'))
+
+    if end.value > values[-1]:
+        plan.append((_ts(values[-1]), end, 'tail'))
+    return plan
+
+def sync_missing(interval, start_date, end_date, existing_index=None):
+    """
+    Descarga sólo los tramos que faltan en el store Parquet (huecos + cola).
+
+    Si no se pasa existing_index se lee únicamente el índice del Parquet
+    correspondiente vía DataLoader. Los huecos que ninguna API puede llenar se
+    registran en missing_ranges.json y se saltan según su cooldown.
+    Retorna un DataFrame OHLCV (índice Datetime UTC), vacío si no hay nada nuevo.
+    """
+    if existing_index is None:
+        existing_index = DataLoader().load_index('HTF' if interval == 'HOUR' else 'LTF')
+
+    plan = plan_sync(existing_index, start_date, end_date, interval)
+    ranges = []
+    for s, e, kind in plan:
+        if kind != 'tail':
+            skip, reason = _should_skip_range(s, e)
+            if skip:
+                print(f"[INFO] ⏭️  Saltando hueco {s} -> {e}: {reason}")
+                continue
+        ranges.append((s, e, kind))
+
+    n_gaps = sum(1 for r in ranges if r[2] != 'tail')
+    print(f"[INFO] 🧭 Sync {interval}: {n_gaps} huecos + cola a descargar")
+
+    frames = []
+    for s, e, kind in ranges:
+        segments = split_range(s, e, interval)
+        got = [df for df in download_segments(segments, interval) if df is not None and not df.empty]
+        if kind != 'tail':
+            if got:
+                _clear_missing_range(s, e)
+            else:
+                _register_missing_range(s, e, reason="no-data")
+        frames.extend(df.reset_index() for df in got)
+    flush_missing_ranges()
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    df["Datetime"] = pd.to_datetime(df["Datetime"], utc=True)
+    df.set_index("Datetime", inplace=True)
+    df.sort_index(inplace=True)
+    df = df[~df.index.duplicated(keep='last')]
+    print(f"[INFO] ✅ Sync {interval}: {len(df)} velas descargadas")
+    return df
+
+def merge_candles(existing, fresh, start_date=None):
+    """
+    Fusiona velas nuevas sobre las existentes (las nuevas ganan) y recorta a start_date.
+    Sólo conserva OHLCV: los indicadores se recalculan sobre el resultado.
+    """
+    ohlcv = ['Open', 'High', 'Low', 'Close', 'Volume']
+    frames = []
+    for df in (existing, fresh):
+        if df is not None and not df.empty:
+            frames.append(df[[c for c in ohlcv if c in df.columns]])
+    if not frames:
+        return pd.DataFrame()
+    merged = pd.concat(frames)
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+    if start_date is not None:
+        merged = merged[merged.index >= _to_utc(start_date)]
+    return merged
+
+
 def _load_existing_reports():
     """
     Carga el JSON existente si está presente y devuelve dos DataFrames (htf, ltf).
@@ -583,7 +682,7 @@ def download_range_and_merge(epic, interval, s, e, existing_htf, existing_ltf):
         e_aware = e
 
     # Verificar si este rango debe ser saltado por missing_ranges
-    skip, reason = _should_skip_range(s_aware, e_aware, _load_missing_ranges())
+    skip, reason = _should_skip_range(s_aware, e_aware)
     if skip:
         print(f"[INFO] ⏭️  Saltando rango {s} -> {e}: {reason}")
         return existing_htf, existing_ltf
@@ -633,11 +732,69 @@ def download_range_and_merge(epic, interval, s, e, existing_htf, existing_ltf):
 
 
 
-def calculate_indicators(data, buffer_days=30, recent_days=None):
+PRICE_COLUMNS = ('Close', 'Open', 'High', 'Low')
+_PRICE_FALLBACK_KEYS = ('close', 'price', 'last')
+
+
+def _dict_prices(values):
+    """Precio de cada dict: media bid/ask si ambos existen; si no close/price/last; NaN si falla."""
+    frame = pd.DataFrame.from_records(values)
+    out = np.full(len(values), np.nan)
+    pending = np.ones(len(values), dtype=bool)
+    if 'bid' in frame.columns and 'ask' in frame.columns:
+        has_quote = (frame['bid'].notna() & frame['ask'].notna()).to_numpy()
+        bid = pd.to_numeric(frame['bid'], errors='coerce').to_numpy(dtype=float)
+        ask = pd.to_numeric(frame['ask'], errors='coerce').to_numpy(dtype=float)
+        out[has_quote] = ((bid + ask) / 2.0)[has_quote]
+        pending &= ~has_quote
+    for key in _PRICE_FALLBACK_KEYS:
+        if not pending.any() or key not in frame.columns:
+            continue
+        # La primera clave presente decide aunque su valor no sea convertible
+        present = np.fromiter((key in v for v in values), dtype=bool, count=len(values)) & pending
+        out[present] = pd.to_numeric(frame[key], errors='coerce').to_numpy(dtype=float)[present]
+        pending &= ~present
+    return out
+
+
+def normalize_price_column(series):
+    """
+    Convierte una columna de precios a float64.
+    Las columnas numéricas pasan sin recorrerse; en las de tipo object los
+    escalares se convierten con pd.to_numeric y los dicts en bloque.
+    """
+    if series.dtype == np.float64:
+        return series
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.astype(np.float64)
+    values = series.to_numpy(dtype=object)
+    is_dict = np.fromiter((isinstance(v, dict) for v in values), dtype=bool, count=len(values))
+    out = pd.to_numeric(pd.Series(np.where(is_dict, None, values)), errors='coerce').to_numpy(dtype=float)
+    if is_dict.any():
+        out[is_dict] = _dict_prices(values[is_dict].tolist())
+    return pd.Series(out, index=series.index, name=series.name)
+
+
+def normalize_prices(data, columns=PRICE_COLUMNS):
+    """Normaliza las columnas OHLC presentes; sólo copia el DataFrame si alguna cambia."""
+    changed = {}
+    for col in columns:
+        if col in data.columns and data[col].dtype != np.float64:
+            changed[col] = normalize_price_column(data[col])
+    if not changed:
+        return data
+    data = data.copy()
+    for col, values in changed.items():
+        data[col] = values
+    return data
+
+
+def calculate_indicators(data, buffer_days=30, recent_days=None, engine=None):
     """
     Calcula indicadores técnicos esenciales y los agrega a los datos.
     Se realiza sobre los últimos (recent_days + buffer_days) días para asegurar que
     el primer día de recent_days tenga valores completos.
+    Con engine (IndicatorEngine) sólo se procesan las velas que el motor aún no vio.
     """
 
     print("[INFO] Calculando indicadores esenciales...")
@@ -683,32 +840,8 @@ def calculate_indicators(data, buffer_days=30, recent_days=None):
             cutoff_date = idx_max - pd.Timedelta(days=recent_days + buffer_days)
             data = data.loc[data.index >= cutoff_date].copy()
 
-    # Convertir precios de diccionario a valores medios (si es necesario)
-    def _extract_price(x):
-        if isinstance(x, dict):
-            bid = x.get('bid')
-            ask = x.get('ask')
-            if bid is not None and ask is not None:
-                try:
-                    return (float(bid) + float(ask)) / 2.0
-                except Exception:
-                    return np.nan
-            for k in ('close', 'price', 'last'):
-                if k in x:
-                    try:
-                        return float(x.get(k))
-                    except Exception:
-                        return np.nan
-            return np.nan
-        try:
-            return float(x)
-        except Exception:
-            return np.nan
-
-    # Normalizar precios
-    for col in ['Close', 'Open', 'High', 'Low']:
-        if col in data.columns:
-            data[col] = data[col].apply(_extract_price)
+    # Normalizar precios (dicts bid/ask legados de Capital.com → precio medio)
+    data = normalize_prices(data)
 
     if 'Close' in data.columns:
         data = data.dropna(subset=['Close']).copy()
@@ -717,6 +850,12 @@ def calculate_indicators(data, buffer_days=30, recent_days=None):
         print(f"[WARNING] Solo {len(data)} registros, insuficientes para indicadores completos.")
         return data
 
+    if engine is not None:
+        processed = len(engine)
+        data = engine.calculate(data)
+        print(f"[INFO] ✅ Indicadores incrementales para {len(data)} registros ({len(engine) - processed:+d} velas en el motor)")
+        return data
+
     # --- 1️⃣ RSI ---
     print("  Calculando RSI...")
     data['RSI'] = RSIIndicator(data['Close'], window=10).rsi()
@@ -779,7 +918,18 @@ def calculate_indicators(data, buffer_days=30, recent_days=None):
     # --- 🔟 Volume_Ratio ---
     data['Volume_Ratio'] = data['Volume'] / data['Volume'].rolling(window=20, min_periods=1).mean()
 
-    # --- 1️⃣1️⃣ Market_Regime ---
+    # --- 1️⃣1️⃣ Soportes/resistencias y medias de 10 velas (la estrategia sólo lee la última fila) ---
+    # rolling().min()/max() de pandas usa una deque monótona: O(1) amortizado por vela
+    support = data['Low'].rolling(window=SR_WINDOW, min_periods=1).min()
+    resistance = data['High'].rolling(window=SR_WINDOW, min_periods=1).max()
+    data['Support_75'] = support
+    data['Resistance_75'] = resistance
+    data['Dist_Support_Pct'] = ((data['Close'] - support) / support) * 100
+    data['Dist_Resistance_Pct'] = ((resistance - data['Close']) / data['Close']) * 100
+    data['ATR_Mean_10'] = data['ATR'].rolling(window=10).mean()
+    data['Volume_Mean_10'] = data['Volume'].rolling(window=10).mean()
+
+    # --- 1️⃣2️⃣ Market_Regime ---
     data['Market_Regime'] = np.where(data['ADX'] > 25, 'TRENDING',
                                       np.where(data['ADX'] > 20, 'RANGING', 'CHOPPY'))
 
@@ -795,7 +945,8 @@ def prepare_for_export(historical_data, data, mode=None):
     """
     Prepara y exporta ambos DataFrames: históricos y de 1 minuto.
     Trunca a las ventanas móviles especificadas para mantener archivo ligero.
-    El parámetro mode es ignorado internamente (siempre sobreescribe).
+    Parquet: mode="full" reescribe todas las particiones; en otro caso sólo la
+    partición abierta, las nuevas y las que recibieron velas de huecos.
     """
     print("[INFO] Preparando datos para exportación...")
 
@@ -812,53 +963,43 @@ def prepare_for_export(historical_data, data, mode=None):
         if original_ltf > LTF_WINDOW:
             print(f"[INFO] 📊 LTF truncado: {original_ltf} → {LTF_WINDOW} velas (últimas {LTF_WINDOW/60:.1f}h)")
 
-    # Convertir índice Datetime a columna y luego a milisegundos
-    htf_for_json = historical_data.reset_index()
-    ltf_for_json = data.reset_index() if not data.empty else pd.DataFrame()
-
-    if 'Datetime' in htf_for_json.columns:
-        htf_for_json['Datetime'] = htf_for_json['Datetime'].apply(lambda x: int(x.timestamp() * 1000) if pd.notna(x) else 0)
-    if not ltf_for_json.empty and 'Datetime' in ltf_for_json.columns:
-        ltf_for_json['Datetime'] = ltf_for_json['Datetime'].apply(lambda x: int(x.timestamp() * 1000) if pd.notna(x) else 0)
-
-    json_data = {
-        "historical_data": htf_for_json.to_dict(orient="records"),
-        "data": ltf_for_json.to_dict(orient="records") if not ltf_for_json.empty else []
-    }
+    # 🗜️ Esquema compacto (float32/int8/category) una sola vez: se conserva en Parquet y caché compartida
+    historical_data = apply_schema(historical_data, "HTF")
+    data = apply_schema(data, "LTF")
 
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Reports")
     os.makedirs(output_dir, exist_ok=True)
 
     output_file = os.path.join(output_dir, "ETHUSD_CapitalData.json")
 
-    # 💾 GUARDAR EN FORMATO PARQUET (eficiente, rápido) ANTES de convertir a JSON
+    # 💾 GUARDAR EN FORMATO PARQUET particionado (eficiente, rápido) ANTES de convertir a JSON
     try:
+        loader = DataLoader(output_dir)
+        rewrite = mode == "full"
         if not historical_data.empty:
-            htf_parquet = os.path.join(output_dir, 'ethusd_htf_immutable.parquet')
-            historical_data.to_parquet(htf_parquet, compression='snappy', index=True)
-            print(f"[INFO] ✅ Parquet HTF guardado: {len(historical_data)} velas")
+            parts = loader.htf_store.write(historical_data, rewrite=rewrite)
+            loader.publish_shared("HTF", historical_data)
+            print(f"[INFO] ✅ Parquet HTF guardado: {len(historical_data)} velas ({len(parts)} particiones escritas)")
 
         if not data.empty:
-            ltf_parquet = os.path.join(output_dir, 'ethusd_ltf_7d.parquet')
-            data.to_parquet(ltf_parquet, compression='snappy', index=True)
-            print(f"[INFO] ✅ Parquet LTF guardado: {len(data)} velas")
+            parts = loader.ltf_store.write(data, rewrite=rewrite)
+            loader.publish_shared("LTF", data)
+            print(f"[INFO] ✅ Parquet LTF guardado: {len(data)} velas ({len(parts)} particiones escritas)")
     except Exception as e:
         print(f"[WARNING] ⚠️ No se pudo guardar Parquet en prepare_for_export: {e}")
 
-    # 💾 GUARDAR JSON (legacy)
-    with open(output_file, 'w') as f:
-        json.dump(json_data, f, indent=4)
+    # 💾 GUARDAR JSON (legacy) en segundo plano: quien llama no espera a la serialización
+    json_exporter.submit(output_file, [("historical_data", historical_data), ("data", data)], **EPOCH_FORMAT)
+    print(f"[INFO] ✅ Exportación JSON encolada: {output_file}")
 
-    print(f"[INFO] ✅ Datos guardados correctamente en {output_file}")
 
-
-def calculate_ltf_indicators(data):
+def calculate_ltf_indicators(data, engine=None):
     """
     Función específica para calcular indicadores en LTF (Low Time Frame - 1M candles).
     Optimizada para datos de minutos con parámetros más rápidos.
     """
     # Para LTF usamos buffer mínimo ya que son datos de corto plazo
-    return calculate_indicators(data, buffer_days=2, recent_days=None)
+    return calculate_indicators(data, buffer_days=2, recent_days=None, engine=engine)
 
 # Función principal para ejecución como script
 if __name__ == "__main__":
@@ -887,80 +1028,34 @@ if __name__ == "__main__":
 
         # 🔥 CALCULAR INDICADORES (lo que faltaba!)
         print('\n3. Calculando indicadores HTF...')
-        htf_data = calculate_indicators(htf_data, buffer_days=30, recent_days=None)
+        from ParallelBackfill import backfill_indicators
+        htf_data = backfill_indicators(htf_data)
         print(f'   ✅ HTF con indicadores: {len(htf_data)} registros')
 
         print('4. Calculando indicadores LTF...')
         ltf_data = calculate_indicators(ltf_data, buffer_days=2, recent_days=None)
         print(f'   ✅ LTF con indicadores: {len(ltf_data)} registros')
 
-        # Exportar manualmente
+        # Exportar manualmente (columnar, por bloques)
         print('\n5. Exportando datos...')
-        import json
-
-        export_data = {
-            'historical_data': [],
-            'ltf_data': []
-        }
-
-        # Convertir HTF
-        for idx, row in htf_data.iterrows():
-            record = {
-                'timestamp': idx.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
-                'Open': float(row['Open']),
-                'High': float(row['High']),
-                'Low': float(row['Low']),
-                'Close': float(row['Close']),
-                'Volume': float(row['Volume'])
-            }
-            for col in row.index:
-                if col not in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                    try:
-                        record[col] = float(row[col]) if pd.notna(row[col]) else 0.0
-                    except:
-                        record[col] = 0.0
-            export_data['historical_data'].append(record)
-
-        # Convertir LTF
-        for idx, row in ltf_data.iterrows():
-            record = {
-                'timestamp': idx.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
-                'Open': float(row['Open']),
-                'High': float(row['High']),
-                'Low': float(row['Low']),
-                'Close': float(row['Close']),
-                'Volume': float(row['Volume'])
-            }
-            for col in row.index:
-                if col not in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                    try:
-                        record[col] = float(row[col]) if pd.notna(row[col]) else 0.0
-                    except:
-                        record[col] = 0.0
-            export_data['ltf_data'].append(record)
-
-        # Guardar JSON (legacy)
         output_path = os.path.join(os.path.dirname(__file__), "Reports", "ETHUSD_CapitalData.json")
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        counts = write_json_export(output_path, [('historical_data', htf_data), ('ltf_data', ltf_data)], **LEGACY_FORMAT)
 
-        with open(output_path, 'w') as f:
-            json.dump(export_data, f, indent=2)
-
-        print(f'✅ JSON exportado: {len(export_data["historical_data"])} HTF + {len(export_data["ltf_data"])} LTF')
+        print(f'✅ JSON exportado: {counts["historical_data"]} HTF + {counts["ltf_data"]} LTF')
 
         # 🔥 GUARDAR PARQUET (principal)
         print('\n6. Guardando archivos Parquet...')
         reports_dir = os.path.join(os.path.dirname(__file__), "Reports")
 
-        # HTF Parquet
-        htf_parquet_path = os.path.join(reports_dir, "ethusd_htf_immutable.parquet")
-        htf_data.to_parquet(htf_parquet_path, engine='pyarrow', compression='snappy')
-        print(f'   ✅ HTF guardado: {htf_parquet_path} ({len(htf_data)} velas)')
+        loader = DataLoader(reports_dir)
+
+        # HTF Parquet (particiones mensuales)
+        loader.htf_store.write(htf_data, rewrite=True)
+        print(f'   ✅ HTF guardado: {loader.htf_store.root} ({len(htf_data)} velas)')
 
-        # LTF Parquet
-        ltf_parquet_path = os.path.join(reports_dir, "ethusd_ltf_7d.parquet")
-        ltf_data.to_parquet(ltf_parquet_path, engine='pyarrow', compression='snappy')
-        print(f'   ✅ LTF guardado: {ltf_parquet_path} ({len(ltf_data)} velas)')
+        # LTF Parquet (particiones diarias)
+        loader.ltf_store.write(ltf_data, rewrite=True)
+        print(f'   ✅ LTF guardado: {loader.ltf_store.root} ({len(ltf_data)} velas)')
 
         print('\n🚀 DATAETH COMPLETADO EXITOSAMENTE')
 
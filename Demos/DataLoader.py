@@ -4,10 +4,40 @@ Compatible con toda la arquitectura existente del proyecto.
 """
 import os
 import json
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import pytz
 
+from CandleStore import CandleStore
+from CandleSchema import apply_schema
+from IndicatorEngine import INDICATOR_VERSION
+from SharedCandles import shared_cache
+from LiveRing import CandleRing, FIELDS as LIVE_FIELDS
+
+# Caché de load_historical_data por directorio, invalidada por cambios en las fuentes
+# (no por tiempo): {reports_dir: {'signature', 'versions', 'htf', 'ltf'}}
+_frame_cache = {}
+_frame_cache_lock = threading.Lock()
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _select(df, columns=None, tail=None, start=None, end=None):
+    """Recorta columnas, rango [start, end] y últimas `tail` filas de un DataFrame de velas."""
+    if df is None or df.empty:
+        return pd.DataFrame() if df is None else df
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    if start is not None or end is not None:
+        tz = df.index.tz
+        bounds = [None if t is None else pd.Timestamp(t) for t in (start, end)]
+        bounds = [t.tz_localize(tz) if t is not None and t.tz is None and tz is not None else t for t in bounds]
+        df = df.loc[bounds[0]:bounds[1]]
+    if tail is not None:
+        df = df.iloc[-tail:] if tail else df.iloc[:0]
+    return df
+
 
 class DataLoader:
     """
@@ -25,10 +55,166 @@ class DataLoader:
         # Rutas de archivos
         self.htf_parquet = os.path.join(self.reports_dir, "ethusd_htf_immutable.parquet")
         self.ltf_parquet = os.path.join(self.reports_dir, "ethusd_ltf_7d.parquet")
-        self.live_json = os.path.join(self.reports_dir, "ethusd_live.json")
+        self.live_json = os.path.join(self.reports_dir, "ethusd_live.json")   # legacy (sólo lectura)
+        self.live_ring = CandleRing(os.path.join(self.reports_dir, "ethusd_live.ring"))
         self.legacy_json = os.path.join(self.reports_dir, "ETHUSD_CapitalData.json")
 
-    def load_historical_data(self):
+        # Almacén particionado (mensual HTF / diario LTF); los .parquet únicos quedan como fallback
+        self.htf_store = CandleStore(os.path.join(self.reports_dir, "candles", "htf"), partition="month",
+                                     indicator_version=INDICATOR_VERSION)
+        self.ltf_store = CandleStore(os.path.join(self.reports_dir, "candles", "ltf"), partition="day",
+                                     indicator_version=INDICATOR_VERSION)
+        # Copia mapeada en memoria compartida entre procesos (EthBoy, Evaluador, scripts)
+        self.shared = shared_cache(os.path.join(self.reports_dir, "shared_candles"))
+
+    def _store(self, timeframe):
+        return self.htf_store if timeframe == "HTF" else self.ltf_store
+
+    def has_parquet(self):
+        """True si hay datos Parquet (almacén particionado o archivos únicos legacy)."""
+        stores = self.htf_store.exists() and self.ltf_store.exists()
+        return stores or (os.path.exists(self.htf_parquet) and os.path.exists(self.ltf_parquet))
+
+    def _publish(self, timeframe, df, version):
+        try:
+            self.shared.publish(timeframe, df, version)
+        except Exception as e:
+            ui = getattr(self, 'ui', None)
+            if ui:
+                ui.add_log(f"[WARNING] ⚠️ No se pudo publicar la caché compartida {timeframe}: {e}", style="dim")
+
+    def publish_shared(self, timeframe, df):
+        """Publica df (recién escrito en el almacén) en la caché compartida con la versión del manifiesto."""
+        store = self._store(timeframe)
+        if store.exists() and df is not None and not df.empty:
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            self._publish(timeframe, df, store.load_manifest()['version'])
+
+    def load_frame(self, timeframe="HTF"):
+        """
+        Lee el DataFrame HTF o LTF desde el almacén particionado,
+        o desde el Parquet único legacy si aún no se migró.
+        """
+        store = self._store(timeframe)
+        if store.exists():
+            # Caché compartida (memoria mapeada) si corresponde a la versión actual del almacén
+            version = store.load_manifest()['version']
+            shared = self.shared.attach(timeframe, version)
+            if shared is not None:
+                return shared
+            df = store.read()
+            self._publish(timeframe, df, version)
+            return df
+        path = self.htf_parquet if timeframe == "HTF" else self.ltf_parquet
+        df = pd.read_parquet(path)
+        if df.index.tz is None:
+            df.index = df.index.tz_localize('UTC')
+        return df
+
+    def query(self, timeframe="HTF", columns=None, tail=None, start=None, end=None, live=True):
+        """
+        Lectura parcial de HTF/LTF: sólo `columns` (todas si None) y las últimas
+        `tail` velas o el rango [start, end]. Si la caché compartida está al día
+        se recorta sobre el mapeo; si no, los filtros llegan al lector Parquet
+        (particiones, grupos de filas y columnas) sin cargar la ventana completa.
+        En LTF se incluyen las velas live salvo live=False.
+
+        Returns:
+            DataFrame con índice Datetime UTC (vacío si no hay datos)
+        """
+        store = self._store(timeframe)
+        if store.exists():
+            manifest = store.load_manifest()
+            if columns is not None:
+                stored = manifest.get('columns') or []
+                columns = [c for c in columns if c in stored]
+            df = self.shared.attach(timeframe, manifest['version'])
+            if df is not None:
+                df = _select(df, columns, tail, start, end)
+            elif tail is not None and start is None and end is None:
+                df = store.tail(tail, columns)
+            else:
+                df = _select(store.read(start, end, columns), None, tail, None, None)
+        else:
+            path = self.htf_parquet if timeframe == "HTF" else self.ltf_parquet
+            if not os.path.exists(path):
+                df = pd.DataFrame()
+            else:
+                df = pd.read_parquet(path)
+                if df.index.tz is None:
+                    df.index = df.index.tz_localize('UTC')
+                df = _select(df, columns, tail, start, end)
+
+        if timeframe == "LTF" and live:
+            df = _select(self._merge_live_data(df), columns, tail, start, end)
+        return df
+
+    def freshness(self, timeframe="HTF"):
+        """
+        Última vela y su antigüedad desde el manifiesto (sin leer velas).
+
+        Returns:
+            dict {'newest': Timestamp, 'age_minutes': float, 'rows': int} o None si no hay almacén
+        """
+        summary = self._store(timeframe).summary()
+        if not summary.get('exists') or not summary.get('newest'):
+            return None
+        return {'newest': pd.Timestamp(summary['newest']), 'age_minutes': summary['age_minutes'],
+                'rows': summary['rows']}
+
+    def _source_signature(self):
+        """(ruta, mtime_ns, tamaño) de cada fuente; cambia en cuanto DataEth escribe algo."""
+        signature = []
+        for path in (self.htf_store.manifest_path, self.ltf_store.manifest_path,
+                     self.htf_parquet, self.ltf_parquet, self.live_json, self.legacy_json):
+            try:
+                st = os.stat(path)
+                signature.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        # El buffer live se escribe en su sitio: la secuencia de cabecera delata cada escritura
+        signature.append((self.live_ring.path, self.live_ring.version()))
+        return tuple(signature)
+
+    def _manifest_versions(self):
+        return {tf: self._store(tf).load_manifest()['version'] for tf in ("HTF", "LTF") if self._store(tf).exists()}
+
+    @staticmethod
+    def cache_info():
+        """Contadores de la caché de load_historical_data (para monitorización)."""
+        with _frame_cache_lock:
+            total = cache_stats['hits'] + cache_stats['misses']
+            info = dict(cache_stats)
+            info['hit_ratio'] = round(cache_stats['hits'] / total, 3) if total else 0.0
+            info['entries'] = {d: e['versions'] for d, e in _frame_cache.items()}
+            return info
+
+    @staticmethod
+    def invalidate_cache():
+        with _frame_cache_lock:
+            _frame_cache.clear()
+
+    def load_historical_data(self, use_cache=True):
+        """
+        Igual que _load_historical_data_uncached() pero sin E/S si ninguna fuente
+        cambió desde la última carga (mtime/tamaño de manifiestos, Parquet y JSON).
+        Devuelve copias superficiales: añadir columnas no altera la caché.
+        """
+        signature = self._source_signature()
+        with _frame_cache_lock:
+            entry = _frame_cache.get(self.reports_dir)
+            if use_cache and entry is not None and entry['signature'] == signature:
+                cache_stats['hits'] += 1
+                return entry['htf'].copy(deep=False), entry['ltf'].copy(deep=False)
+            cache_stats['misses'] += 1
+
+        historical_data, data = self._load_historical_data_uncached()
+        with _frame_cache_lock:
+            _frame_cache[self.reports_dir] = {'signature': signature, 'versions': self._manifest_versions(),
+                                              'htf': historical_data, 'ltf': data}
+        return historical_data.copy(deep=False), data.copy(deep=False)
+
+    def _load_historical_data_uncached(self):
         """
         Carga datos históricos (HTF) y datos de 1M (LTF).
         Prioriza Parquet, fallback a JSON legacy.
@@ -41,18 +227,13 @@ class DataLoader:
             ui.add_log(f"[INFO] 🔍 Buscando datos en {self.reports_dir}...", style="dim")
 
         # Intentar cargar desde Parquet (preferido)
-        if os.path.exists(self.htf_parquet) and os.path.exists(self.ltf_parquet):
+        if self.has_parquet():
             try:
                 ui = getattr(self, 'ui', None)
                 if ui:
                     ui.add_log("[INFO] 📊 Cargando desde Parquet (modo eficiente)...", style="dim")
-                historical_data = pd.read_parquet(self.htf_parquet)
-                ltf_base = pd.read_parquet(self.ltf_parquet)
-                # Asegurar que los índices sean tz-aware (UTC)
-                if historical_data.index.tz is None:
-                    historical_data.index = historical_data.index.tz_localize('UTC')
-                if ltf_base.index.tz is None:
-                    ltf_base.index = ltf_base.index.tz_localize('UTC')
+                historical_data = self.load_frame("HTF")
+                ltf_base = self.load_frame("LTF")
 
                 # Merge con live data si existe
                 data = self._merge_live_data(ltf_base)
@@ -184,8 +365,8 @@ class DataLoader:
                 if ui:
                     ui.add_log(f"[INFO] ✅ JSON OK: {len(historical_data)} HTF + {len(data)} LTF", style="dim")
 
-                # Devolver datos procesados
-                return historical_data, data
+                # Devolver datos procesados (mismo esquema compacto que el almacén; sin informe por consola)
+                return apply_schema(historical_data), apply_schema(data)
 
             except Exception as e:
                 ui = getattr(self, 'ui', None)
@@ -195,9 +376,66 @@ class DataLoader:
         # Si llegamos aquí, no se pudo cargar ningún archivo
         return pd.DataFrame(), pd.DataFrame()
 
+    def load_index(self, timeframe="HTF"):
+        """
+        Lee sólo el índice Datetime del Parquet HTF o LTF (sin columnas).
+
+        Args:
+            timeframe: "HTF" o "LTF"
+
+        Returns:
+            DatetimeIndex UTC (vacío si el archivo no existe o no se puede leer)
+        """
+        path = self.htf_parquet if timeframe == "HTF" else self.ltf_parquet
+        store = self._store(timeframe)
+        empty = pd.DatetimeIndex([], tz='UTC', name='Datetime')
+        if not store.exists() and not os.path.exists(path):
+            return empty
+        try:
+            if store.exists():
+                return store.read_index()
+            index = pd.read_parquet(path, columns=[]).index
+            if not isinstance(index, pd.DatetimeIndex):
+                return empty
+            if index.tz is None:
+                index = index.tz_localize('UTC')
+            return index
+        except Exception as e:
+            ui = getattr(self, 'ui', None)
+            if ui:
+                ui.add_log(f"[WARNING] ⚠️ Error al leer índice Parquet: {e}", style="dim")
+            return empty
+
+    def _live_frame(self):
+        """Velas live como DataFrame (buffer binario; ethusd_live.json legacy si aún no existe)."""
+        if self.live_ring.exists():
+            records = self.live_ring.latest()
+            if len(records) == 0:
+                return pd.DataFrame()
+            index = pd.DatetimeIndex(pd.to_datetime(records[:, 0].astype(np.int64), unit="ms", utc=True), name="Datetime")
+            return pd.DataFrame(records[:, 1:], index=index, columns=list(LIVE_FIELDS[1:]))
+        if not os.path.exists(self.live_json):
+            return pd.DataFrame()
+        with open(self.live_json, "r") as f:
+            live_data = json.load(f)
+        if not live_data:
+            return pd.DataFrame()
+        live_df = pd.DataFrame(live_data)
+        if "Datetime" in live_df.columns:
+            live_df["Datetime"] = pd.to_datetime(live_df["Datetime"], unit="ms", errors="coerce")
+            live_df.dropna(subset=["Datetime"], inplace=True)
+            # 🔥 ELIMINAR DUPLICADOS ANTES de set_index
+            live_df = live_df[~live_df["Datetime"].duplicated(keep='last')]
+            live_df.set_index("Datetime", inplace=True)
+            if live_df.index.tz is None:
+                live_df.index = live_df.index.tz_localize('UTC')
+            live_df.sort_index(inplace=True)
+        return live_df
+
     def _merge_live_data(self, ltf_base):
         """
         Agrega datos live (últimas 100 velas) al LTF base.
+        Sólo se reordena la cola del LTF que se solapa con las velas live.
 
         Args:
             ltf_base: DataFrame LTF desde Parquet
@@ -206,28 +444,17 @@ class DataLoader:
             DataFrame: LTF actualizado con datos live
         """
         try:
-            if not os.path.exists(self.live_json):
+            live_df = self._live_frame()
+            if live_df.empty:
                 # No hay datos live, retornar base
                 return ltf_base
-            with open(self.live_json, "r") as f:
-                live_data = json.load(f)
-            if not live_data:
-                return ltf_base
-            # Convertir a DataFrame
-            live_df = pd.DataFrame(live_data)
-            if "Datetime" in live_df.columns:
-                live_df["Datetime"] = pd.to_datetime(live_df["Datetime"], unit="ms", errors="coerce")
-                live_df.dropna(subset=["Datetime"], inplace=True)
-                # 🔥 ELIMINAR DUPLICADOS ANTES de set_index
-                live_df = live_df[~live_df["Datetime"].duplicated(keep='last')]
-                live_df.set_index("Datetime", inplace=True)
-                if live_df.index.tz is None:
-                    live_df.index = live_df.index.tz_localize('UTC')
-                live_df.sort_index(inplace=True)
-            # Merge: priorizar live data (drop duplicates keepin last)
-            merged = pd.concat([ltf_base, live_df])
-            merged = merged[~merged.index.duplicated(keep='last')]
-            merged.sort_index(inplace=True)
+            if ltf_base is None or ltf_base.empty or not isinstance(ltf_base.index, pd.DatetimeIndex):
+                return live_df
+            # Merge: priorizar live data (drop duplicates keeping last) sólo en la cola
+            cut = ltf_base.index.searchsorted(live_df.index[0])
+            tail = pd.concat([ltf_base.iloc[cut:], live_df])
+            tail = tail[~tail.index.duplicated(keep='last')].sort_index()
+            merged = pd.concat([ltf_base.iloc[:cut], tail]) if cut else tail
             ui = getattr(self, 'ui', None)
             if ui:
                 ui.add_log(f"[INFO] 🔄 Merged {len(live_df)} velas live", style="dim")
@@ -240,58 +467,40 @@ class DataLoader:
 
     def save_to_parquet(self, historical_data, data, update_mode="full"):
         """
-        Guarda datos en formato Parquet.
+        Guarda datos en el almacén Parquet particionado.
 
         Args:
             historical_data: DataFrame HTF
             data: DataFrame LTF
-            update_mode: "full" (regenerar todo) o "append" (solo nuevas velas)
+            update_mode: "full" (regenerar todas las particiones),
+                         "incremental" (ventana completa; sólo particiones abiertas/nuevas)
+                         o "append" (fusionar velas sueltas con sus particiones)
         """
         os.makedirs(self.reports_dir, exist_ok=True)
 
         try:
-            if update_mode == "full":
-                # Regenerar archivos completos
-                historical_data.to_parquet(self.htf_parquet, compression='snappy')
-                data.to_parquet(self.ltf_parquet, compression='snappy')
+            historical_data = apply_schema(historical_data)
+            data = apply_schema(data)
+            if update_mode in ("full", "incremental"):
+                rewrite = update_mode == "full"
+                htf_parts = self.htf_store.write(historical_data, rewrite=rewrite)
+                ltf_parts = self.ltf_store.write(data, rewrite=rewrite)
+                self.publish_shared("HTF", historical_data)
+                self.publish_shared("LTF", data)
                 ui = getattr(self, 'ui', None)
                 if ui:
-                    ui.add_log(f"[INFO] ✅ Parquet guardado: {len(historical_data)} HTF + {len(data)} LTF", style="dim")
+                    ui.add_log(f"[INFO] ✅ Parquet guardado: {len(historical_data)} HTF + {len(data)} LTF "
+                               f"({len(htf_parts)}+{len(ltf_parts)} particiones escritas)", style="dim")
             elif update_mode == "append":
-                # Append incremental (HTF)
-                if os.path.exists(self.htf_parquet):
-                    existing_htf = pd.read_parquet(self.htf_parquet)
-                    if existing_htf.index.tz is None:
-                        existing_htf.index = existing_htf.index.tz_localize('UTC')
-                    # Solo agregar nuevas velas
-                    new_htf = historical_data[~historical_data.index.isin(existing_htf.index)]
-                    if not new_htf.empty:
-                        updated_htf = pd.concat([existing_htf, new_htf])
-                        updated_htf.sort_index(inplace=True)
-                        updated_htf.to_parquet(self.htf_parquet, compression='snappy')
-                        ui = getattr(self, 'ui', None)
-                        if ui:
-                            ui.add_log(f"[INFO] ✅ HTF actualizado: +{len(new_htf)} velas", style="dim")
-                else:
-                    historical_data.to_parquet(self.htf_parquet, compression='snappy')
-                # LTF: mantener solo últimos 7 días
-                if os.path.exists(self.ltf_parquet):
-                    existing_ltf = pd.read_parquet(self.ltf_parquet)
-                    if existing_ltf.index.tz is None:
-                        existing_ltf.index = existing_ltf.index.tz_localize('UTC')
-                    combined_ltf = pd.concat([existing_ltf, data])
-                    combined_ltf = combined_ltf[~combined_ltf.index.duplicated(keep='last')]
-                    combined_ltf.sort_index(inplace=True)
-                    # Truncar a 3 días
-                    cutoff = datetime.now(pytz.UTC) - timedelta(days=3)
-                    cutoff = pd.Timestamp(cutoff)
-                    combined_ltf = combined_ltf[combined_ltf.index >= cutoff]
-                    combined_ltf.to_parquet(self.ltf_parquet, compression='snappy')
-                    ui = getattr(self, 'ui', None)
-                    if ui:
-                        ui.add_log(f"[INFO] ✅ LTF actualizado: {len(combined_ltf)} velas (3 días)", style="dim")
-                else:
-                    data.to_parquet(self.ltf_parquet, compression='snappy')
+                # Append incremental (HTF): sólo se reescriben las particiones de las velas recibidas
+                htf_parts = self.htf_store.append(historical_data)
+                # LTF: mantener solo últimos 3 días (retención por particiones diarias)
+                cutoff = pd.Timestamp(datetime.now(pytz.UTC) - timedelta(days=3))
+                self.ltf_store.append(data, keep_from=cutoff)
+                ui = getattr(self, 'ui', None)
+                if ui:
+                    ui.add_log(f"[INFO] ✅ HTF actualizado: {len(historical_data)} velas en {len(htf_parts)} particiones", style="dim")
+                    ui.add_log(f"[INFO] ✅ LTF actualizado: {len(data)} velas (3 días)", style="dim")
         except Exception as e:
             ui = getattr(self, 'ui', None)
             if ui:
@@ -299,32 +508,31 @@ class DataLoader:
 
     def update_live_cache(self, new_candles):
         """
-        Actualiza el cache de velas live (últimas 100).
+        Actualiza el buffer binario de velas live (últimas 100), O(1) por vela.
 
         Args:
             new_candles: list de dicts o DataFrame con nuevas velas
         """
         try:
-            # Convertir a lista de dicts si es DataFrame
-            if isinstance(new_candles, pd.DataFrame):
-                new_candles = new_candles.reset_index().to_dict('records')
-            # Cargar cache existente
-            if os.path.exists(self.live_json):
-                with open(self.live_json, "r") as f:
-                    live_cache = json.load(f)
+            frame = new_candles if isinstance(new_candles, pd.DataFrame) else pd.DataFrame(list(new_candles))
+            if frame.empty:
+                return
+            if isinstance(frame.index, pd.DatetimeIndex):
+                times = frame.index
             else:
-                live_cache = []
-            # Agregar nuevas velas
-            live_cache.extend(new_candles)
-            # Mantener solo últimas 100
-            if len(live_cache) > 100:
-                live_cache = live_cache[-100:]
-            # Guardar
-            with open(self.live_json, "w") as f:
-                json.dump(live_cache, f, indent=2)
+                raw = frame["Datetime"]
+                times = pd.to_datetime(raw, unit="ms", utc=True) if pd.api.types.is_numeric_dtype(raw) else pd.to_datetime(raw, utc=True)
+                times = pd.DatetimeIndex(times)
+            times = times.tz_localize('UTC') if times.tz is None else times.tz_convert('UTC')
+            records = np.empty((len(frame), len(LIVE_FIELDS)))
+            records[:, 0] = times.as_unit('ms').asi8
+            for i, col in enumerate(LIVE_FIELDS[1:], start=1):
+                records[:, i] = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=float) if col in frame.columns else np.nan
+            records = records[np.argsort(records[:, 0], kind='stable')]
+            written = self.live_ring.append(records)
             ui = getattr(self, 'ui', None)
             if ui:
-                ui.add_log(f"[INFO] 🔄 Live cache actualizado: {len(live_cache)} velas", style="dim")
+                ui.add_log(f"[INFO] 🔄 Live cache actualizado: +{written} velas", style="dim")
         except Exception as e:
             ui = getattr(self, 'ui', None)
             if ui:
@@ -336,35 +544,38 @@ class DataLoader:
         """
         stats = {}
 
-        # Parquet HTF
-        if os.path.exists(self.htf_parquet):
-            size_mb = os.path.getsize(self.htf_parquet) / 1024 / 1024
-            df = pd.read_parquet(self.htf_parquet)
-            stats['htf_parquet'] = {
-                'exists': True,
-                'size_mb': round(size_mb, 2),
-                'rows': len(df),
-                'oldest': str(df.index.min()),
-                'newest': str(df.index.max())
-            }
-        else:
-            stats['htf_parquet'] = {'exists': False}
+        # Almacén particionado: todo desde el manifiesto
+        stats['htf_store'] = self.htf_store.summary()
+        stats['ltf_store'] = self.ltf_store.summary()
+
+        # Parquet únicos legacy: sólo la columna del índice
+        for key, path in (('htf_parquet', self.htf_parquet), ('ltf_parquet', self.ltf_parquet)):
+            if os.path.exists(path):
+                index = pd.read_parquet(path, columns=[]).index
+                stats[key] = {
+                    'exists': True,
+                    'size_mb': round(os.path.getsize(path) / 1024 / 1024, 2),
+                    'rows': len(index),
+                    'oldest': str(index.min()),
+                    'newest': str(index.max())
+                }
+            else:
+                stats[key] = {'exists': False}
 
-        # Parquet LTF
-        if os.path.exists(self.ltf_parquet):
-            size_mb = os.path.getsize(self.ltf_parquet) / 1024 / 1024
-            df = pd.read_parquet(self.ltf_parquet)
-            stats['ltf_parquet'] = {
+        # Live (buffer binario)
+        header = self.live_ring.header()
+        if header is not None:
+            capacity, total, _ = header
+            stats['live_ring'] = {
                 'exists': True,
-                'size_mb': round(size_mb, 2),
-                'rows': len(df),
-                'oldest': str(df.index.min()),
-                'newest': str(df.index.max())
+                'size_kb': round(os.path.getsize(self.live_ring.path) / 1024, 2),
+                'candles': min(total, capacity),
+                'capacity': capacity
             }
         else:
-            stats['ltf_parquet'] = {'exists': False}
+            stats['live_ring'] = {'exists': False}
 
-        # Live JSON
+        # Live JSON (legacy)
         if os.path.exists(self.live_json):
             size_kb = os.path.getsize(self.live_json) / 1024
             with open(self.live_json, "r") as f:
@@ -16,6 +16,12 @@ from TimingHelper import TimingOptimizer  # 🔹 NUEVO: Timing preciso con 1M
 from threading import Lock
 from state import BotState
 from DataLoader import DataLoader  # 🔹 NUEVO: Loader híbrido Parquet + JSON
+from JsonExport import json_exporter, LEGACY_FORMAT
+from CandleSchema import json_default, memory_report
+from ParallelBackfill import backfill_indicators
+from MarketContextEngine import MarketContextEngine, empty_context
+from TimeframeViews import timeframe_views
+from ContextBus import context_bus
 from MomentumHub import add_tick, get_metrics
 import os
 # Intentar importar el cliente de streaming JSON
@@ -24,9 +30,6 @@ try:
 except Exception:
     LightMinimal = None
 
-# Cache para DataLoader (recargar cada 60s)
-_dl_cache = {'time': 0, 'htf': None, 'ltf': None}
-
 # IPC file path para compartir último tick entre procesos
 TICK_IPC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "momentum_tick.json")
  
@@ -286,6 +289,7 @@ class TradingOperator:
         self.data_lock = Lock()
         self.historical_data = None
         self.timing_optimizer = TimingOptimizer()  # 🔹 NUEVO: Optimizador de timing
+        self.market_context_engine = MarketContextEngine()  # BB/squeeze/DI incrementales sobre el HTF
         # Timestamp del último tick recibido (epoch seconds)
         self._last_tick_ts = 0
         # Cache de última ejecución de DataEth.py (evita llamadas excesivas)
@@ -313,7 +317,7 @@ class TradingOperator:
                 entry['values'] = self._current_indicators
             filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "process_data.jsonl")
             with open(filepath, 'a', encoding='utf-8') as fh:
-                json.dump(entry, fh, ensure_ascii=False)
+                json.dump(entry, fh, ensure_ascii=False, default=json_default)  # indicadores float32/int8
                 fh.write("\n")
         except Exception as e:
             # 🔴 NO silenciar errores - registrar en consola siempre
@@ -351,7 +355,7 @@ class TradingOperator:
                 }
             }
             with open(snap_file, 'w', encoding='utf-8') as f:
-                json.dump(snapshots, f, indent=2, ensure_ascii=False)
+                json.dump(snapshots, f, indent=2, ensure_ascii=False, default=json_default)
         except Exception as e:
             logging.warning(f"[WARNING] No se pudo guardar entry snapshot: {e}")
 
@@ -448,58 +452,8 @@ class TradingOperator:
             ui.add_log(f"[INFO] ✅ HTF updater iniciado (intervalo: {self.htf_update_interval/3600:.1f}h)")
     
     def _manual_export_data(self, htf_data, ltf_data, output_file):
-        """Exportación manual de datos para evitar problemas con prepare_for_export"""
-        import json
-        import pandas as pd
-        
-        export_data = {
-            'historical_data': [],
-            'ltf_data': []
-        }
-        
-        # Convertir HTF a lista de dicts con timestamps
-        if not htf_data.empty:
-            for idx, row in htf_data.iterrows():
-                record = {
-                    'timestamp': idx.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
-                    'Open': float(row['Open']),
-                    'High': float(row['High']),
-                    'Low': float(row['Low']),
-                    'Close': float(row['Close']),
-                    'Volume': float(row['Volume'])
-                }
-                # Agregar indicadores si existen
-                for col in row.index:
-                    if col not in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                        try:
-                            record[col] = float(row[col]) if pd.notna(row[col]) else 0.0
-                        except:
-                            record[col] = 0.0
-                export_data['historical_data'].append(record)
-        
-        # Convertir LTF a lista de dicts con timestamps
-        if not ltf_data.empty:
-            for idx, row in ltf_data.iterrows():
-                record = {
-                    'timestamp': idx.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
-                    'Open': float(row['Open']),
-                    'High': float(row['High']),
-                    'Low': float(row['Low']),
-                    'Close': float(row['Close']),
-                    'Volume': float(row['Volume'])
-                }
-                # Agregar indicadores si existen
-                for col in row.index:
-                    if col not in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                        try:
-                            record[col] = float(row[col]) if pd.notna(row[col]) else 0.0
-                        except:
-                            record[col] = 0.0
-                export_data['ltf_data'].append(record)
-        
-        # Guardar archivo
-        with open(output_file, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        """Exportación manual de datos para evitar problemas con prepare_for_export (JSON en segundo plano)"""
+        json_exporter.submit(output_file, [('historical_data', htf_data), ('ltf_data', ltf_data)], **LEGACY_FORMAT)
 
     def _log_dataeth_health(self, run_type, duration_s, htf_rows, ltf_rows, status, error=None):
         """Persiste cada ejecución de DataEth en dataeth_health.json para el dashboard."""
@@ -513,6 +467,10 @@ class TradingOperator:
         }
         if error:
             entry["error"] = str(error)[:300]
+        _cache = DataLoader.cache_info()
+        entry["loader_cache"] = {k: _cache[k] for k in ("hits", "misses", "hit_ratio")}
+        if memory_report:
+            entry["frame_memory"] = dict(memory_report)   # MB antes/después del esquema compacto
         try:
             try:
                 with open(self.dataeth_health_file, "r", encoding="utf-8") as _f:
@@ -547,11 +505,7 @@ class TradingOperator:
                     if ui:
                         ui.add_log(f"[INFO] ⏭️  DataEth.py ejecutado hace {elapsed:.1f}min. Saltando actualización.")
                     # Recargar desde cache DataLoader
-                    if time.time() - _dl_cache['time'] > 60:
-                        loader = DataLoader()
-                        _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                        _dl_cache['time'] = time.time()
-                    self.historical_data = _dl_cache['htf']
+                    self.historical_data, _ = DataLoader().load_historical_data()
                     return
             
             script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -580,33 +534,40 @@ class TradingOperator:
                 
                 ui = getattr(self, 'ui', None)
                 if ui:
-                    ui.add_log(f"[INFO] 📊 DataEth: Descargando datos HTF (5 años)...")
+                    ui.add_log(f"[INFO] 📊 DataEth: Sincronizando huecos HTF (5 años)...")
                 else:
-                    logging.info(f"[INFO] 📊 DataEth: Descargando datos HTF (5 años)...")
+                    logging.info(f"[INFO] 📊 DataEth: Sincronizando huecos HTF (5 años)...")
                 
                 # Configurar fechas como en DataEth.py
                 end_date = datetime.now(timezone.utc)
                 htf_start = end_date - timedelta(days=5*365)  # 5 años para HTF
                 ltf_start = end_date - timedelta(days=7)      # 7 días para LTF
                 
+                # 🔹 SYNC INCREMENTAL: descargar sólo huecos + cola respecto al Parquet existente
+                loader = DataLoader()
+                existing_htf, existing_ltf = loader.load_historical_data()
+
                 # Descargar HTF
-                htf_data, htf_meta = DataEth.download_data_capital('ETHUSD', 'HOUR', htf_start, end_date)
+                htf_new = DataEth.sync_missing('HOUR', htf_start, end_date, existing_htf.index if not existing_htf.empty else None)
                 if ui:
-                    ui.add_log(f"[INFO] ✅ HTF descargado: {len(htf_data)} registros")
+                    ui.add_log(f"[INFO] ✅ HTF descargado: {len(htf_new)} registros nuevos")
                 else:
-                    logging.info(f"[INFO] ✅ HTF descargado: {len(htf_data)} registros")
+                    logging.info(f"[INFO] ✅ HTF descargado: {len(htf_new)} registros nuevos")
                 
                 # Descargar LTF
                 if ui:
-                    ui.add_log(f"[INFO] 📊 DataEth: Descargando datos LTF (7 días)...")
+                    ui.add_log(f"[INFO] 📊 DataEth: Sincronizando huecos LTF (7 días)...")
                 else:
-                    logging.info(f"[INFO] 📊 DataEth: Descargando datos LTF (7 días)...")
+                    logging.info(f"[INFO] 📊 DataEth: Sincronizando huecos LTF (7 días)...")
                     
-                ltf_data, ltf_meta = DataEth.download_data_capital('ETHUSD', 'MINUTE', ltf_start, end_date)
+                ltf_new = DataEth.sync_missing('MINUTE', ltf_start, end_date, existing_ltf.index if not existing_ltf.empty else None)
                 if ui:
-                    ui.add_log(f"[INFO] ✅ LTF descargado: {len(ltf_data)} registros")
+                    ui.add_log(f"[INFO] ✅ LTF descargado: {len(ltf_new)} registros nuevos")
                 else:
-                    logging.info(f"[INFO] ✅ LTF descargado: {len(ltf_data)} registros")
+                    logging.info(f"[INFO] ✅ LTF descargado: {len(ltf_new)} registros nuevos")
+
+                htf_data = DataEth.merge_candles(existing_htf, htf_new, htf_start)
+                ltf_data = DataEth.merge_candles(existing_ltf, ltf_new, ltf_start)
                 
                 # Validar que se descargaron datos
                 if len(htf_data) == 0 and len(ltf_data) == 0:
@@ -623,7 +584,7 @@ class TradingOperator:
                     logging.info(f"[INFO] 📊 Calculando indicadores técnicos...")
                 
                 if len(htf_data) > 0:
-                    htf_data = DataEth.calculate_indicators(htf_data)
+                    htf_data = backfill_indicators(htf_data)   # 5 años: por bloques en paralelo
                 if len(ltf_data) > 0:
                     ltf_data = DataEth.calculate_ltf_indicators(ltf_data)
                 
@@ -662,9 +623,7 @@ class TradingOperator:
  
             # 🔹 USAR DataLoader (fuerza recarga post-DataEth)
             loader = DataLoader()
-            _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-            _dl_cache['time'] = time.time()
-            self.historical_data = _dl_cache['htf']
+            self.historical_data, _ = loader.load_historical_data()
             
             if self.historical_data.empty:
                 ui = getattr(self, 'ui', None)
@@ -788,14 +747,15 @@ class TradingOperator:
                 _last_live_price = [None]  # lista mutable para compartir entre scopes
 
                 def tick_poller():
-                    import requests as _req
-                    _session = _req.Session()
+                    from RateLimiter import RateLimitedSession, rate_limiter
+                    # Comparte los token buckets por host con DataEth (misma cuota Binance/Kraken)
+                    _session = RateLimitedSession(rate_limiter)
                     _session.headers.update({"User-Agent": "EthBoy/1.0"})
                     while True:
                         price = None
                         try:
                             # Intento 1: Binance ticker (sin auth, ~50ms)
-                            r = _session.get(_BINANCE_TICKER, timeout=2)
+                            r = _session.get(_BINANCE_TICKER, timeout=2, weight=2)
                             if r.status_code == 200:
                                 price = float(r.json().get("price", 0))
                         except Exception:
@@ -866,42 +826,31 @@ class TradingOperator:
                         def _run_dataeth_incremental(ui_ref=ui, op=self):
                             _inc_start = time.monotonic()
                             try:
-                                ui_ref.add_log("[DataEth] Actualizacion incremental iniciada (HTF 48h + LTF 7d)...")
+                                ui_ref.add_log("[DataEth] Actualizacion incremental iniciada (huecos HTF 48h + LTF 7d)...")
                                 import DataEth as _de
                                 _end = datetime.now(UTC)
-                                _htf_new, _ = _de.download_data_capital('ETHUSD', 'HOUR',  _end - timedelta(hours=48), _end)
-                                _ltf_new, _ = _de.download_data_capital('ETHUSD', 'MINUTE', _end - timedelta(days=7),  _end)
-
-                                if _htf_new is not None and not _htf_new.empty:
-                                    _htf_new = _de.calculate_indicators(_htf_new, buffer_days=2)
-                                if _ltf_new is not None and not _ltf_new.empty:
-                                    _ltf_new = _de.calculate_ltf_indicators(_ltf_new)
 
                                 # Cargar Parquet existente (fuerza recarga)
                                 _loader = DataLoader()
                                 _ex_htf, _ex_ltf = _loader.load_historical_data()
-                                _dl_cache['htf'] = _ex_htf
-                                _dl_cache['ltf'] = _ex_ltf
-                                _dl_cache['time'] = time.time()
-
-                                def _merge(existing, fresh):
-                                    if fresh is None or (hasattr(fresh, 'empty') and fresh.empty):
-                                        return existing
-                                    if existing is None or (hasattr(existing, 'empty') and existing.empty):
-                                        return fresh
-                                    combined = pd.concat([existing, fresh])
-                                    combined = combined[~combined.index.duplicated(keep='last')]
-                                    return combined.sort_index()
-
-                                _merged_htf = _merge(_ex_htf, _htf_new)
-                                _merged_ltf = _merge(_ex_ltf, _ltf_new)
+
+                                # Descargar sólo huecos + cola respecto a lo ya guardado
+                                _htf_new = _de.sync_missing('HOUR', _end - timedelta(hours=48), _end, _ex_htf.index if not _ex_htf.empty else None)
+                                _ltf_new = _de.sync_missing('MINUTE', _end - timedelta(days=7), _end, _ex_ltf.index if not _ex_ltf.empty else None)
+
+                                # Indicadores incrementales: los motores sólo procesan las velas nuevas
+                                _merged_htf = _de.merge_candles(_ex_htf, _htf_new)
+                                _merged_ltf = _de.merge_candles(_ex_ltf, _ltf_new, _end - timedelta(days=7))
+                                if not _merged_htf.empty:
+                                    _merged_htf = _de.calculate_indicators(_merged_htf, engine=_de.htf_indicator_engine)
+                                if not _merged_ltf.empty:
+                                    _merged_ltf = _de.calculate_ltf_indicators(_merged_ltf, engine=_de.ltf_indicator_engine)
 
                                 # Guardar Parquet actualizados
                                 _de.prepare_for_export(_merged_htf, _merged_ltf)
 
-                                # Recargar en memoria desde Parquet fresco (usa cache post-merge)
-                                op.historical_data = _dl_cache['htf']
-                                _ltf_loaded = _dl_cache['ltf']
+                                # Recargar en memoria: la caché de DataLoader detecta la escritura y relee
+                                op.historical_data, _ltf_loaded = _loader.load_historical_data()
                                 _last = op.historical_data.index[-1].strftime('%Y-%m-%d %H:%M') if not op.historical_data.empty else 'N/A'
                                 _htf_inc = len(op.historical_data) if not op.historical_data.empty else 0
                                 _ltf_inc = len(_ltf_loaded) if _ltf_loaded is not None and not _ltf_loaded.empty else 0
@@ -918,15 +867,13 @@ class TradingOperator:
                     # Cargar HTF desde Parquet (cacheado)
                     try:
                         if self.historical_data is None or self.historical_data.empty:
-                            if time.time() - _dl_cache['time'] > 60:
-                                loader = DataLoader()
-                                _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                                _dl_cache['time'] = time.time()
-                            self.historical_data = _dl_cache['htf']
+                            self.historical_data, _ = DataLoader().load_historical_data()
                         
                         if self.historical_data is not None and not self.historical_data.empty:
                             data_frame = self.historical_data
-                            htf_last_timestamp = self.historical_data.index[-1]
+                            # Frescura del almacén desde el manifiesto (sin leer velas); fallback al DataFrame en memoria
+                            _fresh = DataLoader().freshness("HTF")
+                            htf_last_timestamp = _fresh['newest'] if _fresh else self.historical_data.index[-1]
                             # Asegurar timezone para cálculo de edad
                             if htf_last_timestamp.tz is None:
                                 htf_last_timestamp = htf_last_timestamp.tz_localize('UTC')
@@ -1233,9 +1180,7 @@ class TradingOperator:
                 
                 # 🔹 Cargar ambos HTF y LTF desde DataLoader
                 loader = DataLoader()
-                _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                _dl_cache['time'] = time.time()
-                historical_data_htf, data_frame_ltf = _dl_cache['htf'], _dl_cache['ltf']
+                historical_data_htf, data_frame_ltf = loader.load_historical_data()
                 
                 # Validar que ambos se cargaron correctamente
                 if historical_data_htf is None or historical_data_htf.empty:
@@ -1275,13 +1220,9 @@ class TradingOperator:
                 # HTF se actualiza automáticamente cada 2h en thread separado.
                 # Aquí procesamos LTF para microtendencias y pasamos HTF como contexto.
 
-                # 🔹 RECARGAR LTF (cacheado 60s)
+                # 🔹 RECARGAR LTF (caché de DataLoader: sólo relee si cambió algún archivo)
                 try:
-                    if time.time() - _dl_cache['time'] > 60:
-                        loader = DataLoader()
-                        _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                        _dl_cache['time'] = time.time()
-                    data_frame_ltf = _dl_cache['ltf']
+                    _, data_frame_ltf = DataLoader().load_historical_data()
                     
                     if data_frame_ltf is None or data_frame_ltf.empty:
                         ui = getattr(self, 'ui', None)
@@ -1656,151 +1597,23 @@ class TradingOperator:
         """
         Calcula BB(20, 2σ), EMA200/50/20, ratio de volumen y detecta el estado del mercado.
         Usa columnas pre-calculadas del HTF cuando están disponibles (EMA_200, ADX, etc.).
-        Mínimo 20 filas para BB(20). Escribe market_context.json para todos los módulos.
+        Mínimo 20 filas para BB(20). Lo publica en context_bus (memoria + market_context.json).
         Estados: squeeze | breakout_up | breakout_down | ranging | choppy
+        El estado de BB, squeeze, DI y volumen vive en MarketContextEngine: cada ciclo
+        sólo procesa las velas HTF nuevas (coste independiente de la longitud del histórico).
         """
-        import numpy as np
-        ctx = {
-            "state": "ranging",
-            "bb_lower": None,
-            "bb_upper": None,
-            "ema200": None,
-            "ema50": None,
-            "ema20": None,
-            "price_vs_ema200_pct": None,
-            "squeeze_pct": None,
-            "vol_ratio": None,
-            "adx": None,
-            "di_plus": None,
-            "di_minus": None,
-            "bias": None,
-            "price": current_price,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
+        ctx = empty_context(current_price)
         try:
-            if historical_data is None or historical_data.empty or len(historical_data) < 20:
-                self._save_market_context(ctx)
-                return ctx
-
-            close = historical_data["Close"].astype(float)
-            last_row = historical_data.iloc[-1]
-            n_rows = len(historical_data)
-
-            # BB(20, 2σ) — solo necesita 20 filas
-            bb_mid = close.rolling(20).mean()
-            bb_std = close.rolling(20).std()
-            bb_upper = (bb_mid + 2 * bb_std).iloc[-1]
-            bb_lower = (bb_mid - 2 * bb_std).iloc[-1]
-            bb_width = bb_upper - bb_lower
-
-            # BB width histórica para squeeze (usa lo disponible, mín 20)
-            bb_widths = (bb_mid + 2 * bb_std) - (bb_mid - 2 * bb_std)
-            _sq_window = min(100, n_rows)
-            bb_mean_width = bb_widths.tail(_sq_window).mean()
-            squeeze_pct = round((bb_width / bb_mean_width) * 100, 1) if bb_mean_width > 0 else 100
-
-            # EMAs — preferir columnas pre-calculadas del HTF
-            ema200 = float(last_row["EMA_200"]) if "EMA_200" in historical_data.columns else close.ewm(span=200, adjust=False).mean().iloc[-1]
-            ema50 = float(last_row["EMA_50"]) if "EMA_50" in historical_data.columns else close.ewm(span=50, adjust=False).mean().iloc[-1]
-            ema20 = float(last_row["EMA_20"]) if "EMA_20" in historical_data.columns else close.ewm(span=20, adjust=False).mean().iloc[-1]
-
-            price_vs_ema200 = round(((current_price - ema200) / ema200) * 100, 2) if ema200 > 0 else 0
-
-            # Volume ratio — preferir pre-calculado
-            if "Volume_Ratio" in historical_data.columns:
-                vol_ratio = round(float(last_row["Volume_Ratio"]), 2)
-            elif "Volume" in historical_data.columns:
-                vol = historical_data["Volume"].astype(float)
-                vol_recent = vol.tail(3).mean()
-                vol_avg = vol.tail(min(30, n_rows)).mean()
-                vol_ratio = round(vol_recent / vol_avg, 2) if vol_avg > 0 else 1.0
-            else:
-                vol_ratio = 1.0
-
-            # ADX — preferir pre-calculado
-            adx_val = None
-            if "ADX" in historical_data.columns:
-                _adx_raw = last_row.get("ADX", None)
-                if _adx_raw is not None and not (isinstance(_adx_raw, float) and np.isnan(_adx_raw)):
-                    adx_val = float(_adx_raw)
-
-            # DI+/DI- — buscar varias posibles columnas, o calcular si hay suficientes filas
-            di_plus = None
-            di_minus = None
-            for col_p, col_m in [("DI+", "DI-"), ("ADX_DI+", "ADX_DI-"), ("DI_plus", "DI_minus")]:
-                if col_p in historical_data.columns and col_m in historical_data.columns:
-                    _dp = last_row.get(col_p, None)
-                    _dm = last_row.get(col_m, None)
-                    if _dp is not None and _dm is not None:
-                        di_plus = float(_dp)
-                        di_minus = float(_dm)
-                    break
-            # Si no hay DI pre-calculado, intentar calcularlo con ta
-            if di_plus is None and n_rows >= 14:
-                try:
-                    import ta
-                    _adx_ind = ta.trend.ADXIndicator(
-                        high=historical_data["High"].astype(float),
-                        low=historical_data["Low"].astype(float),
-                        close=close,
-                        window=14
-                    )
-                    di_plus = float(_adx_ind.adx_pos().iloc[-1])
-                    di_minus = float(_adx_ind.adx_neg().iloc[-1])
-                    if adx_val is None:
-                        adx_val = float(_adx_ind.adx().iloc[-1])
-                except Exception:
-                    pass
-
-            # Market_Regime pre-calculado (fallback para state)
-            precomputed_regime = str(last_row.get("Market_Regime", "")).upper() if "Market_Regime" in historical_data.columns else ""
-
-            # Detectar estado
-            state = "ranging"
-            bias = None
-            if current_price > bb_upper:
-                state = "breakout_up"
-            elif current_price < bb_lower:
-                state = "breakout_down"
-            elif squeeze_pct < 50:
-                state = "squeeze"
-            elif adx_val is not None and adx_val < 20:
-                state = "choppy"
-            elif precomputed_regime == "CHOPPY":
-                state = "choppy"
-            else:
-                state = "ranging"
-
-            # Bias basado en ADX + DI
-            if adx_val is not None and adx_val >= 25:
-                if di_plus is not None and di_minus is not None:
-                    if di_plus > di_minus:
-                        bias = "BULLISH"
-                    elif di_minus > di_plus:
-                        bias = "BEARISH"
-            elif adx_val is not None and adx_val < 20:
-                bias = "CHOPPY"
-
-            ctx.update({
-                "state": state,
-                "bb_lower": round(float(bb_lower), 2),
-                "bb_upper": round(float(bb_upper), 2),
-                "ema200": round(float(ema200), 2),
-                "ema50": round(float(ema50), 2),
-                "ema20": round(float(ema20), 2),
-                "price_vs_ema200_pct": price_vs_ema200,
-                "squeeze_pct": squeeze_pct,
-                "vol_ratio": vol_ratio,
-                "adx": round(adx_val, 1) if adx_val else None,
-                "di_plus": round(di_plus, 1) if di_plus else None,
-                "di_minus": round(di_minus, 1) if di_minus else None,
-                "bias": bias,
-            })
-
-            _adx_str = f"ADX {adx_val:.1f}" if adx_val else "ADX ?"
-            _di_str = f"DI+ {di_plus:.1f} / DI- {di_minus:.1f}" if di_plus is not None else ""
-            _bias_str = f"Bias: {bias}" if bias else ""
-            logging.info(f"[MCTX] {state.upper()} | BB ${bb_lower:.0f}-${bb_upper:.0f} | EMA200 ${ema200:.0f} ({price_vs_ema200:+.1f}%) | {_adx_str} {_di_str} | Squeeze {squeeze_pct}% | {_bias_str}")
+            self.market_context_engine.update(historical_data)
+            ctx = self.market_context_engine.snapshot(current_price)
+            timeframe_views.update(historical_data)
+            ctx.update(timeframe_views.context_fields(current_price))   # EMA200 diaria, tendencia 4H/1W
+            if ctx["bb_upper"] is not None:
+                adx_val, di_plus, di_minus, bias = ctx["adx"], ctx["di_plus"], ctx["di_minus"], ctx["bias"]
+                _adx_str = f"ADX {adx_val:.1f}" if adx_val else "ADX ?"
+                _di_str = f"DI+ {di_plus:.1f} / DI- {di_minus:.1f}" if di_plus is not None and di_minus is not None else ""
+                _bias_str = f"Bias: {bias}" if bias else ""
+                logging.info(f"[MCTX] {ctx['state'].upper()} | BB ${ctx['bb_lower']:.0f}-${ctx['bb_upper']:.0f} | EMA200 ${ctx['ema200']:.0f} ({ctx['price_vs_ema200_pct']:+.1f}%) | {_adx_str} {_di_str} | Squeeze {ctx['squeeze_pct']}% | {_bias_str}")
 
         except Exception as e:
             logging.warning(f"[WARNING] compute_market_context error: {e}")
@@ -1809,15 +1622,11 @@ class TradingOperator:
         return ctx
 
     def _save_market_context(self, ctx):
-        """Persiste market_context.json de forma atómica."""
-        ctx_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "market_context.json")
-        tmp_path = ctx_path + ".tmp"
+        """Publica el contexto en el bus; el sink persiste market_context.json de forma atómica."""
         try:
-            with open(tmp_path, "w") as f:
-                json.dump(ctx, f, indent=2)
-            os.replace(tmp_path, ctx_path)
+            context_bus.publish("market_context", ctx)
         except Exception as e:
-            logging.warning(f"[WARNING] No se pudo guardar market_context.json: {e}")
+            logging.warning(f"[WARNING] No se pudo publicar market_context: {e}")
         
 
     def process_data(self, row, positions, balance, bot_state: BotState = None, historical_data=None, data=None, row_timestamp=None):
@@ -1907,11 +1716,7 @@ class TradingOperator:
                 else:
                     logging.warning("[WARNING] ⚠️ Cargando HTF desde archivo...")
                 
-                if time.time() - _dl_cache['time'] > 60:
-                    loader = DataLoader()
-                    _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                    _dl_cache['time'] = time.time()
-                historical_data = _dl_cache['htf']
+                historical_data, _ = DataLoader().load_historical_data()
                 
                 if historical_data is None or (hasattr(historical_data, 'empty') and historical_data.empty):
                     ui = getattr(self, 'ui', None)
@@ -2685,7 +2490,7 @@ class TradingOperator:
 
             logging.info(f"[INFO] Log actualizado desde Process Data:")
             logging.info(f"📈 TREND DETECTADO: {trend}")
-            logging.info(json.dumps(log_entry, ensure_ascii=False, indent=4))
+            logging.info(json.dumps(log_entry, ensure_ascii=False, indent=4, default=json_default))
             # Si se suministró un BotState, actualizarlo para que la UI lo consuma
             if bot_state is not None:
                 try:
@@ -3005,9 +2810,7 @@ if __name__ == "__main__":
         # 🔹 CARGA DE DATOS: Intentar cargar, si falla ejecutar DataEth.py automáticamente
         logging.info("[INFO] 📊 Cargando datos históricos...")
         loader = DataLoader()
-        _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-        _dl_cache['time'] = time.time()
-        historical_data_htf, data_frame = _dl_cache['htf'], _dl_cache['ltf']
+        historical_data_htf, data_frame = loader.load_historical_data()
         
         # Si no hay datos HTF, ejecutar DataEth.py automáticamente
         if historical_data_htf.empty:
@@ -3015,9 +2818,7 @@ if __name__ == "__main__":
             try:
                 trading_operator.update_historical_data(force=True)
                 # Recargar después de ejecutar DataEth.py
-                _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                _dl_cache['time'] = time.time()
-                historical_data_htf, data_frame = _dl_cache['htf'], _dl_cache['ltf']
+                historical_data_htf, data_frame = loader.load_historical_data()
                 if historical_data_htf.empty:
                     logging.error("[ERROR] ❌ DataEth.py no pudo generar datos HTF. Verifique la conexión.")
                     logging.info("[INFO] ℹ️ Continuando con datos limitados...")
@@ -3137,11 +2938,7 @@ if __name__ == "__main__":
                         # 🔹 PASO 1.1: Verificar si datos están MUY desactualizados
                         force_update = False
                         try:
-                            if time.time() - _dl_cache['time'] > 60:
-                                loader = DataLoader()
-                                _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                                _dl_cache['time'] = time.time()
-                            temp_htf, temp_ltf = _dl_cache['htf'], _dl_cache['ltf']
+                            temp_htf, temp_ltf = DataLoader().load_historical_data()
                             now = pd.Timestamp.now(tz='UTC')
                             
                             if temp_ltf is not None and not temp_ltf.empty:
@@ -3165,11 +2962,7 @@ if __name__ == "__main__":
                             logging.warning(f"[WARNING] ⚠️ Error actualizando datos históricos: {e}")
                         
                         # 🔹 PASO 1.5: Cargar datos HTF base (cacheado)
-                        if time.time() - _dl_cache['time'] > 60:
-                            loader = DataLoader()
-                            _dl_cache['htf'], _dl_cache['ltf'] = loader.load_historical_data()
-                            _dl_cache['time'] = time.time()
-                        trading_operator.historical_data = _dl_cache['htf']
+                        trading_operator.historical_data, _ = DataLoader().load_historical_data()
                         if trading_operator.historical_data is not None and not trading_operator.historical_data.empty:
                             df = trading_operator.historical_data
                         else:
@@ -4,6 +4,7 @@ import json
 from datetime import datetime, timedelta
 import time
 from EthConfig import BASE_URL, API_KEY, LOGIN, PASSWORD
+from RateLimiter import rate_limiter  # Token bucket por host compartido (Capital.com 10 req/s)
 from colorama import Fore, Style
 
 class CapitalOP:
@@ -48,6 +49,7 @@ class CapitalOP:
                 "CST": self.session_token,
                 "X-SECURITY-TOKEN": self.x_security_token,
             }
+            rate_limiter.acquire(session_url)
             response = requests.get(session_url, headers=headers)
 
             if response.status_code == 200:
@@ -184,6 +186,7 @@ class CapitalOP:
                 "X-SECURITY-TOKEN": self.x_security_token,
             }
             payload = {"accountId": self.account_id}
+            rate_limiter.acquire(switch_url)
             response = requests.put(switch_url, headers=headers, json=payload)
 
             if response.status_code == 200:
@@ -247,6 +250,7 @@ class CapitalOP:
             self.last_auth_attempt = datetime.now()
 
             try:
+                rate_limiter.acquire(session_url)
                 response = requests.post(session_url, json=payload, headers=headers, timeout=10)
 
                 if response.status_code == 200:
@@ -317,6 +321,7 @@ class CapitalOP:
                 "X-SECURITY-TOKEN": self.x_security_token
             }
 
+            rate_limiter.acquire(account_url)
             response = requests.get(account_url, headers=headers)
             if response.status_code == 200:
                 accounts_data = response.json()
@@ -386,7 +391,9 @@ class CapitalOP:
                 "CST": self.session_token,
                 "X-SECURITY-TOKEN": self.x_security_token
             }
-            pr = requests.get(f"{self.base_url}/api/v1/accounts/preferences", headers=headers, timeout=10)
+            preferences_url = f"{self.base_url}/api/v1/accounts/preferences"
+            rate_limiter.acquire(preferences_url)
+            pr = requests.get(preferences_url, headers=headers, timeout=10)
             if pr.status_code == 200:
                 self._leverages = pr.json().get("leverages", {})
                 return self._leverages
@@ -413,7 +420,9 @@ class CapitalOP:
 
             # Obtener tipo de instrumento si no está en caché
             if market_id not in self._market_types:
-                mr = requests.get(f"{self.base_url}/api/v1/markets/{market_id}", headers=headers, timeout=10)
+                market_url = f"{self.base_url}/api/v1/markets/{market_id}"
+                rate_limiter.acquire(market_url)
+                mr = requests.get(market_url, headers=headers, timeout=10)
                 if mr.status_code == 200:
                     inst = mr.json().get("instrument", {})
                     self._market_types[market_id] = inst.get("type", "")
@@ -451,6 +460,7 @@ class CapitalOP:
             }
 
             print(f"[DEBUG] 📤 Solicitando posiciones abiertas para la cuenta: {self.account_id}")
+            rate_limiter.acquire(positions_url)
             response = requests.get(positions_url, headers=headers)
 
             if response.status_code == 200:
@@ -544,6 +554,7 @@ class CapitalOP:
             }
 
             print(f"[INFO] 🔄 Intentando cerrar posición {deal_id}...")
+            rate_limiter.acquire(close_url)
             response = requests.delete(close_url, headers=headers, timeout=10)
 
             if response.status_code == 200:
@@ -693,6 +704,7 @@ class CapitalOP:
                 "X-SECURITY-TOKEN": self.x_security_token
             }
 
+            rate_limiter.acquire(open_url)
             response = requests.post(open_url, json=payload, headers=headers)
 
             if response.status_code == 200:
@@ -707,6 +719,7 @@ class CapitalOP:
                 # 🔹 Confirmar la posición
                 print("[INFO] 🔄 Confirmando posición...")
                 confirm_url = f"{self.base_url}/api/v1/confirms/{deal_reference}"
+                rate_limiter.acquire(confirm_url)
                 confirm_response = requests.get(confirm_url, headers=headers)
 
                 if confirm_response.status_code == 200:
@@ -767,6 +780,7 @@ class CapitalOP:
                 "CST": self.session_token,
                 "X-SECURITY-TOKEN": self.x_security_token
             }
+            rate_limiter.acquire(url)
             response = requests.get(url, headers=headers, timeout=5)
             if response.status_code == 200:
                 data = response.json()
@@ -790,6 +804,7 @@ class CapitalOP:
                 'interval': '1m',
                 'limit': limit
             }
+            rate_limiter.acquire(url, weight=2)
             response = requests.get(url, params=params, timeout=15)
             if response.status_code == 200:
                 data = response.json()
@@ -822,6 +837,7 @@ class CapitalOP:
                 "CST": self.session_token,
                 "X-SECURITY-TOKEN": self.x_security_token
             }
+            rate_limiter.acquire(url)
             response = requests.get(url, headers=headers)
             if response.status_code == 200:
                 accounts_data = response.json() or {}
@@ -8,10 +8,22 @@ import os
 import time
 import pandas as pd
 import re
+from TimeframeViews import timeframe_views
+from ContextBus import context_bus
 
 
 capital_ops = CapitalOP()
 
+
+def _row_value(row, column):
+    """Valor pre-calculado de una fila (None si falta o es NaN: la fila aún no tiene indicadores)."""
+    try:
+        value = float(row[column])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+
 class Strategia:
     def __init__(self, capital_ops, threshold_buy=(1, 2), threshold_sell=(0, 2, 3), risk_factor=0.01,
                  margin_protection=0.9, profit_threshold=0.03, stop_loss=0.1,
@@ -108,8 +120,14 @@ class Strategia:
         latest_data = historical_data.iloc[-1]
         previous_data = historical_data.iloc[-2]
 
-        # 📊 Calculamos el volumen promedio con un factor de confirmación más alto
-        volume_threshold = historical_data["Volume"].rolling(10).mean() * 1.5  # Volumen debe ser 1.5x la media
+        # 📊 Medias de 10 velas pre-calculadas en el pipeline (fallback: rolling sobre el frame)
+        atr_mean_10 = _row_value(latest_data, "ATR_Mean_10")
+        if atr_mean_10 is None:
+            atr_mean_10 = historical_data["ATR"].rolling(10).mean().iloc[-1]
+        volume_mean_10 = _row_value(latest_data, "Volume_Mean_10")
+        if volume_mean_10 is None:
+            volume_mean_10 = historical_data["Volume"].rolling(10).mean().iloc[-1]
+        volume_threshold = volume_mean_10 * 1.5  # Volumen debe ser 1.5x la media
 
         # 🚀 **Intento de reversión alcista** (Confirmamos con más validaciones)
         bullish_reversal = (
@@ -117,7 +135,7 @@ class Strategia:
             previous_data["MACD"] <= previous_data["MACD_Signal"] and
             latest_data["MACD"] > previous_data["MACD"] and  # MACD debe seguir subiendo
             latest_data["RSI"] > 40 and previous_data["RSI"] <= 30 and  # RSI rebota con más fuerza
-            latest_data["ATR"] > historical_data["ATR"].rolling(10).mean() and  # Volatilidad en aumento
+            latest_data["ATR"] > atr_mean_10 and  # Volatilidad en aumento
             latest_data["Volume"] > volume_threshold  # Volumen realmente superior
         )
 
@@ -127,7 +145,7 @@ class Strategia:
             previous_data["MACD"] >= previous_data["MACD_Signal"] and
             latest_data["MACD"] < previous_data["MACD"] and  # MACD debe seguir bajando
             latest_data["RSI"] < 60 and previous_data["RSI"] >= 70 and  # RSI cae con más confirmación
-            latest_data["ATR"] > historical_data["ATR"].rolling(10).mean() and  # Volatilidad en aumento
+            latest_data["ATR"] > atr_mean_10 and  # Volatilidad en aumento
             latest_data["Volume"] > volume_threshold  # Volumen realmente superior
         )
 
@@ -177,7 +195,9 @@ class Strategia:
         except Exception:
             l_volume_mean = 0
         try:
-            l_volume_rolling10 = data["Volume"].rolling(10).mean().iloc[-1] if len(data) >= 10 else l_volume_mean
+            l_volume_rolling10 = _row_value(l_latest, "Volume_Mean_10") if len(data) >= 10 else l_volume_mean
+            if l_volume_rolling10 is None:
+                l_volume_rolling10 = data["Volume"].rolling(10).mean().iloc[-1]
         except Exception:
             l_volume_rolling10 = l_volume_mean
 
@@ -186,7 +206,9 @@ class Strategia:
         except Exception:
             h_volume_mean = 0
         try:
-            h_volume_rolling10 = historical_data["Volume"].rolling(10).mean().iloc[-1] if len(historical_data) >= 10 else h_volume_mean
+            h_volume_rolling10 = _row_value(h_latest, "Volume_Mean_10") if len(historical_data) >= 10 else h_volume_mean
+            if h_volume_rolling10 is None:
+                h_volume_rolling10 = historical_data["Volume"].rolling(10).mean().iloc[-1]
         except Exception:
             h_volume_rolling10 = h_volume_mean
 
@@ -196,8 +218,12 @@ class Strategia:
         reason = "No hay suficiente información para determinar una señal clara."
 
         ## 🎯 **CÁLCULO DE SOPORTES Y RESISTENCIAS**
-        support_level = min(historical_data["Low"].tail(75))  # 75 velas HTF
-        resistance_level = max(historical_data["High"].tail(75))
+        # Columnas Support_75/Resistance_75 del pipeline (mín./máx. de 75 velas HTF); fallback sobre la cola
+        support_level = _row_value(h_latest, "Support_75") if len(historical_data) >= 75 else None
+        resistance_level = _row_value(h_latest, "Resistance_75") if support_level is not None else None
+        if support_level is None or resistance_level is None:
+            support_level = historical_data["Low"].tail(75).min()  # 75 velas HTF
+            resistance_level = historical_data["High"].tail(75).max()
         current_price = latest_data["Close"]
 
         # Calcular distancias porcentuales
@@ -238,7 +264,10 @@ class Strategia:
                 "Support": float(support_level),
                 "Resistance": float(resistance_level),
                 "Dist_Support_%": round(dist_to_support_pct, 2),
-                "Dist_Resistance_%": round(dist_to_resistance_pct, 2)
+                "Dist_Resistance_%": round(dist_to_resistance_pct, 2),
+                **{f"{tf}_EMA_{span}": round(view[f"EMA_{span}"], 2)
+                   for tf, view in (("H4", timeframe_views.get("4H")), ("D1", timeframe_views.get("1D")))
+                   if view for span in (50, 200)},
             }
         except Exception:
             debug_values = {"error": "no se pudo construir debug_values"}
@@ -466,6 +495,7 @@ class Strategia:
                     else:
                         reason = f"🚫 ADX bajo ({adx_value:.1f} < {adx_threshold}) para SELL (score {confianza}/8). " + reason
 
+                market_regime = latest_data.get("Market_Regime", "CHOPPY")
                 return {
                     "trend": f"{trend_confirmed} | {trend}",
                     "reason": reason,
@@ -791,10 +821,8 @@ class Strategia:
         # Excepción: si ADX > 28 y score >= 5, el precio está ROMPIENDO el soporte, no rebotando
         _bounce_zone_pct = 2.0  # default
         try:
-            cycle_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cycle_context.json")
-            if os.path.exists(cycle_path):
-                with open(cycle_path, "r") as f:
-                    _cyctx = json.load(f)
+            _cyctx = context_bus.data("cycle_context")
+            if _cyctx is not None:
                 _bounce_zone_pct = float(_cyctx.get("bounce_zone_pct", 2.0))
         except Exception:
             pass
@@ -1030,13 +1058,12 @@ class Strategia:
         mctx_bias = None
         mctx_adx = None
         try:
-            mctx_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "market_context.json")
-            if os.path.exists(mctx_path):
-                # TTL: ignorar si el archivo tiene más de 15 minutos
-                _age = time.time() - os.path.getmtime(mctx_path)
+            mctx_snapshot = context_bus.get("market_context")
+            if mctx_snapshot is not None:
+                # TTL: ignorar si el snapshot tiene más de 15 minutos
+                _age = mctx_snapshot.age()
                 if _age < 900:
-                    with open(mctx_path, "r") as f:
-                        mctx = json.load(f)
+                    mctx = mctx_snapshot.data
                     mctx_state = mctx.get("state", "ranging")
                     mctx_bias = mctx.get("bias")
                     mctx_adx = mctx.get("adx")
@@ -1048,7 +1075,7 @@ class Strategia:
                     _bias_str = f"Bias: {mctx_bias}" if mctx_bias else ""
                     print(f"[MCTX] 🌍 {mctx_state.upper()} | BB ${bb_lower}-${bb_upper} | EMA200 ${ema200} | {_adx_str} | Squeeze {squeeze_pct}% | {_bias_str}")
                 else:
-                    print(f"[MCTX] ⚠️ market_context.json expirado ({_age:.0f}s > 900s)")
+                    print(f"[MCTX] ⚠️ market_context expirado ({_age:.0f}s > 900s)")
         except Exception as e:
             print(f"[MCTX] ⚠️ No se pudo leer market_context.json: {e}")
 
@@ -1057,10 +1084,8 @@ class Strategia:
         cycle_sell_min = 5          # default: score mínimo SELL = 5/8
         cycle_bounce_zone = 2.0     # default: zona de rebote 2%
         try:
-            cycle_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cycle_context.json")
-            if os.path.exists(cycle_path):
-                with open(cycle_path, "r") as f:
-                    cyctx = json.load(f)
+            cyctx = context_bus.data("cycle_context")
+            if cyctx is not None:
                 cycle_phase = cyctx.get("phase")
                 cycle_sell_min = int(cyctx.get("sell_score_minimum", 5))
                 cycle_bounce_zone = float(cyctx.get("bounce_zone_pct", 2.0))
@@ -1068,22 +1093,20 @@ class Strategia:
         except Exception as e:
             print(f"[CYCLE] ⚠️ No se pudo leer cycle_context.json: {e}")
 
-        # 📊 FILTRO EMA200 DAILY: Derivar EMA200 diaria desde datos HTF (HOUR)
+        # 📊 FILTRO EMA200 DAILY: vista diaria cacheada (TimeframeViews, sólo se recalcula al cerrar el día)
         ema200d_bull = False
         try:
             if historical_data is not None and len(historical_data) >= 200:
-                # Resamplear HOUR → DAILY usando el Close de cada día
-                htf_close = historical_data[["Close"]].copy()
-                htf_close.index = pd.to_datetime(htf_close.index, errors="coerce") if not isinstance(htf_close.index, pd.DatetimeIndex) else htf_close.index
-                daily_close = htf_close["Close"].resample("1D").last().dropna()
-                if len(daily_close) >= 200:
-                    ema200d = daily_close.ewm(span=200, adjust=False).mean().iloc[-1]
-                    latest_close = daily_close.iloc[-1]
+                timeframe_views.update(historical_data)
+                daily = timeframe_views.get("1D")
+                if daily and daily["bars"] >= 200:
+                    ema200d = daily["EMA_200"]
+                    latest_close = daily["Close"]
                     ema200d_bull = latest_close > ema200d
                     _pct_above = ((latest_close - ema200d) / ema200d) * 100
                     print(f"[EMA200D] 📊 EMA200 DAILY: ${ema200d:.2f} | Precio: ${latest_close:.2f} | {'🟢 POR ENCIMA' if ema200d_bull else '🔴 POR DEBAJO'} ({_pct_above:+.2f}%)")
                 else:
-                    print(f"[EMA200D] ⚠️ Solo {len(daily_close)} velas diarias — insuficiente para EMA200D")
+                    print(f"[EMA200D] ⚠️ Solo {daily['bars'] if daily else 0} velas diarias — insuficiente para EMA200D")
         except Exception as e:
             print(f"[EMA200D] ⚠️ No se pudo calcular EMA200 DAILY: {e}")
 
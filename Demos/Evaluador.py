@@ -21,9 +21,7 @@ from MomentumHub import add_tick, get_metrics
 from DataLoader import DataLoader
 from EthConfig import BASE_URL, API_KEY, LOGIN, PASSWORD
 from EthSession import CapitalOP
-
-# Cache para DataLoader (recargar cada 60s)
-_dl_cache = {'time': 0, 'htf': None, 'ltf': None}
+from ContextBus import context_bus
 
 # ------------------- Deuda por overnight fee ------------------- #
 # Flat $0.01 por posición cada 24h (~0.01/24 = 0.0004167 por hora)
@@ -1088,6 +1086,10 @@ def extract_closure_snapshot(features):
 # 🎯 SISTEMA DE TRAILING STOP POR ZONAS
 # ═══════════════════════════════════════════════════════════
 
+# Columnas HTF que lee get_trend_strength_from_features (última vela)
+TREND_COLUMNS = ['ADX', 'Market_Regime', 'RSI', 'MACD', 'EMA_20', 'EMA_50', 'OBV_Trend']
+
+
 def get_trend_strength_from_features(features, historical_data=None):
     """
     Extrae métricas de fuerza de tendencia desde features/historical_data.
@@ -1588,10 +1590,8 @@ def evaluate_positions(positions, features, profittracker, debug_callback=None,
             # 🔒 Candado: si Bollinger squeeze activo, NO cerrar — breakout inminente
             _squeeze_active = False
             try:
-                mctx_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "market_context.json")
-                if os.path.exists(mctx_path):
-                    with open(mctx_path, "r") as _mf:
-                        mctx = json.load(_mf)
+                mctx = context_bus.data("market_context")
+                if mctx is not None:
                     _squeeze_active = mctx.get("squeeze_pct", 100) < 4.0
             except Exception:
                 pass
@@ -2179,10 +2179,8 @@ async def curses_main_async(stdscr, cst, security_token, auto_mode=False):
 
                     # 🌍 [MCTX] Market Context debug panel
                     try:
-                        mctx_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "market_context.json")
-                        if os.path.exists(mctx_path):
-                            with open(mctx_path, "r") as _mf:
-                                mctx = json.load(_mf)
+                        mctx = context_bus.data("market_context")
+                        if mctx is not None:
                             _st = mctx.get("state", "?").upper()
                             _bbl = mctx.get("bb_lower", 0)
                             _bbu = mctx.get("bb_upper", 0)
@@ -2218,23 +2216,13 @@ async def curses_main_async(stdscr, cst, security_token, auto_mode=False):
                 try:
                     features = {"RSI": 55, "MACD": 1, "VolumeChange": 1}
 
-                    # 🎯 Cargar HTF para sistema de zonas (cache 60s)
+                    # 🎯 Última vela HTF para sistema de zonas (sólo las columnas de tendencia)
                     historical_data = None
-                    if time.time() - _dl_cache['time'] > 60:
-                        try:
-                            from DataLoader import DataLoader
-                            loader = DataLoader()
-                            _htf, _ltf = loader.load_historical_data()
-                            _dl_cache['htf'] = _htf
-                            _dl_cache['ltf'] = _ltf
-                            _dl_cache['time'] = time.time()
-                            historical_data = _htf
-                            if _htf is not None and not _htf.empty:
-                                logger.log(f"[INFO] 📊 HTF cargado para zonas: {len(_htf)} velas")
-                        except Exception as e:
-                            logger.log(f"[WARNING] No se pudo cargar HTF para zonas: {e}")
-                    else:
-                        historical_data = _dl_cache['htf']
+                    try:
+                        from DataLoader import DataLoader
+                        historical_data = DataLoader().query("HTF", columns=TREND_COLUMNS, tail=1)
+                    except Exception as e:
+                        logger.log(f"[WARNING] No se pudo cargar HTF para zonas: {e}")
 
                     actions = evaluate_positions(
                         positions_list,
@@ -2371,13 +2359,7 @@ async def curses_main_async(stdscr, cst, security_token, auto_mode=False):
                 # 2) Si aún no hay ticks, fallback a DataLoader cache (último precio LTF)
                 if tick_count == 0:
                     try:
-                        if time.time() - _dl_cache['time'] > 60:
-                            loader = DataLoader()
-                            _htf, _ltf = loader.load_historical_data()
-                            _dl_cache['htf'] = _htf
-                            _dl_cache['ltf'] = _ltf
-                            _dl_cache['time'] = time.time()
-                        ltf = _dl_cache['ltf']
+                        ltf = DataLoader().query("LTF", columns=["Close", "Open"], tail=1)
                         if ltf is not None and not ltf.empty:
                             # Intentar obtener precio de cierre/last
                             last_row = ltf.iloc[-1]
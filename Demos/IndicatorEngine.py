@@ -0,0 +1,491 @@
+"""
+IndicatorEngine - Indicadores de DataEth.calculate_indicators con actualización O(1) por vela.
+
+Cada indicador guarda su estado recursivo (acumuladores EMA, medias de Wilder
+de RSI y ADX, suma de OBV, ventanas fijas de ATR/Bollinger, deques monótonas
+para los mínimos/máximos del Estocástico y de soportes/resistencias) y
+replica la aritmética de pandas/ta paso a paso: el resultado es idéntico bit a
+bit al cálculo completo sobre la misma serie.
+
+Uso:
+    engine = IndicatorEngine()
+    data = engine.calculate(ohlcv)      # primera vez: recorre toda la serie
+    data = engine.calculate(ohlcv2)     # después: sólo procesa las velas nuevas
+
+calculate() acepta la serie con velas nuevas al final, con la última vela
+corregida (se rebobina hasta REWIND_CANDLES velas) o recortada por el inicio.
+Si la serie cambió en otro punto vuelve a recorrerla completa.
+"""
+import copy
+import math
+import operator
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+REWIND_CANDLES = 8   # Velas finales que pueden corregirse sin recalcular todo
+INDICATOR_VERSION = 2   # Subir al cambiar fórmulas o columnas (queda en el manifiesto del almacén)
+
+INDICATOR_COLUMNS = [
+    'RSI', 'RSI_5', 'RSI_7',
+    'EMA_3', 'EMA_6', 'EMA_9', 'EMA_14', 'EMA_20', 'EMA_50', 'EMA_200',
+    'MACD', 'MACD_Signal', 'MACD_Histogram',
+    'ATR', 'ATR_Pct', 'VolumeChange', 'log_return', 'STOCH', 'BB_width',
+    'ADX', 'OBV', 'OBV_Trend', 'Volume_Ratio',
+    'Support_75', 'Resistance_75', 'Dist_Support_Pct', 'Dist_Resistance_Pct',
+    'ATR_Mean_10', 'Volume_Mean_10',
+]
+SR_WINDOW = 75   # Velas de soporte/resistencia (mínimo/máximo móvil)
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+NAN = float('nan')
+
+
+def _div(a, b):
+    """a / b con la semántica de numpy (inf/nan en vez de ZeroDivisionError)."""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _Ewm:
+    """Series.ewm(..., adjust=False).mean() de pandas, vela a vela."""
+    def __init__(self, span=None, alpha=None, min_periods=0):
+        com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+        self.alpha = 1. / (1. + com)
+        self.old_wt_factor = 1. - self.alpha
+        self.min_periods = max(min_periods, 1)
+        self.weighted = None
+        self.nobs = 0
+
+    def update(self, cur):
+        is_observation = cur == cur
+        if self.weighted is None:
+            self.weighted = cur
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            weighted = self.weighted
+            if weighted == weighted:
+                if is_observation and weighted != cur:
+                    old_wt = self.old_wt_factor
+                    weighted = old_wt * weighted + self.alpha * cur
+                    weighted /= (old_wt + self.alpha)
+                    self.weighted = weighted
+            elif is_observation:
+                self.weighted = cur
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class _RollingMean:
+    """Series.rolling(window, min_periods).mean() de pandas (suma de Kahan incremental)."""
+    def __init__(self, window, min_periods):
+        self.window = window
+        self.min_periods = min_periods
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.
+        self.neg_ct = 0
+        self.comp_add = 0.
+        self.comp_remove = 0.
+        self.same = 0
+        self.prev_value = None
+
+    def update(self, val):
+        if self.prev_value is None:
+            self.prev_value = val
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.comp_remove
+                t = self.sum_x + y
+                self.comp_remove = t - self.sum_x - y
+                self.sum_x = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+        self.values.append(val)
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            self.same = self.same + 1 if val == self.prev_value else 1
+            self.prev_value = val
+
+        if self.nobs >= self.min_periods and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.
+            return result
+        return NAN
+
+
+class _RollingStd:
+    """Series.rolling(window, min_periods).std(ddof) de pandas (Welford + Kahan incremental)."""
+    def __init__(self, window, min_periods, ddof=1):
+        self.window = window
+        self.min_periods = min_periods
+        self.ddof = ddof
+        self.values = deque()
+        self.nobs = 0.
+        self.mean_x = 0.
+        self.ssqdm_x = 0.
+        self.comp_add = 0.
+        self.comp_remove = 0.
+        self.same = 0
+        self.prev_value = None
+
+    def update(self, val):
+        if self.prev_value is None:
+            self.prev_value = val
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean_x - self.comp_remove
+                    y = old - self.comp_remove
+                    t = y - self.mean_x
+                    self.comp_remove = t + self.mean_x - y
+                    self.mean_x = self.mean_x - t / self.nobs
+                    self.ssqdm_x = self.ssqdm_x - (old - prev_mean) * (old - self.mean_x)
+                else:
+                    self.mean_x = 0.
+                    self.ssqdm_x = 0.
+        self.values.append(val)
+        if val == val:
+            self.nobs += 1
+            self.same = self.same + 1 if val == self.prev_value else 1
+            self.prev_value = val
+            prev_mean = self.mean_x - self.comp_add
+            y = val - self.comp_add
+            t = y - self.mean_x
+            self.comp_add = t + self.mean_x - y
+            self.mean_x = self.mean_x + t / self.nobs
+            self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+        if self.nobs >= self.min_periods and self.nobs > self.ddof:
+            if self.nobs == 1 or self.same >= self.nobs:
+                var = 0.
+            else:
+                var = self.ssqdm_x / (self.nobs - self.ddof)
+        else:
+            return NAN
+        return float(np.sqrt(var)) if var >= 0 else 0.
+
+
+class _RollingExtreme:
+    """
+    Series.rolling(window, min_periods).min()/max() con deque monótona:
+    O(1) amortizado por vela en lugar de recorrer la ventana.
+    """
+    def __init__(self, window, min_periods, func):
+        self.window = window
+        self.min_periods = min_periods
+        self.dominates = operator.le if func is min else operator.ge
+        self.candidates = deque()   # (posición, valor) monótonos; el extremo al frente
+        self.valid = deque()        # Posiciones no-NaN dentro de la ventana
+        self.pos = 0
+
+    def update(self, val):
+        pos = self.pos
+        self.pos += 1
+        first = pos - self.window + 1
+        while self.candidates and self.candidates[0][0] < first:
+            self.candidates.popleft()
+        while self.valid and self.valid[0] < first:
+            self.valid.popleft()
+        if val == val:
+            while self.candidates and self.dominates(val, self.candidates[-1][1]):
+                self.candidates.pop()
+            self.candidates.append((pos, val))
+            self.valid.append(pos)
+        if self.valid and len(self.valid) >= self.min_periods:
+            return self.candidates[0][1]
+        return NAN
+
+
+class _Rsi:
+    """ta.momentum.RSIIndicator(close, window).rsi()"""
+    def __init__(self, window):
+        self.up = _Ewm(alpha=1 / window, min_periods=window)
+        self.down = _Ewm(alpha=1 / window, min_periods=window)
+
+    def update(self, diff):
+        up = diff if diff > 0 else 0.0
+        down = -(diff if diff < 0 else 0.0)
+        emaup = self.up.update(up)
+        emadn = self.down.update(down)
+        if emadn == 0:
+            return 100.0
+        return 100 - (100 / (1 + _div(emaup, emadn)))
+
+
+class _Adx:
+    """
+    ta.trend.ADXIndicator(high, low, close, window).adx(), incluido el
+    arranque de ta: las primeras `window` velas válidas se suman y el ADX
+    inicial es la media de los primeros `window` índices direccionales.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.row = 0
+        self.seed = []            # (dm, pos, neg) de las primeras velas
+        self.trs = self.dip = self.din = None
+        self.di_seed = []
+        self.adx = 0.
+        self.prev = None          # (high, low, close) de la vela anterior
+
+    def _directional_index(self):
+        w = self.trs
+        dip = 100 * (self.dip / w) if w != 0 else 0
+        din = 100 * (self.din / w) if w != 0 else 0
+        return 100 * np.abs((dip - din) / (dip + din)) if dip + din != 0 else 0
+
+    def di(self):
+        """(adx_pos, adx_neg) de ta en la última vela procesada (0 durante el arranque)."""
+        if self.trs is None or self.row < self.window + 2 or self.trs == 0:
+            return 0., 0.
+        return 100 * (self.dip / self.trs), 100 * (self.din / self.trs)
+
+    def update(self, high, low, close):
+        window = self.window
+        row = self.row
+        self.row += 1
+        if self.prev is None:
+            self.prev = (high, low, close)
+            return 0.
+        p_high, p_low, p_close = self.prev
+        self.prev = (high, low, close)
+
+        dm = max(high, p_close) - min(low, p_close)
+        diff_up = high - p_high
+        diff_down = p_low - low
+        pos = abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+        neg = abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+
+        if self.trs is None:
+            self.seed.append((dm, pos, neg))
+            if len(self.seed) < window:
+                return 0.
+            seed = pd.DataFrame(self.seed, dtype=float)
+            self.trs, self.dip, self.din = (seed[c].dropna().iloc[0:window].sum() for c in seed.columns)
+            self.seed = None
+        else:
+            self.trs = self.trs - (self.trs / float(window)) + dm
+            self.dip = self.dip - (self.dip / float(window)) + pos
+            self.din = self.din - (self.din / float(window)) + neg
+
+        # En ta el DI i-ésimo incluye la vela window + i y el ADX de esa vela usa ese DI
+        k = row - window + 1
+        di = self._directional_index()
+        if k < window:
+            self.di_seed.append(di)
+            return 0.
+        if k == window:
+            self.di_seed.append(di)
+            self.adx = np.array(self.di_seed[0:window]).mean()
+            self.di_seed = None
+            return self.adx
+        self.adx = ((self.adx * (window - 1)) + di) / float(window)
+        return self.adx
+
+
+class _IndicatorState:
+    """Estado recursivo de todos los indicadores de calculate_indicators."""
+    def __init__(self):
+        self.rsi = {'RSI': _Rsi(10), 'RSI_5': _Rsi(5), 'RSI_7': _Rsi(7)}
+        self.ema = {f'EMA_{s}': _Ewm(span=s) for s in (3, 6, 9, 14, 20, 50, 200)}
+        self.macd_signal = _Ewm(span=5)
+        self.atr = _RollingMean(10, 1)
+        self.stoch_low = _RollingExtreme(14, 14, min)
+        self.stoch_high = _RollingExtreme(14, 14, max)
+        self.bb_mean = _RollingMean(20, 20)
+        self.bb_std = _RollingStd(20, 20, ddof=0)
+        self.adx = _Adx(14)
+        self.volume_mean = _RollingMean(20, 1)
+        self.support = _RollingExtreme(SR_WINDOW, 1, min)
+        self.resistance = _RollingExtreme(SR_WINDOW, 1, max)
+        self.atr_mean = _RollingMean(10, 10)
+        self.volume_mean10 = _RollingMean(10, 10)
+        self.prev_close = NAN
+        self.prev_volume = NAN
+        self.obv = 0.
+        self.prev_obv = NAN
+
+    def update(self, o, h, l, c, v):
+        out = {}
+        prev_close = self.prev_close
+        diff = c - prev_close
+        for name, rsi in self.rsi.items():
+            out[name] = rsi.update(diff)
+        for name, ema in self.ema.items():
+            out[name] = ema.update(c)
+        macd = out['EMA_6'] - out['EMA_14']
+        signal = self.macd_signal.update(macd)
+        out['MACD'] = macd
+        out['MACD_Signal'] = signal
+        out['MACD_Histogram'] = macd - signal
+
+        tr = h - l
+        if prev_close == prev_close:
+            tr = max(tr, abs(h - prev_close), abs(l - prev_close))
+        atr = self.atr.update(tr)
+        out['ATR'] = atr
+        out['ATR_Pct'] = _div(atr, c) * 100
+        out['VolumeChange'] = _div(v, self.prev_volume) - 1
+        out['log_return'] = float(np.log(_div(c, prev_close)))
+
+        smin = self.stoch_low.update(l)
+        smax = self.stoch_high.update(h)
+        out['STOCH'] = _div(100 * (c - smin), smax - smin)
+
+        mavg = self.bb_mean.update(c)
+        mstd = self.bb_std.update(c)
+        hband = mavg + 2 * mstd
+        lband = mavg - 2 * mstd
+        out['BB_width'] = _div(hband - lband, mavg) * 100
+
+        out['ADX'] = self.adx.update(h, l, c)
+
+        self.obv = self.obv + (-v if c < prev_close else v)
+        out['OBV'] = self.obv
+        out['OBV_Trend'] = 1 if self.obv > self.prev_obv else (-1 if self.obv < self.prev_obv else 0)
+        out['Volume_Ratio'] = _div(v, self.volume_mean.update(v))
+
+        support = self.support.update(l)
+        resistance = self.resistance.update(h)
+        out['Support_75'] = support
+        out['Resistance_75'] = resistance
+        out['Dist_Support_Pct'] = _div(c - support, support) * 100
+        out['Dist_Resistance_Pct'] = _div(resistance - c, c) * 100
+        out['ATR_Mean_10'] = self.atr_mean.update(atr)
+        out['Volume_Mean_10'] = self.volume_mean10.update(v)
+
+        self.prev_close = c
+        self.prev_volume = v
+        self.prev_obv = self.obv
+        return out
+
+
+class IndicatorEngine:
+    """Motor incremental: mantiene el estado tras la última vela procesada."""
+
+    def __init__(self, max_rows=None, rewind=REWIND_CANDLES):
+        self.max_rows = max_rows       # Velas conservadas en memoria (None = todas)
+        self.rewind = rewind
+        self.reset()
+
+    def reset(self):
+        self.state = _IndicatorState()
+        self.n = 0
+        self.index = np.empty(0, dtype='datetime64[ns]')        # Timestamps procesados
+        self.inputs = np.empty((0, len(OHLCV)))                  # OHLCV procesado
+        self.rows = np.empty((0, len(INDICATOR_COLUMNS)))        # Salida cruda (sin limpiar NaN/inf)
+        self.snapshots = deque(maxlen=self.rewind)               # (posición, estado antes de esa vela)
+
+    def __len__(self):
+        return self.n
+
+    def _reserve(self, extra):
+        """Crece los buffers por duplicación para que append sea O(1) amortizado."""
+        need = self.n + extra
+        if need <= len(self.index):
+            return
+        size = max(need, 2 * len(self.index), 1024)
+        for name in ('index', 'inputs', 'rows'):
+            old = getattr(self, name)
+            new = np.empty((size,) + old.shape[1:], dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def append(self, ts, o, h, l, c, v, keep_snapshot=True):
+        """Procesa una vela nueva en O(1) y retorna sus indicadores crudos."""
+        if keep_snapshot:
+            self.snapshots.append((self.n, copy.deepcopy(self.state)))
+        row = self.state.update(o, h, l, c, v)
+        self._reserve(1)
+        self.index[self.n] = ts
+        self.inputs[self.n] = (o, h, l, c, v)
+        self.rows[self.n] = [row[col] for col in INDICATOR_COLUMNS]
+        self.n += 1
+        return row
+
+    def _rewind_to(self, pos):
+        """Restaura el estado previo a la vela `pos`; False si ya no hay snapshot."""
+        for snap_pos, state in self.snapshots:
+            if snap_pos == pos:
+                self.state = copy.deepcopy(state)
+                self.n = pos
+                while self.snapshots and self.snapshots[-1][0] >= pos:
+                    self.snapshots.pop()
+                return True
+        return False
+
+    def _trim(self):
+        if self.max_rows and self.n > self.max_rows:
+            drop = self.n - self.max_rows
+            for name in ('index', 'inputs', 'rows'):
+                buf = getattr(self, name)
+                buf[:self.max_rows] = buf[drop:self.n]
+            self.n = self.max_rows
+            self.snapshots = deque(((p - drop, s) for p, s in self.snapshots if p >= drop), maxlen=self.rewind)
+
+    def _sync(self, index, values):
+        """Lleva el estado hasta la última vela de (index, values); retorna la posición de index[0]."""
+        n = len(index)
+        start = int(np.searchsorted(self.index[:self.n], index[0])) if self.n else 0
+        if self.n and (start >= self.n or self.index[start] != index[0]):
+            self.reset()
+            start = 0
+
+        # Primera vela donde la serie difiere de lo ya procesado
+        overlap = min(n, self.n - start)
+        same = (self.index[start:start + overlap] == index[:overlap]) & \
+            (self.inputs[start:start + overlap] == values[:overlap]).all(axis=1)
+        first_diff = overlap if same.all() else int(np.argmin(same))
+
+        pos = start + first_diff
+        if pos < self.n and not self._rewind_to(pos):
+            print(f"[INFO] 🔁 IndicatorEngine: la serie cambió {self.n - pos} velas atrás, recalculando completo")
+            self.reset()
+            start, first_diff = 0, 0
+
+        for i in range(first_diff, n):
+            o, h, l, c, v = values[i].tolist()
+            self.append(index[i], o, h, l, c, v, keep_snapshot=n - i <= self.rewind)
+        return start
+
+    def calculate(self, data):
+        """
+        Equivalente a las columnas de indicadores de DataEth.calculate_indicators
+        sobre `data` (OHLCV ya normalizado, índice Datetime UTC ordenado).
+        """
+        index = data.index
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        index = index.as_unit('ns').values
+        values = data[OHLCV].to_numpy(dtype=float)
+        start = self._sync(index, values)
+        rows = self.rows[start:start + len(data)]
+
+        result = data.copy()
+        for j, col in enumerate(INDICATOR_COLUMNS):
+            result[col] = rows[:, j]
+        result['OBV_Trend'] = result['OBV_Trend'].astype(np.int64)
+        result['Market_Regime'] = np.where(result['ADX'] > 25, 'TRENDING',
+                                           np.where(result['ADX'] > 20, 'RANGING', 'CHOPPY'))
+        result.replace([np.inf, -np.inf], 0, inplace=True)
+        result.fillna(0, inplace=True)
+        self._trim()
+        return result
@@ -0,0 +1,260 @@
+"""
+IndicatorKernels - Kernels NumPy vectorizados para los indicadores del bot.
+
+Trabajan sobre arrays float64 contiguos (sin Series intermedias) y reproducen
+las definiciones de `ta` dentro de tolerancia de punto flotante:
+RSI, EMA, MACD, ATR, ADX/DI, Estocástico, ancho de Bollinger y OBV.
+
+Las recurrencias (EMA, medias de Wilder, suavizado del ADX) se resuelven con
+linear_recurrence(), que procesa bloques en forma cerrada y sólo encadena el
+arrastre entre bloques, de modo que no hay bucles Python por vela.
+
+Uso:
+    from IndicatorKernels import rsi, adx
+    close = df['Close'].to_numpy(dtype=float)
+    df['RSI'] = rsi(close, 10)
+"""
+import math
+
+import numpy as np
+
+_BLOCK = 256   # Longitud máxima de bloque en linear_recurrence
+
+
+def _as_array(x):
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _shift(x, fill=np.nan):
+    out = np.empty_like(x)
+    out[0] = fill
+    out[1:] = x[:-1]
+    return out
+
+
+def linear_recurrence(x, b, y0=0.0):
+    """
+    y[i] = b * y[i-1] + x[i], con y[-1] = y0 (0 < b <= 1).
+    Dentro de cada bloque: y = b^j * (arrastre * b + cumsum(x / b^k)).
+    """
+    x = _as_array(x)
+    n = len(x)
+    if n == 0:
+        return x.copy()
+    if b == 0:
+        return x.copy()
+    # Bloque tal que b^L no se salga del rango de float64
+    block = _BLOCK if b == 1 else max(1, min(_BLOCK, int(280 / -math.log10(b))))
+    n_blocks = -(-n // block)
+    padded = np.zeros(n_blocks * block)
+    padded[:n] = x
+    chunks = padded.reshape(n_blocks, block)
+
+    powers = b ** np.arange(block, dtype=np.float64)           # b^0 .. b^(L-1)
+    partial = np.cumsum(chunks / powers, axis=1) * powers      # recurrencia con arrastre 0
+
+    # Arrastre entre bloques: misma recurrencia con coeficiente b^L sobre los finales
+    ends = partial[:, -1]
+    if n_blocks > 1:
+        carry = linear_recurrence(ends[:-1], b ** block, y0)
+        carry = np.concatenate(([y0], carry))
+    else:
+        carry = np.array([y0])
+    out = partial + carry[:, None] * (powers * b)
+    return out.reshape(-1)[:n]
+
+
+def ema(x, span=None, alpha=None, min_periods=0):
+    """Series.ewm(span|alpha, adjust=False, min_periods).mean(); ignora NaN iniciales."""
+    x = _as_array(x)
+    out = np.full(len(x), np.nan)
+    valid = ~np.isnan(x)
+    if len(x) == 0 or not valid.any():
+        return out
+    first = int(valid.argmax())
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    seq = x[first:]
+    tail = linear_recurrence(alpha * seq[1:], 1.0 - alpha, seq[0])
+    out[first] = seq[0]
+    out[first + 1:] = tail
+    out[first:first + max(min_periods, 1) - 1] = np.nan
+    return out
+
+
+def _rolling_count(x, window):
+    """Observaciones no-NaN en cada ventana."""
+    valid = np.cumsum(~np.isnan(x))
+    counts = valid.copy()
+    counts[window:] -= valid[:-window]
+    return counts
+
+
+def _window_reduce(x, window, op, fill):
+    """Reduce cada ventana con op (np.add/np.minimum/np.maximum) en `window` pasadas contiguas."""
+    padded = np.concatenate((np.full(window - 1, fill), x))
+    n = len(x)
+    out = padded[window - 1:].copy()
+    for k in range(window - 1):
+        op(out, padded[k:k + n], out=out)
+    return out
+
+
+def rolling_mean(x, window, min_periods=None):
+    """Series.rolling(window, min_periods).mean()"""
+    x = _as_array(x)
+    min_periods = window if min_periods is None else min_periods
+    if len(x) == 0:
+        return x.copy()
+    counts = _rolling_count(x, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = _window_reduce(np.nan_to_num(x, nan=0.0), window, np.add, 0.0) / counts
+    out[counts < max(min_periods, 1)] = np.nan
+    return out
+
+
+def rolling_std(x, window, ddof=1, min_periods=None):
+    """Series.rolling(window, min_periods).std(ddof) (dos pasadas: media y desviaciones)."""
+    x = _as_array(x)
+    min_periods = window if min_periods is None else min_periods
+    if len(x) == 0:
+        return x.copy()
+    counts = _rolling_count(x, window)
+    mean = rolling_mean(x, window, 1)
+    n = len(x)
+    padded = np.concatenate((np.full(window - 1, np.nan), x))
+    ssq = np.zeros(n)
+    for k in range(window):
+        dev = padded[k:k + n] - mean
+        ssq += np.where(np.isnan(dev), 0.0, dev * dev)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = np.sqrt(ssq / (counts - ddof))
+    out[(counts < max(min_periods, 1)) | (counts <= ddof)] = np.nan
+    return out
+
+
+def rolling_extreme(x, window, func, min_periods=None):
+    """Series.rolling(window, min_periods).min()/max() con func = np.min / np.max."""
+    x = _as_array(x)
+    min_periods = window if min_periods is None else min_periods
+    if len(x) == 0:
+        return x.copy()
+    op, fill = (np.minimum, np.inf) if func is np.min else (np.maximum, -np.inf)
+    counts = _rolling_count(x, window)
+    out = _window_reduce(np.where(np.isnan(x), fill, x), window, op, fill)
+    out[counts < max(min_periods, 1)] = np.nan
+    return out
+
+
+def rsi(close, window=14):
+    """ta.momentum.RSIIndicator(close, window).rsi()"""
+    close = _as_array(close)
+    diff = close - _shift(close)
+    up = np.where(diff > 0, diff, 0.0)
+    down = -np.where(diff < 0, diff, 0.0)
+    emaup = ema(up, alpha=1.0 / window, min_periods=window)
+    emadn = ema(down, alpha=1.0 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(emadn == 0, 100.0, 100 - (100 / (1 + emaup / emadn)))
+
+
+def macd(close, fast=12, slow=26, signal=9, warmup=True):
+    """
+    ta.trend.MACD → (macd, signal, histograma).
+    warmup=False equivale a ewm(adjust=False) de pandas sin min_periods.
+    """
+    close = _as_array(close)
+    ema_fast = ema(close, span=fast, min_periods=fast if warmup else 0)
+    ema_slow = ema(close, span=slow, min_periods=slow if warmup else 0)
+    line = ema_fast - ema_slow
+    sig = ema(line, span=signal, min_periods=signal if warmup else 0)
+    return line, sig, line - sig
+
+
+def true_range(high, low, close):
+    """max(H-L, |H-C_prev|, |L-C_prev|); en la primera vela sólo H-L."""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    prev_close = _shift(close)
+    ranges = np.vstack((high - low, np.abs(high - prev_close), np.abs(low - prev_close)))
+    return np.nanmax(ranges, axis=0)
+
+
+def atr(high, low, close, window=14):
+    """ta.volatility.AverageTrueRange(...).average_true_range() (media de Wilder)."""
+    tr = true_range(high, low, close)
+    out = np.zeros(len(tr))
+    if len(tr) < window:
+        return out
+    seed = tr[0:window].mean()
+    out[window - 1] = seed
+    out[window:] = linear_recurrence(tr[window:] / window, (window - 1) / window, seed)
+    return out
+
+
+def adx(high, low, close, window=14):
+    """
+    ta.trend.ADXIndicator → (adx, adx_pos, adx_neg), con el arranque de ta:
+    la suma inicial de `window` velas y el ADX inicial como media de DI.
+    """
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    n = len(close)
+    zeros = (np.zeros(n), np.zeros(n), np.zeros(n))
+    m = n - (window - 1)
+    if m <= window + 1:
+        return zeros
+
+    prev_close = _shift(close)
+    dm = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    diff_up = high - _shift(high)
+    diff_down = _shift(low) - low
+    pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+    neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+
+    def _smooth(series):
+        # s[0] = suma de las primeras window velas válidas; s[m-1] queda en 0 como en ta
+        s = np.zeros(m)
+        s[0] = series[~np.isnan(series)][0:window].sum()
+        s[1:m - 1] = linear_recurrence(series[window + 1:n], 1 - 1 / window, s[0])
+        return s
+
+    trs, dip, din = _smooth(dm), _smooth(pos), _smooth(neg)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        total = di_pos + di_neg
+        dx = np.where(total != 0, 100 * np.abs((di_pos - di_neg) / total), 0.0)
+
+    adx_series = np.zeros(m)
+    adx_series[window] = dx[0:window].mean()
+    adx_series[window + 1:] = linear_recurrence(dx[window:m - 1] / window, (window - 1) / window, adx_series[window])
+    adx_out = np.concatenate((np.zeros(window - 1), adx_series))
+
+    pos_out = np.zeros(n)
+    neg_out = np.zeros(n)
+    pos_out[window + 1:window + m - 1] = di_pos[1:m - 1]
+    neg_out[window + 1:window + m - 1] = di_neg[1:m - 1]
+    return adx_out, pos_out, neg_out
+
+
+def stochastic(high, low, close, window=14, smooth_window=3):
+    """ta.momentum.StochasticOscillator → (stoch %K, señal %D)."""
+    close = _as_array(close)
+    smin = rolling_extreme(low, window, np.min)
+    smax = rolling_extreme(high, window, np.max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100 * (close - smin) / (smax - smin)
+    return k, rolling_mean(k, smooth_window)
+
+
+def bollinger_wband(close, window=20, window_dev=2):
+    """ta.volatility.BollingerBands(...).bollinger_wband()"""
+    mavg = rolling_mean(close, window)
+    mstd = rolling_std(close, window, ddof=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((2 * window_dev * mstd) / mavg) * 100
+
+
+def obv(close, volume):
+    """ta.volume.OnBalanceVolumeIndicator(...).on_balance_volume()"""
+    close, volume = _as_array(close), _as_array(volume)
+    return np.cumsum(np.where(close < _shift(close), -volume, volume))
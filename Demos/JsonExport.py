@@ -0,0 +1,142 @@
+"""
+JsonExport - Exportación columnar del JSON legacy (ETHUSD_CapitalData.json).
+
+Sustituye los serializadores con iterrows(): los timestamps y los floats se
+convierten por columna de una vez y el archivo se escribe por bloques con
+DataFrame.to_json (en C), sin construir una lista de dicts por vela.
+
+Dos formatos, los mismos que ya leen los consumidores:
+- LEGACY_FORMAT: 'timestamp' ISO (+00:00), todas las columnas como float y
+  NaN / no numérico → 0.0 (exportación manual, run_dataeth.py, DataEth script)
+- EPOCH_FORMAT: 'Datetime' en ms y valores tal cual (prepare_for_export)
+
+Escritura en segundo plano con json_exporter.submit(): el bucle de trading
+no espera; si llegan varias exportaciones del mismo archivo sólo se escribe
+la última. json_exporter.flush() espera a que termine lo pendiente.
+"""
+import atexit
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+CHUNK_ROWS = 5000
+LEGACY_FORMAT = {'time_field': 'timestamp', 'time_format': 'iso', 'coerce': True}
+EPOCH_FORMAT = {'time_field': 'Datetime', 'time_format': 'ms', 'coerce': False}
+
+
+def export_frame(df, time_field='timestamp', time_format='iso', coerce=True):
+    """
+    DataFrame listo para serializar: columna de tiempo primero y conversión en bloque.
+    Con coerce las columnas no OHLCV quedan en float con NaN/no numérico → 0.0.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            index = index.tz_convert('UTC')
+        if time_format == 'ms':
+            times = index.as_unit('ms').asi8
+        else:
+            times = index.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+    else:
+        times = np.asarray(index)
+
+    columns = {time_field: times}
+    for col in df.columns:
+        values = df[col]
+        if coerce:
+            values = pd.to_numeric(values, errors='coerce').astype(np.float64)
+            if col not in OHLCV:
+                values = values.fillna(0.0)
+        columns[col] = values.to_numpy()
+    return pd.DataFrame(columns)
+
+
+def _write_records(f, frame, chunk_rows):
+    """Escribe frame como array JSON de registros, bloque a bloque."""
+    f.write('[')
+    for lo in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[lo:lo + chunk_rows].to_json(orient='records', double_precision=15)
+        if lo:
+            f.write(',')
+        f.write(chunk[1:-1])
+    f.write(']')
+
+
+def write_json_export(path, sections, chunk_rows=CHUNK_ROWS, **fmt):
+    """
+    Escribe {clave: [registros]} de forma atómica (tmp + os.replace).
+    sections: lista de (clave, DataFrame) en el orden del archivo.
+    Retorna {clave: número de registros}.
+    """
+    fmt = {**LEGACY_FORMAT, **fmt}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    counts = {}
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"   # Único entre hilos y procesos (EthBoy + DataEth)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for i, (key, df) in enumerate(sections):
+            frame = export_frame(df, **fmt)
+            f.write(('' if i == 0 else ', ') + f'"{key}": ')
+            _write_records(f, frame, chunk_rows)
+            counts[key] = len(frame)
+        f.write('}')
+    os.replace(tmp_path, path)
+    return counts
+
+
+class JsonExportWriter:
+    """Hilo escritor de exportaciones JSON; conserva sólo el último trabajo por archivo."""
+
+    def __init__(self):
+        self._pending = {}              # path -> (sections, fmt)
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread = None
+        self.stats = {'submitted': 0, 'written': 0, 'coalesced': 0, 'errors': 0}
+
+    def submit(self, path, sections, **fmt):
+        """Encola la exportación (copia los DataFrames) y retorna sin esperar."""
+        sections = [(key, df.copy() if df is not None else None) for key, df in sections]
+        with self._cond:
+            if path in self._pending:
+                self.stats['coalesced'] += 1
+            self._pending[path] = (sections, fmt)
+            self.stats['submitted'] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='JsonExportWriter', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                path, (sections, fmt) = self._pending.popitem()
+                self._busy = True
+            try:
+                counts = write_json_export(path, sections, **fmt)
+                self.stats['written'] += 1
+                print(f"[INFO] ✅ JSON exportado en segundo plano: {os.path.basename(path)} {counts}")
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"[ERROR] ❌ Error exportando {path}: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Espera a que no queden exportaciones pendientes. Retorna False si venció timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+
+# Escritor global del proceso; al salir se esperan las exportaciones pendientes
+json_exporter = JsonExportWriter()
+atexit.register(json_exporter.flush, 30)
@@ -0,0 +1,161 @@
+"""
+LiveRing - Buffer circular binario de velas live (sustituye a ethusd_live.json).
+
+Formato (little-endian):
+    cabecera de 64 bytes: magic 'ETHRING1', versión, capacidad, total de velas
+                          escritas (cursor) y contador de secuencia
+    registros: [epoch_ms, Open, High, Low, Close, Volume] como float64
+
+Cada vela se escribe dos veces (posición i e i + capacidad), de modo que las
+últimas N velas son siempre un tramo contiguo y latest() las copia de un solo
+corte del mapeo, sin parsear JSON. Añadir una vela es O(1): dos registros y la
+cabecera. Si llega de nuevo la última vela (misma marca de tiempo) se
+sobrescribe en su sitio.
+
+La secuencia es impar mientras el escritor modifica el archivo; los lectores
+copian las velas y sólo las dan por buenas si la secuencia no cambió durante la
+copia (si no, esperan un poco y reintentan). Si un escritor muere
+entre las dos cabeceras, la siguiente escritura recupera la paridad.
+"""
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b'ETHRING1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIQQ')     # magic, versión, capacidad, total, secuencia
+HEADER_SIZE = 64
+FIELDS = ('Datetime', 'Open', 'High', 'Low', 'Close', 'Volume')
+RECORD_SIZE = len(FIELDS) * 8
+DEFAULT_CAPACITY = 100
+READ_RETRIES = 8
+READ_BACKOFF = 0.001        # Espera inicial entre reintentos de lectura (se duplica, máx. 50 ms)
+
+
+class CandleRing:
+    """Buffer circular de velas en un archivo de tamaño fijo."""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._map = None
+        self._map_key = None
+
+    # ---------------------------------------------------------------- cabecera
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _read_header(self, f):
+        f.seek(0)
+        magic, version, capacity, total, seq = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} no es un buffer de velas válido")
+        return capacity, total, seq
+
+    def _write_header(self, f, capacity, total, seq):
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, capacity, total, seq))
+
+    def header(self):
+        """(capacidad, total escritas, secuencia) o None si no existe."""
+        try:
+            with open(self.path, 'rb') as f:
+                return self._read_header(f)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _create(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            self._write_header(f, self.capacity, 0, 0)
+            f.truncate(HEADER_SIZE + 2 * self.capacity * RECORD_SIZE)
+        os.replace(tmp_path, self.path)
+
+    # ---------------------------------------------------------------- escritura
+    def append(self, records):
+        """
+        Añade velas ordenadas: array (n, 6) [epoch_ms, O, H, L, C, V].
+        Las que repiten la marca de tiempo de la última vela la sobrescriben;
+        las anteriores a la última se ignoran. Retorna cuántas se escribieron.
+        """
+        records = np.ascontiguousarray(records, dtype=np.float64).reshape(-1, len(FIELDS))
+        if len(records) == 0:
+            return 0
+        with self._lock:
+            if not self.exists():
+                self._create()
+            with open(self.path, 'r+b') as f:
+                capacity, total, seq = self._read_header(f)
+                last_ts = None
+                if total:
+                    f.seek(HEADER_SIZE + ((total - 1) % capacity) * RECORD_SIZE)
+                    last_ts = struct.unpack('<d', f.read(8))[0]
+
+                # Secuencia impar: escribiendo. seq | 1 también normaliza una secuencia
+                # impar que dejó un escritor interrumpido entre las dos cabeceras.
+                seq |= 1
+                self._write_header(f, capacity, total, seq)
+                f.flush()
+                written = 0
+                for rec in records:
+                    ts = rec[0]
+                    if last_ts is not None and ts < last_ts:
+                        continue
+                    if last_ts is not None and ts == last_ts:
+                        slot = (total - 1) % capacity
+                    else:
+                        slot = total % capacity
+                        total += 1
+                    payload = rec.tobytes()
+                    f.seek(HEADER_SIZE + slot * RECORD_SIZE)
+                    f.write(payload)
+                    f.seek(HEADER_SIZE + (slot + capacity) * RECORD_SIZE)
+                    f.write(payload)
+                    last_ts = ts
+                    written += 1
+                f.flush()
+                self._write_header(f, capacity, total, seq + 1)
+            return written
+
+    # ---------------------------------------------------------------- lectura
+    def _records(self, capacity):
+        """Mapeo de sólo lectura de los 2*capacidad registros (reutilizado mientras no cambie el archivo)."""
+        st = os.stat(self.path)
+        key = (st.st_ino, st.st_size, capacity)
+        if self._map_key != key:
+            self._map = np.memmap(self.path, dtype=np.float64, mode='r', offset=HEADER_SIZE,
+                                  shape=(2 * capacity, len(FIELDS)))
+            self._map_key = key
+        return self._map
+
+    def latest(self, n=None, retries=READ_RETRIES):
+        """
+        Copia (n, 6) de las últimas n velas en orden cronológico (todas si n es None).
+        La copia se valida contra la secuencia: nunca mezcla velas de dos escrituras.
+        """
+        delay = READ_BACKOFF
+        for _ in range(retries):
+            header = self.header()
+            if header is None:
+                return np.empty((0, len(FIELDS)))
+            capacity, total, seq = header
+            if seq % 2 == 0:
+                count = min(total, capacity) if n is None else min(n, total, capacity)
+                end = (total - 1) % capacity + 1 + capacity if total else capacity
+                records = np.array(self._records(capacity)[end - count:end])   # Copiar antes de validar
+                after = self.header()
+                if after is not None and after[2] == seq:
+                    return records
+            time.sleep(delay)               # Escritor activo: esperar antes de reintentar
+            delay = min(delay * 2, 0.05)
+        raise RuntimeError(f"{self.path}: escritor activo, lectura inconsistente")
+
+    def version(self):
+        """Secuencia actual (cambia con cada escritura) o None."""
+        header = self.header()
+        return header[2] if header else None
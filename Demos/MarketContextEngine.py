@@ -0,0 +1,253 @@
+"""
+MarketContextEngine - Contexto de mercado (market_context.json) con actualización O(1) por vela HTF.
+
+Mantiene en memoria el estado que compute_and_save_market_context recalculaba
+sobre todo el HTF en cada ciclo:
+
+    Bollinger(20, 2σ)        media y desviación móviles incrementales
+    historial de squeeze     últimos SQUEEZE_WINDOW anchos de banda
+    DI+ / DI- / ADX          medias de Wilder de ta (IndicatorEngine._Adx)
+    ratio de volumen         medias de 3 y 30 velas (si falta Volume_Ratio)
+    EMAs 200/50/20           recurrencias EMA (si faltan las columnas)
+
+update(historical_data) sólo procesa las velas posteriores a la última vista.
+Las últimas REWIND_CANDLES velas pueden corregirse (p. ej. el refetch del HTF
+ajusta el volumen de la vela recién cerrada): se restaura el estado previo a la
+primera que cambió y se reprocesa desde ahí. Si la serie ya no contiene la
+última vela, o tiene otro número de velas hasta ella que las
+procesadas (relleno de huecos de sync_missing, velas borradas), se reconstruye
+desde el principio. Recortar la ventana por el inicio no obliga a reconstruir.
+snapshot(price) publica el contexto desde memoria sin tocar el DataFrame.
+"""
+import bisect
+import copy
+import math
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+from IndicatorEngine import NAN, _Adx, _Ewm, _RollingMean, _RollingStd
+
+BB_WINDOW = 20
+SQUEEZE_WINDOW = 100
+VOL_RECENT, VOL_AVG = 3, 30
+PRECOMPUTED = ('EMA_200', 'EMA_50', 'EMA_20', 'Volume_Ratio', 'ADX', 'Market_Regime')
+DI_COLUMNS = (("DI+", "DI-"), ("ADX_DI+", "ADX_DI-"), ("DI_plus", "DI_minus"))
+REWIND_CANDLES = 8        # Velas finales que se pueden corregir sin reconstruir
+
+
+def empty_context(price):
+    """Contexto por defecto (menos de BB_WINDOW velas o error)."""
+    return {
+        "state": "ranging",
+        "bb_lower": None,
+        "bb_upper": None,
+        "ema200": None,
+        "ema50": None,
+        "ema20": None,
+        "price_vs_ema200_pct": None,
+        "squeeze_pct": None,
+        "vol_ratio": None,
+        "adx": None,
+        "di_plus": None,
+        "di_minus": None,
+        "bias": None,
+        "price": price,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class _ContextState:
+    """Estado recursivo tras la última vela procesada."""
+    def __init__(self):
+        self.n = 0
+        self.bb_mean = _RollingMean(BB_WINDOW, BB_WINDOW)
+        self.bb_std = _RollingStd(BB_WINDOW, BB_WINDOW, ddof=1)
+        self.widths = deque(maxlen=SQUEEZE_WINDOW)
+        self.bb_mid = self.bb_sd = NAN
+        self.adx = _Adx(14)
+        self.adx_value = 0.
+        self.ema = {span: _Ewm(span=span) for span in (200, 50, 20)}
+        self.ema_value = {}
+        self.vol_recent = deque(maxlen=VOL_RECENT)
+        self.vol_avg = deque(maxlen=VOL_AVG)
+
+    def update(self, h, l, c, v):
+        self.n += 1
+        self.bb_mid = self.bb_mean.update(c)
+        self.bb_sd = self.bb_std.update(c)
+        self.widths.append((self.bb_mid + 2 * self.bb_sd) - (self.bb_mid - 2 * self.bb_sd))
+        self.adx_value = self.adx.update(h, l, c)
+        for span, ema in self.ema.items():
+            self.ema_value[span] = ema.update(c)
+        self.vol_recent.append(v)
+        self.vol_avg.append(v)
+
+
+class MarketContextEngine:
+    """Estado incremental del contexto de mercado sobre el HTF."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.state = _ContextState()
+        self.recent = deque(maxlen=REWIND_CANDLES)   # (timestamp, entradas, estado previo) de las últimas velas
+        self.last_ts = None
+        self.last_row = {}           # Columnas pre-calculadas de la última vela
+        self.seen = []               # Timestamps procesados dentro de la ventana actual (ordenados)
+        self.processed = 0           # Velas procesadas en el último update (diagnóstico)
+
+    def __len__(self):
+        return self.state.n
+
+    def update(self, historical_data):
+        """Incorpora las velas nuevas de historical_data; retorna cuántas procesó."""
+        self.processed = 0
+        if historical_data is None or historical_data.empty:
+            return 0
+        index = historical_data.index
+        start = 0
+        if self.last_ts is not None:
+            del self.seen[:bisect.bisect_left(self.seen, index[0])]   # Ventana recortada por el inicio
+            pos = int(index.searchsorted(self.last_ts))
+            # Velas hasta last_ts en la ventana actual vs. las procesadas en ese tramo
+            if pos < len(index) and index[pos] == self.last_ts and pos + 1 == len(self.seen):
+                start = self._rewind(historical_data, pos)
+            else:
+                self.reset()                           # Historia reescrita: reconstruir
+
+        values = self._inputs(historical_data, start, len(index))
+        keep_from = len(values) - REWIND_CANDLES
+        for i, row in enumerate(values):
+            if i >= keep_from:
+                self.recent.append((index[start + i], row, copy.deepcopy(self.state)))
+            self.state.update(*row.tolist())
+        if len(values):
+            self.seen.extend(index[start:])
+            self.last_ts = index[-1]
+        self.processed = len(values)
+
+        row = historical_data.iloc[-1]
+        self.last_row = {col: row[col] for col in historical_data.columns
+                         if col in PRECOMPUTED or any(col in pair for pair in DI_COLUMNS)}
+        return self.processed
+
+    def _rewind(self, df, pos):
+        """
+        Compara las velas recientes (terminan en pos) con las procesadas y
+        restaura el estado previo a la primera que cambió; retorna desde dónde procesar.
+        """
+        recent = list(self.recent)[max(0, len(self.recent) - (pos + 1)):]   # Sólo las que siguen en la ventana
+        first = pos + 1 - len(recent)
+        current = self._inputs(df, first, pos + 1)
+        for j, (ts, row, before) in enumerate(recent):
+            if df.index[first + j] != ts or not np.array_equal(current[j], row, equal_nan=True):
+                self.state = before                    # Vela corregida: reprocesar desde ella
+                for _ in range(len(recent) - j):
+                    self.recent.pop()
+                    self.seen.pop()
+                return first + j
+        return pos + 1
+
+    @staticmethod
+    def _inputs(df, start, end):
+        cols = ['High', 'Low', 'Close'] + (['Volume'] if 'Volume' in df.columns else [])
+        values = df[cols].iloc[start:end].to_numpy(dtype=float)
+        if 'Volume' not in df.columns:
+            values = np.column_stack([values, np.full(len(values), np.nan)])
+        return values
+
+    def _column(self, name):
+        value = self.last_row.get(name)
+        if value is None or value != value:
+            return None
+        return value
+
+    def snapshot(self, current_price):
+        """Contexto de mercado para current_price a partir del estado en memoria."""
+        ctx = empty_context(current_price)
+        st = self.state
+        if st.n < BB_WINDOW:
+            return ctx
+
+        bb_upper = st.bb_mid + 2 * st.bb_sd
+        bb_lower = st.bb_mid - 2 * st.bb_sd
+        bb_width = bb_upper - bb_lower
+        bb_mean_width = np.nanmean(np.fromiter(st.widths, dtype=float))
+        squeeze_pct = round((bb_width / bb_mean_width) * 100, 1) if bb_mean_width > 0 else 100
+
+        # EMAs — preferir columnas pre-calculadas del HTF
+        ema200 = float(self.last_row["EMA_200"]) if "EMA_200" in self.last_row else st.ema_value[200]
+        ema50 = float(self.last_row["EMA_50"]) if "EMA_50" in self.last_row else st.ema_value[50]
+        ema20 = float(self.last_row["EMA_20"]) if "EMA_20" in self.last_row else st.ema_value[20]
+        price_vs_ema200 = round(((current_price - ema200) / ema200) * 100, 2) if ema200 > 0 else 0
+
+        # Volume ratio — preferir pre-calculado
+        if "Volume_Ratio" in self.last_row:
+            vol_ratio = round(float(self.last_row["Volume_Ratio"]), 2)
+        elif not math.isnan(st.vol_avg[-1]):
+            vol_avg = np.mean(st.vol_avg)
+            vol_ratio = round(np.mean(st.vol_recent) / vol_avg, 2) if vol_avg > 0 else 1.0
+        else:
+            vol_ratio = 1.0
+
+        # ADX — preferir pre-calculado; DI+/DI- de columnas o del estado de Wilder
+        adx_val = self._column("ADX")
+        adx_val = float(adx_val) if adx_val is not None else None
+        di_plus = di_minus = None
+        for col_p, col_m in DI_COLUMNS:
+            if col_p in self.last_row and col_m in self.last_row:
+                if self._column(col_p) is not None and self._column(col_m) is not None:
+                    di_plus, di_minus = float(self.last_row[col_p]), float(self.last_row[col_m])
+                break
+        if di_plus is None and st.n >= 14:
+            di_plus, di_minus = st.adx.di()
+            if adx_val is None:
+                adx_val = float(st.adx_value)
+
+        # Market_Regime pre-calculado (fallback para state)
+        precomputed_regime = str(self.last_row.get("Market_Regime", "")).upper()
+
+        # Detectar estado
+        if current_price > bb_upper:
+            state = "breakout_up"
+        elif current_price < bb_lower:
+            state = "breakout_down"
+        elif squeeze_pct < 50:
+            state = "squeeze"
+        elif adx_val is not None and adx_val < 20:
+            state = "choppy"
+        elif precomputed_regime == "CHOPPY":
+            state = "choppy"
+        else:
+            state = "ranging"
+
+        # Bias basado en ADX + DI
+        bias = None
+        if adx_val is not None and adx_val >= 25:
+            if di_plus is not None and di_minus is not None:
+                if di_plus > di_minus:
+                    bias = "BULLISH"
+                elif di_minus > di_plus:
+                    bias = "BEARISH"
+        elif adx_val is not None and adx_val < 20:
+            bias = "CHOPPY"
+
+        ctx.update({
+            "state": state,
+            "bb_lower": round(float(bb_lower), 2),
+            "bb_upper": round(float(bb_upper), 2),
+            "ema200": round(float(ema200), 2),
+            "ema50": round(float(ema50), 2),
+            "ema20": round(float(ema20), 2),
+            "price_vs_ema200_pct": price_vs_ema200,
+            "squeeze_pct": squeeze_pct,
+            "vol_ratio": vol_ratio,
+            "adx": round(adx_val, 1) if adx_val else None,
+            "di_plus": round(di_plus, 1) if di_plus else None,
+            "di_minus": round(di_minus, 1) if di_minus else None,
+            "bias": bias,
+        })
+        return ctx
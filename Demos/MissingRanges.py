@@ -0,0 +1,262 @@
+"""
+MissingRanges - Índice en memoria de los tramos sin datos (Reports/missing_ranges.json).
+
+Mantiene las entradas ordenadas por inicio junto con el máximo acumulado de
+sus finales, lo que permite resolver consultas de solapamiento y contención
+con búsqueda binaria en lugar de comparar claves exactas "start->end".
+Los cambios se acumulan en memoria y se escriben por lotes, de forma atómica
+(archivo temporal + os.replace).
+
+El formato del JSON no cambia: {"<start>-><end>": {start, end, attempts, last_attempt, reason}}
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+MISSING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Reports', 'missing_ranges.json')
+FLUSH_INTERVAL_SECONDS = 5.0   # Escritura máxima cada N segundos (el resto queda para flush())
+
+
+def _ts(value):
+    """Epoch (s) de un datetime/Timestamp/ISO string."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def range_key(start, end):
+    return f"{start.isoformat()}->{end.isoformat()}"
+
+
+class MissingRangeIndex:
+    """Índice de intervalos sin datos con persistencia por lotes."""
+
+    def __init__(self, path=MISSING_FILE, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._starts = []        # inicios ordenados
+        self._ends = []          # finales en el mismo orden
+        self._keys = []          # claves en el mismo orden
+        self._max_end = []       # máximo acumulado de finales (monótono)
+        self._loaded = False
+        self._mtime = None
+        self._dirty = False
+        self._last_flush = 0.0
+
+    # ------------------------------------------------------------------ carga
+    @classmethod
+    def from_entries(cls, entries):
+        """Índice sólo en memoria sobre un dict ya cargado (sin archivo asociado)."""
+        index = cls(path=None)
+        index._entries = {k: dict(v) for k, v in entries.items()}
+        index._loaded = True
+        index._rebuild()
+        return index
+
+    def _file_mtime(self):
+        if self.path is None:
+            return None
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def _ensure_loaded(self):
+        """Carga perezosa; recarga si otro proceso cambió el archivo y no hay cambios pendientes."""
+        mtime = self._file_mtime()
+        if self._loaded and (self._dirty or mtime == self._mtime):
+            return
+        entries = {}
+        if mtime is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    entries = json.load(f)
+            except Exception as e:
+                print(f"[WARNING] Error al leer missing_ranges.json: {e}")
+        self._entries = entries
+        self._mtime = mtime
+        self._loaded = True
+        self._rebuild()
+
+    def _rebuild(self):
+        items = []
+        for key, entry in self._entries.items():
+            try:
+                items.append((_ts(entry['start']), _ts(entry['end']), key))
+            except Exception:
+                start, _, end = key.partition('->')
+                try:
+                    items.append((_ts(start), _ts(end), key))
+                except Exception:
+                    continue
+        items.sort()
+        self._starts = [s for s, _, _ in items]
+        self._ends = [e for _, e, _ in items]
+        self._keys = [k for _, _, k in items]
+        self._max_end = []
+        running = float('-inf')
+        for e in self._ends:
+            running = max(running, e)
+            self._max_end.append(running)
+
+    def _touch(self):
+        self._dirty = True
+        self._rebuild()
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    # ---------------------------------------------------------------- consultas
+    def as_dict(self):
+        with self._lock:
+            self._ensure_loaded()
+            return {k: dict(v) for k, v in self._entries.items()}
+
+    def get(self, start, end):
+        with self._lock:
+            self._ensure_loaded()
+            return self._entries.get(range_key(start, end))
+
+    def overlapping(self, start, end):
+        """Entradas que se solapan con [start, end], ordenadas por inicio."""
+        with self._lock:
+            self._ensure_loaded()
+            s, e = _ts(start), _ts(end)
+            hi = bisect_right(self._starts, e)
+            lo = bisect_left(self._max_end, s)
+            return [(self._keys[i], self._entries[self._keys[i]]) for i in range(lo, hi) if self._ends[i] >= s]
+
+    def containing(self, start, end):
+        """Entradas que contienen por completo [start, end]."""
+        s, e = _ts(start), _ts(end)
+        return [(k, v) for k, v in self.overlapping(start, end) if _ts(v['start']) <= s and _ts(v['end']) >= e]
+
+    def covered_by(self, start, end, entries):
+        """True si la unión de `entries` cubre [start, end] sin huecos."""
+        s, e = _ts(start), _ts(end)
+        reach = s
+        for _, v in sorted(entries, key=lambda kv: _ts(kv[1]['start'])):
+            if _ts(v['start']) > reach:
+                return False
+            reach = max(reach, _ts(v['end']))
+            if reach >= e:
+                return True
+        return reach >= e
+
+    # --------------------------------------------------------------- mutaciones
+    def register(self, start, end, reason="no-data", now=None):
+        now = now or datetime.now(timezone.utc)
+        key = range_key(start, end)
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            if entry:
+                entry['attempts'] = entry.get('attempts', 0) + 1
+                entry['last_attempt'] = now.isoformat()
+                entry['reason'] = reason
+            else:
+                entry = self._entries[key] = {
+                    'start': start.isoformat(),
+                    'end': end.isoformat(),
+                    'attempts': 1,
+                    'last_attempt': now.isoformat(),
+                    'reason': reason
+                }
+            self._touch()
+            return key, dict(entry)
+
+    def clear(self, start, end):
+        """Elimina la entrada exacta y las contenidas en [start, end] (ya tienen datos)."""
+        s, e = _ts(start), _ts(end)
+        with self._lock:
+            removed = [k for k, v in self.overlapping(start, end) if _ts(v['start']) >= s and _ts(v['end']) <= e]
+            exact = range_key(start, end)
+            if exact in self._entries and exact not in removed:
+                removed.append(exact)
+            for k in removed:
+                self._entries.pop(k, None)
+            if removed:
+                self._touch()
+            return removed
+
+    def replace(self, entries):
+        with self._lock:
+            self._loaded = True
+            self._entries = {k: dict(v) for k, v in entries.items()}
+            self._touch()
+
+    def merge_adjacent(self, tolerance_seconds=0.0, contained_only=False):
+        """
+        Fusiona entradas solapadas o contiguas (inicio <= fin de la anterior):
+        conserva el máximo de intentos y el último intento más reciente.
+        Con tolerance_seconds > 0 también une entradas separadas por un hueco de
+        hasta esa duración; como las horas del hueco nunca se intentaron, el
+        tramo resultante vuelve a 0 intentos (DataEth lo reintentará en lugar
+        de darlo por permanente).
+        Con contained_only=True sólo absorbe las entradas contenidas en otra.
+        Retorna cuántas entradas desaparecieron.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            before = len(self._entries)
+            merged = []   # [start_ts, end_ts, entry, une un hueco]
+            for i, key in enumerate(self._keys):
+                entry = dict(self._entries[key])
+                s, e = self._starts[i], self._ends[i]
+                if merged:
+                    last = merged[-1]
+                    bridges = not contained_only and last[1] < s <= last[1] + tolerance_seconds
+                    joinable = e <= last[1] if contained_only else s <= last[1] or bridges
+                    if joinable:
+                        prev = last[2]
+                        if e > last[1]:
+                            last[1] = e
+                            prev['end'] = entry['end']
+                        last[3] = last[3] or bridges
+                        if last[3]:
+                            prev['attempts'] = 0
+                            prev['last_attempt'] = None
+                        else:
+                            prev['attempts'] = max(prev.get('attempts', 0), entry.get('attempts', 0))
+                            prev['last_attempt'] = max(prev.get('last_attempt') or '', entry.get('last_attempt') or '') or None
+                        reasons = [r for r in (prev.get('reason'), entry.get('reason')) if r]
+                        prev['reason'] = '+'.join(dict.fromkeys('+'.join(reasons).split('+'))) if reasons else None
+                        continue
+                merged.append([s, e, entry, False])
+            self._entries = {f"{m[2]['start']}->{m[2]['end']}": m[2] for m in merged}
+            removed = before - len(self._entries)
+            if removed:
+                self._touch()
+            return removed
+
+    # --------------------------------------------------------------- persistencia
+    def flush(self, force=False):
+        """Escribe el estado si hay cambios pendientes (atómico: tmp + os.replace)."""
+        with self._lock:
+            if self.path is None or not (self._dirty or force):
+                return False
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._entries, f, indent=2, default=str)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"[ERROR] Error al guardar missing_ranges.json: {e}")
+                return False
+            self._dirty = False
+            self._mtime = self._file_mtime()
+            self._last_flush = time.monotonic()
+            return True
+
+
+# Índice global del proceso (DataEth); los cambios pendientes se escriben al salir
+missing_index = MissingRangeIndex()
+atexit.register(missing_index.flush)
@@ -0,0 +1,154 @@
+"""
+ParallelBackfill - Recálculo completo de indicadores por bloques en un pool de procesos.
+
+Para reconstrucciones completas (cambio de esquema, indicador nuevo, backfill de
+5 años) en lugar de un único calculate_indicators sobre todo el histórico:
+
+    1. El histórico se parte en bloques de chunk_rows velas.
+    2. Cada bloque se calcula con calculate_indicators en un proceso del pool,
+       precedido de WARMUP_CANDLES velas de calentamiento (lookback de EMA_200 y
+       de la cadena ADX) y seguido de SEAM_CHECK_CANDLES velas de solape.
+    3. Se descarta el calentamiento, se cose el OBV (acumulado: cada bloque
+       empieza en 0, se desplaza para continuar el anterior) y se concatenan.
+    4. En cada costura se comparan las velas de solape calculadas por los dos
+       bloques vecinos: el anterior las calcula con historia continua, como la
+       ejecución serie, el siguiente justo tras su calentamiento. Si alguna
+       costura sale de tolerancia se recalcula todo en serie.
+
+backfill_report guarda el resultado de la última reconstrucción (bloques,
+tiempos y diferencia máxima por costura).
+"""
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# EMA_200: el error de la semilla decae como (199/201)^n → ~1e-13 tras 3000 velas.
+# La cadena ADX (Wilder 14 + media del DX) y los RSI convergen en menos de 1000.
+WARMUP_CANDLES = 3000
+SEAM_CHECK_CANDLES = 64
+MIN_CHUNK_ROWS = 10000          # Por debajo el calentamiento pesa más que el reparto
+SEAM_RTOL = 1e-6
+SEAM_ATOL = 1e-6
+
+backfill_report = {}
+
+
+def _compute_chunk(frame):
+    """Indicadores de un bloque (se ejecuta en el proceso hijo, sin logs por bloque)."""
+    from DataEth import calculate_indicators
+    with contextlib.redirect_stdout(io.StringIO()):
+        return calculate_indicators(frame, recent_days=None)
+
+
+def _plan_chunks(n, chunk_rows, warmup, overlap):
+    """[(inicio_calculo, inicio_propio, fin_propio, fin_calculo)] por bloque."""
+    plan = []
+    for start in range(0, n, chunk_rows):
+        end = min(n, start + chunk_rows)
+        plan.append((max(0, start - warmup), start, end, min(n, end + overlap)))
+    if len(plan) > 1 and plan[-1][2] - plan[-1][1] < chunk_rows // 2:
+        first, start, _, _ = plan.pop(-2)
+        plan[-1] = (first, start, n, n)          # Último bloque corto → se une al anterior
+    return plan
+
+
+def _seam_diff(prev, nxt):
+    """Diferencia máxima entre dos cálculos de las mismas velas."""
+    diffs = {}
+    mismatched = []
+    for col in prev.columns:
+        a, b = prev[col], nxt[col]
+        if pd.api.types.is_numeric_dtype(a.dtype):
+            a, b = a.to_numpy(dtype=float), b.to_numpy(dtype=float)
+            diff = float(np.max(np.abs(a - b))) if len(a) else 0.0
+            if diff > 0:
+                diffs[col] = diff
+            if not np.allclose(a, b, rtol=SEAM_RTOL, atol=SEAM_ATOL, equal_nan=True):
+                mismatched.append(col)
+        elif not a.equals(b):
+            mismatched.append(col)
+    return diffs, mismatched
+
+
+def backfill_indicators(data, workers=None, chunk_rows=None, warmup=WARMUP_CANDLES, check_seams=True):
+    """
+    Equivalente a calculate_indicators(data) para históricos completos, calculado
+    por bloques en paralelo. Históricos cortos (o workers=1) van en serie.
+    """
+    from DataEth import calculate_indicators, normalize_prices
+
+    if data is None or data.empty:
+        return calculate_indicators(data)
+
+    workers = workers or os.cpu_count() or 1
+    n = len(data)
+    if chunk_rows is None:
+        chunk_rows = max(MIN_CHUNK_ROWS, math.ceil(n / workers))
+    if workers < 2 or n < 2 * chunk_rows:
+        backfill_report.clear()
+        backfill_report.update({'rows': n, 'chunks': 1, 'workers': 1, 'seams': [], 'ok': True})
+        return calculate_indicators(data, recent_days=None)
+
+    # Mismo saneado que calculate_indicators, una sola vez antes de trocear
+    data = normalize_prices(data)
+    if 'Close' in data.columns:
+        data = data.dropna(subset=['Close'])
+    n = len(data)
+
+    t0 = time.time()
+    overlap = SEAM_CHECK_CANDLES if check_seams else 1
+    plan = _plan_chunks(n, chunk_rows, warmup, overlap)
+    frames = [data.iloc[lo:hi] for lo, _, _, hi in plan]
+    print(f"[INFO] ⚙️ Backfill de indicadores: {n} velas en {len(plan)} bloques "
+          f"({workers} procesos, calentamiento {warmup})")
+
+    # spawn: seguro con hilos vivos en el proceso padre y válido también en Windows
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(plan)), mp_context=ctx) as pool:
+        results = list(pool.map(_compute_chunk, frames))
+
+    pieces = []
+    seams = []
+    prev = None
+    for (lo, start, end, hi), result in zip(plan, results):
+        if prev is not None and 'OBV' in result.columns:
+            # OBV acumulado: desplazar para continuar el bloque anterior en la primera vela propia
+            seam_ts = result.index[start - lo]
+            result['OBV'] = result['OBV'] + (prev['OBV'].loc[seam_ts] - result['OBV'].loc[seam_ts])
+        if prev is not None and check_seams:
+            shared = prev.index[prev.index >= result.index[start - lo]]
+            diffs, mismatched = _seam_diff(prev.loc[shared], result.loc[shared])
+            seams.append({
+                'at': str(result.index[start - lo]),
+                'candles': len(shared),
+                'max_abs_diff': max(diffs.values(), default=0.0),
+                'worst_column': max(diffs, key=diffs.get) if diffs else None,
+                'mismatched': mismatched,
+            })
+        pieces.append(result.iloc[start - lo:end - lo])
+        prev = result
+
+    out = pd.concat(pieces)
+    ok = not any(s['mismatched'] for s in seams)
+    backfill_report.clear()
+    backfill_report.update({
+        'rows': len(out), 'chunks': len(plan), 'workers': workers, 'warmup': warmup,
+        'seconds': round(time.time() - t0, 2), 'seams': seams, 'ok': ok,
+    })
+
+    if ok:
+        worst = max((s['max_abs_diff'] for s in seams), default=0.0)
+        print(f"[INFO] ✅ Backfill completado en {backfill_report['seconds']}s: "
+              f"{len(seams)} costuras verificadas (máx. dif. {worst:.2e})")
+    else:
+        bad = [(s['at'], s['mismatched']) for s in seams if s['mismatched']]
+        print(f"[WARNING] ⚠️ Costuras fuera de tolerancia: {bad}; se recalcula en serie")
+        return calculate_indicators(data, recent_days=None)
+    return out
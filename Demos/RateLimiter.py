@@ -0,0 +1,142 @@
+"""
+RateLimiter - Token bucket por host compartido por todo el HTTP saliente.
+
+Cada host tiene un bucket configurado con el límite publicado por su API.
+Los llamadores sólo esperan lo que realmente falta para tener cuota; la
+capacidad de ráfaga permite que las sincronizaciones cortas no esperen nada.
+
+Uso:
+    from RateLimiter import http
+    response = http.get(url, params=params, timeout=15)              # peso 1
+    response = http.get(url, params=params, timeout=15, weight=2)    # peso Binance klines
+
+`http` usa una requests.Session por hilo (Session no es thread-safe); todas
+comparten los buckets de rate_limiter. Las llamadas autenticadas de Capital.com
+no usan sesión: rate_limiter.acquire(url) y luego requests.* sin estado, para
+que no persistan cookies entre llamadas ni cuentas.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+# host → (tokens por segundo, capacidad de ráfaga)
+HOST_LIMITS = {
+    # Binance: 6000 de peso por minuto por IP (klines y ticker/price pesan 2)
+    'api.binance.com': (100.0, 1200),
+    # Kraken público: ~1 llamada/s sostenida, contador con ráfaga de 15 (tier Starter)
+    'api.kraken.com': (1.0, 15),
+    # CryptoCompare gratuito: 50 llamadas/s y 2000/min
+    'min-api.cryptocompare.com': (33.0, 50),
+    # Capital.com: 10 peticiones/s por usuario
+    'api-capital.backend-capital.com': (10.0, 10),
+    'demo-api-capital.backend-capital.com': (10.0, 10),
+}
+DEFAULT_LIMIT = (5.0, 5)  # Hosts sin límite publicado
+
+
+class TokenBucket:
+    """Bucket thread-safe: rate tokens/s hasta capacity tokens."""
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens=1):
+        """Reserva tokens y retorna los segundos a esperar antes de usarlos."""
+        tokens = min(float(tokens), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= tokens
+            wait = max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+            return wait
+
+    def block(self, seconds):
+        """Vacía el bucket y bloquea el host durante `seconds` (p.ej. tras un 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RateLimiter:
+    """Un TokenBucket por host, creado bajo demanda desde HOST_LIMITS."""
+    def __init__(self, limits=None):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                rate, capacity = self.limits.get(host, DEFAULT_LIMIT)
+                self._buckets[host] = TokenBucket(rate, capacity)
+            return self._buckets[host]
+
+    def acquire(self, url, weight=1):
+        """Bloquea sólo lo necesario para disponer de `weight` tokens del host de url."""
+        host = urlsplit(url).hostname or url
+        wait = self.bucket(host).reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, url, seconds):
+        host = urlsplit(url).hostname or url
+        self.bucket(host).block(seconds)
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session que pasa cada petición por el RateLimiter compartido."""
+    def __init__(self, limiter):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, method, url, *args, weight=1, **kwargs):
+        self.limiter.acquire(url, weight)
+        response = super().request(method, url, *args, **kwargs)
+        if response.status_code in (418, 429):
+            try:
+                retry_after = float(response.headers.get('Retry-After', 1))
+            except ValueError:
+                retry_after = 1.0
+            self.limiter.penalize(url, retry_after)
+        return response
+
+
+class ThreadLocalHttp:
+    """Una RateLimitedSession por hilo sobre el mismo RateLimiter."""
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self._local = threading.local()
+
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = RateLimitedSession(self.limiter)
+        return session
+
+    def request(self, method, url, *args, **kwargs):
+        return self.session().request(method, url, *args, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.session().get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session().post(url, **kwargs)
+
+
+# Instancias globales: buckets compartidos por todo el proceso (DataEth, ApiProviders,
+# EthSession, EthBoy); sesiones HTTP por hilo
+rate_limiter = RateLimiter()
+http = ThreadLocalHttp(rate_limiter)
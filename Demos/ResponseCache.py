@@ -0,0 +1,180 @@
+"""
+ResponseCache - Caché en disco de las velas devueltas por las APIs gratuitas.
+
+Las velas de un intervalo ya cerrado no cambian, así que la respuesta de un
+proveedor para ese tramo se guarda para siempre. Los rangos se parten en
+bloques alineados (30 días de HOUR, 1 día de MINUTE); cada bloque cerrado se
+descarga completo una vez y se guarda comprimido en
+Reports/response_cache/<hh>/<sha256>.json.gz, con la clave
+proveedor|símbolo|intervalo|inicio|fin. Cualquier rango cerrado posterior se
+sirve desde disco aunque no coincida con el rango original.
+
+Cada bloque se descarga una sola vez aunque lo pidan a la vez varios
+segmentos (los de split_range no están alineados a los bloques y dos vecinos
+comparten el bloque frontera): un lock en vuelo por bloque hace esperar al
+segundo, que luego lo sirve desde disco.
+
+Modo offline (RESPONSE_CACHE_OFFLINE=1 o response_cache.offline = True):
+sólo se sirve desde la caché; si falta algún bloque el resultado es None,
+igual que un error de la API, y nunca se toca la red.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from ApiProviders import INTERVAL_SECONDS, epoch_seconds
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Reports', 'response_cache')
+# Tamaño del bloque de caché en velas por intervalo
+BLOCK_CANDLES = {'HOUR': 30 * 24, 'MINUTE': 24 * 60}
+
+
+class ResponseCache:
+    """Caché direccionada por contenido de las velas de cada proveedor."""
+
+    def __init__(self, root=CACHE_DIR, offline=None):
+        self.root = root
+        if offline is None:
+            offline = os.getenv('RESPONSE_CACHE_OFFLINE', '0').lower() in ('1', 'true', 'yes')
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'bypass': 0}
+        self._lock = threading.Lock()
+        self._inflight = {}          # clave -> [lock del bloque, hilos que lo usan]
+
+    # ------------------------------------------------------------------ claves
+    @staticmethod
+    def key(provider, symbol, interval, start_s, end_s):
+        return f"{provider}|{symbol}|{interval}|{start_s}|{end_s}"
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], f"{digest}.json.gz")
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    @contextmanager
+    def _block_lock(self, key):
+        """Serializa la descarga de un mismo bloque entre hilos."""
+        with self._lock:
+            entry = self._inflight.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._inflight[key]
+
+    # ---------------------------------------------------------------- lectura/escritura
+    def get(self, key):
+        """Filas [epoch_s, open, high, low, close, volume] guardadas para key, o None."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt') as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"[WARNING] Entrada de caché corrupta {path}: {e}")
+            return None
+        if payload.get('key') != key:
+            return None
+        return payload['rows']
+
+    def put(self, key, rows):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wt') as f:
+                json.dump({'key': key, 'rows': rows}, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            self._count('stored')
+        except Exception as e:
+            print(f"[WARNING] No se pudo guardar en caché {key}: {e}")
+
+    # ------------------------------------------------------------------ bloques
+    @staticmethod
+    def blocks(start_s, end_s, interval):
+        """Bloques alineados (inicio, fin) en epoch s que cubren [start_s, end_s]."""
+        step = INTERVAL_SECONDS[interval]
+        size = BLOCK_CANDLES[interval] * step
+        first = start_s - start_s % size
+        return [(b, b + size - step) for b in range(first, end_s + 1, size)]
+
+    @staticmethod
+    def is_closed(block_end_s, interval, now=None):
+        """True si la última vela del bloque ya cerró."""
+        now = time.time() if now is None else now
+        return block_end_s + INTERVAL_SECONDS[interval] <= now
+
+    # -------------------------------------------------------------------- fetch
+    def fetch(self, adapter, start, end, interval):
+        """
+        Equivalente cacheado de adapter.fetch_range(start, end, interval).
+        Retorna DataFrame OHLCV, DataFrame vacío sin velas o None si falló algún tramo.
+        """
+        start_s, end_s = epoch_seconds(start), epoch_seconds(end)
+        rows = []
+        for block_start, block_end in self.blocks(start_s, end_s, interval):
+            key = self.key(adapter.name, adapter.symbol, interval, block_start, block_end)
+            cached = self.get(key)
+            if cached is not None:
+                self._count('hits')
+                rows.extend(cached)
+                continue
+            if self.offline:
+                self._count('misses')
+                print(f"[WARNING] Modo offline: falta {key} en la caché de respuestas")
+                return None
+
+            lo = pd.Timestamp(max(block_start, start_s), unit='s', tz='UTC')
+            hi = pd.Timestamp(min(block_end, end_s), unit='s', tz='UTC')
+            b_lo = pd.Timestamp(block_start, unit='s', tz='UTC')
+            b_hi = pd.Timestamp(block_end, unit='s', tz='UTC')
+            if not (self.is_closed(block_end, interval) and adapter.can_serve(b_lo, b_hi, interval)):
+                # Bloque abierto o fuera del histórico del proveedor: descarga directa sin caché
+                self._count('bypass')
+                df = adapter.fetch_range(lo, hi, interval)
+                if df is None:
+                    return None
+                rows.extend(self._rows(df))
+                continue
+
+            with self._block_lock(key):
+                cached = self.get(key)      # Otro segmento pudo descargarlo mientras esperábamos
+                if cached is not None:
+                    self._count('hits')
+                    rows.extend(cached)
+                    continue
+                self._count('misses')
+                df = adapter.fetch_range(b_lo, b_hi, interval)
+                if df is None:
+                    return None
+                block_rows = self._rows(df)
+                if block_rows:
+                    self.put(key, block_rows)
+            rows.extend(block_rows)
+        return adapter._to_frame(rows, start, end)
+
+    @staticmethod
+    def _rows(df):
+        if df is None or df.empty:
+            return []
+        epochs = df.index.as_unit('s').asi8.tolist()
+        values = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=float).tolist()
+        return [[t, *v] for t, v in zip(epochs, values)]
+
+
+# Instancia global (DataEth la usa para todas las descargas de proveedores)
+response_cache = ResponseCache()
@@ -0,0 +1,233 @@
+"""
+SharedCandles - Caché de velas HTF/LTF compartida entre procesos por memoria mapeada.
+
+El proceso que lee o escribe el almacén Parquet publica las columnas en un
+archivo binario (índice int64 + una matriz por columnas para cada dtype
+numérico, p. ej. float64/float32/int8 del esquema compacto + códigos de las
+columnas de texto o categóricas) y un puntero JSON con el número de versión:
+
+    Reports/shared_candles/htf.json          ← puntero (versión, archivo, columnas)
+    Reports/shared_candles/htf-<ver>-<pid>.bin
+
+EthBoy, Evaluador y los scripts auxiliares se adjuntan con np.memmap en modo
+copia-en-escritura: las páginas las comparte el sistema operativo entre
+procesos y el DataFrame se construye sobre el mapeo sin deserializar nada.
+Sólo se vuelve a mapear cuando cambia la versión del puntero.
+
+La versión publicada es la del manifiesto del CandleStore del que salieron
+los datos, así que un lector sabe si la caché está al día sin abrir Parquet.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+SHARED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Reports', 'shared_candles')
+STALE_FILE_SECONDS = 120   # Antigüedad mínima para borrar versiones ya no referenciadas
+
+
+class SharedCandleCache:
+    """Publicación y mapeo de DataFrames de velas versionados."""
+
+    def __init__(self, root=SHARED_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._mapped = {}      # timeframe -> (pointer_mtime_ns, version, DataFrame)
+        self.stats = {'attached': 0, 'reused': 0, 'published': 0}
+        self._fallback_warned = False
+
+    def _pointer_path(self, timeframe):
+        return os.path.join(self.root, f"{timeframe.lower()}.json")
+
+    # ---------------------------------------------------------------- escritura
+    def publish(self, timeframe, df, version):
+        """Escribe df como versión `version` y actualiza el puntero de forma atómica."""
+        if df is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+            return False
+        os.makedirs(self.root, exist_ok=True)
+        tf = timeframe.lower()
+        index = df.index.tz_convert('UTC') if df.index.tz is not None else df.index.tz_localize('UTC')
+        epochs = index.as_unit('ns').asi8
+
+        blocks, cat_cols = {}, []   # dtype -> columnas (se conserva el dtype del esquema)
+        for col in df.columns:
+            dtype = df[col].dtype
+            if isinstance(dtype, np.dtype) and dtype.kind in 'fiub':
+                blocks.setdefault(dtype.str, []).append(col)
+            elif pd.api.types.is_numeric_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype):
+                blocks.setdefault(np.dtype(np.float64).str, []).append(col)   # Extension dtypes → float64
+            else:
+                cat_cols.append(col)
+        n = len(df)
+        matrices = []
+        for dtype, cols in blocks.items():
+            matrix = np.empty((len(cols), n), dtype=np.dtype(dtype))
+            for i, col in enumerate(cols):
+                values = df[col].to_numpy()
+                matrix[i] = values if values.dtype == matrix.dtype else df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            matrices.append(matrix)
+        categories, codes = {}, []
+        for col in cat_cols:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                cat = df[col].array   # Conserva las categorías declaradas en el esquema
+            else:
+                cat = pd.Categorical(df[col].astype(object).where(df[col].notna(), None))
+            categories[col] = [str(c) for c in cat.categories]
+            codes.append(cat.codes.astype(np.int16))
+
+        name = f"{tf}-{version}-{os.getpid()}.bin"
+        path = os.path.join(self.root, name)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(epochs.tobytes())
+            for matrix in matrices:
+                f.write(matrix.tobytes())
+            for c in codes:
+                f.write(c.tobytes())
+        os.replace(path + '.tmp', path)
+
+        pointer = {'version': version, 'file': name, 'rows': n, 'columns': [str(c) for c in df.columns],
+                   'blocks': [{'dtype': dtype, 'columns': [str(c) for c in cols]} for dtype, cols in blocks.items()],
+                   'category_columns': categories, 'index_name': df.index.name,
+                   'published': time.time(), 'pid': os.getpid()}
+        pointer_path = self._pointer_path(tf)
+        tmp_pointer = f"{pointer_path}.{os.getpid()}.tmp"
+        with open(tmp_pointer, 'w') as f:
+            json.dump(pointer, f)
+        os.replace(tmp_pointer, pointer_path)
+        self.stats['published'] += 1
+        self._cleanup(tf, keep=name)
+        return True
+
+    def _cleanup(self, tf, keep):
+        """Borra versiones viejas; en Windows un archivo mapeado no se puede borrar y se reintenta luego."""
+        now = time.time()
+        for path in glob.glob(os.path.join(self.root, f"{tf}-*.bin")):
+            if os.path.basename(path) == keep:
+                continue
+            try:
+                if now - os.path.getmtime(path) >= STALE_FILE_SECONDS:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    # ---------------------------------------------------------------- lectura
+    def _read_pointer(self, timeframe):
+        path = self._pointer_path(timeframe)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with open(path, 'r') as f:
+                return mtime, json.load(f)
+        except (OSError, ValueError):
+            return None, None
+
+    def version(self, timeframe):
+        """Versión publicada (None si no hay caché compartida)."""
+        _, pointer = self._read_pointer(timeframe)
+        return pointer.get('version') if pointer else None
+
+    def attach(self, timeframe, version=None):
+        """
+        DataFrame sobre el mapeo de la última versión (o None si no existe o no
+        coincide con `version`). Cada llamada devuelve una copia superficial:
+        añadir o reemplazar columnas no altera la caché del proceso y el archivo
+        nunca se modifica (mapeo copia-en-escritura).
+        """
+        tf = timeframe.lower()
+        with self._lock:
+            cached = self._mapped.get(tf)
+            try:
+                mtime = os.stat(self._pointer_path(tf)).st_mtime_ns
+            except OSError:
+                return None
+            if cached and cached[0] == mtime and (version is None or cached[1] == version):
+                self.stats['reused'] += 1
+                return cached[2].copy(deep=False)
+
+            mtime, pointer = self._read_pointer(tf)
+            if not pointer or (version is not None and pointer['version'] != version):
+                return None
+            if cached and cached[1] == pointer['version']:
+                self._mapped[tf] = (mtime, cached[1], cached[2])
+                self.stats['reused'] += 1
+                return cached[2].copy(deep=False)
+            try:
+                df = self._map(pointer)
+            except Exception as e:     # El llamador recurre a store.read()
+                print(f"[WARNING] No se pudo mapear la caché compartida {tf}: {e}")
+                return None
+            self._mapped[tf] = (mtime, pointer['version'], df)
+            self.stats['attached'] += 1
+            return df.copy(deep=False)
+
+    def _map(self, pointer):
+        path = os.path.join(self.root, pointer['file'])
+        n = pointer['rows']
+        blocks = pointer.get('blocks')
+        if blocks is None:   # Puntero anterior: un único bloque float64
+            blocks = [{'dtype': '<f8', 'columns': pointer.get('float_columns', [])}]
+        epochs = np.memmap(path, dtype=np.int64, mode='c', offset=0, shape=(n,))
+        offset = n * 8
+
+        index = pd.DatetimeIndex(epochs.view('datetime64[ns]'), name=pointer.get('index_name')).tz_localize('UTC')
+        columns = pointer.get('columns') or [c for b in blocks for c in b['columns']] + list(pointer['category_columns'])
+        matrices, categoricals = [], []
+        for block in blocks:
+            if not block['columns']:
+                continue
+            matrix = np.memmap(path, dtype=np.dtype(block['dtype']), mode='c', offset=offset,
+                               shape=(len(block['columns']), n))
+            offset += matrix.nbytes
+            matrices.append((block['columns'], matrix.view(np.ndarray)))
+        for col, cats in pointer['category_columns'].items():
+            codes = np.memmap(path, dtype=np.int16, mode='c', offset=offset, shape=(n,))
+            offset += n * 2
+            categoricals.append((col, pd.Categorical.from_codes(np.asarray(codes), categories=cats)))
+        try:
+            return self._frame_on_map(matrices, categoricals, columns, index)
+        except Exception as e:
+            # API interna de pandas no disponible (otra versión): DataFrame normal (copia)
+            if not self._fallback_warned:
+                self._fallback_warned = True
+                logging.warning(f"[WARNING] SharedCandles sin mapeo directo ({type(e).__name__}: {e}); se copian las columnas")
+            data = {col: values for cols, matrix in matrices for col, values in zip(cols, matrix)}
+            data.update(categoricals)
+            return pd.DataFrame(data, index=index, columns=columns)
+
+    @staticmethod
+    def _frame_on_map(matrices, categoricals, columns, index):
+        """
+        DataFrame sin copia: un bloque por dtype sobre el mapeo, colocado en las
+        posiciones originales de sus columnas (un take copiaría todo) y ya
+        consolidado, así que pandas no lo vuelve a copiar más tarde. Usa la API
+        interna de pandas 2.x; si cambia, _map recurre a un DataFrame normal.
+        """
+        from pandas.core.internals import BlockManager
+        from pandas.core.internals.api import make_block
+
+        position = {col: i for i, col in enumerate(columns)}
+        mgr_blocks = [make_block(matrix, placement=[position[c] for c in cols], ndim=2) for cols, matrix in matrices]
+        mgr_blocks += [make_block(values, placement=[position[col]], ndim=2) for col, values in categoricals]
+        mgr = BlockManager(tuple(mgr_blocks), [pd.Index(columns, dtype=object), index])
+        return pd.DataFrame._from_mgr(mgr, axes=mgr.axes)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(root=SHARED_DIR):
+    """Instancia única por directorio (conserva los mapeos entre DataLoader distintos)."""
+    root = os.path.abspath(root)
+    with _caches_lock:
+        if root not in _caches:
+            _caches[root] = SharedCandleCache(root)
+        return _caches[root]
+
+
+# Caché global del proceso (Reports/ por defecto)
+shared_candles = shared_cache()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+SignalEngine - Reglas de EthStrategy.detect_trend evaluadas sobre todo el histórico en una pasada.
+
+detect_trend decide sobre la última vela LTF (con el HTF vigente) y sólo se
+puede evaluar fila a fila: un backtest o un estudio de parámetros sobre años
+de velas lo llamaba una vez por vela. generate_signals aplica las mismas
+reglas como máscaras numpy sobre columnas desplazadas:
+
+    microtendencia / impulso MACD        vela LTF actual vs anterior
+    tendencia confirmada                 EMAs, volumen y RSI del HTF
+    soporte / resistencia                mín./máx. de 75 velas HTF
+    rebote / reversión / drenado         velas HTF [-3], [-2], [-1]
+    medias de volumen de todo el frame   medias expansivas (causales)
+    score BUY/SELL, umbral ADX escalonado y filtros finales
+    (extensión extrema, RSI extremo LTF, zona de rebote)
+
+Cada fila LTF usa el HTF hasta su timestamp (sin mirar al futuro), igual que
+detect_trend(htf.iloc[:j+1], ltf.iloc[:i+1]). Sin ltf se usa el mismo frame
+para ambos (modo del backtest con un único Parquet).
+
+Columnas de salida (índice del LTF):
+    signal        BUY / SELL / HOLD
+    score         confianza_score de detect_trend
+    reason_code   regla que determinó la señal (ver REASON_CODES)
+    market_bias   BUY / SELL / EXTENSION_ALCISTA / None
+
+Uso:
+    signals = generate_signals(htf, ltf)
+    python SignalEngine.py [--reports DIR] [--out señales.parquet]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ContextBus import context_bus
+from IndicatorEngine import SR_WINDOW
+
+BUY, SELL, HOLD = 'BUY', 'SELL', 'HOLD'
+DEFAULT_BOUNCE_ZONE_PCT = 2.0
+MIN_HTF_ROWS, MIN_LTF_ROWS = 6, 2
+
+# Código -> texto de la regla en la razón de detect_trend
+REASON_CODES = {
+    'DATOS_INSUFICIENTES': 'Historial HTF/LTF insuficiente',
+    'SIN_SENAL': 'No hay señales claras',
+    'REBOTE_FUERTE': 'Rebote confirmado fuerte',
+    'REBOTE_TEMPRANO': 'Rebote temprano en soporte crítico',
+    'REVERSION_CONFIRMADA': 'Reversión confirmada en resistencia',
+    'DRENADO': 'Continuación bajista limpia (drenado)',
+    'REBOTE_OPTIMO': 'Rebote confirmado óptimo',
+    'ENTRADA_AGRESIVA': 'Entrada agresiva RSI <38',
+    'PISO_3_VELAS': 'Piso confirmado 3 velas',
+    'BAJISTA_SIN_REVERSION': 'Tendencia bajista sin reversión',
+    'REVERSION_RESISTENCIA': 'Reversión en resistencia',
+    'ALCISTA_CONFIRMADA': 'Tendencia alcista confirmada',
+    'MICRO_ALCISTA_FUERTE': 'Microtendencia alcista fuerte',
+    'MICRO_BAJISTA_FUERTE': 'Microtendencia bajista fuerte',
+    'ADX_BAJO': 'ADX bajo para el score',
+    'SCORE_BAJO': 'Confianza insuficiente',
+    'EXTENSION_SELL': 'EXTENSIÓN EXTREMA + GIRO CONFIRMADO',
+    'EXTENSION_HOLD': 'EXTENSIÓN EXTREMA',
+    'RSI_EXTREMO': 'REJECT BUY: RSI',
+    'ZONA_REBOTE': 'REJECT SELL: En zona de rebote',
+}
+
+
+def load_bounce_zone_pct():
+    """bounce_zone_pct del cycle_context (como detect_trend), 2.0 por defecto."""
+    try:
+        cycle = context_bus.data("cycle_context")
+        if cycle is not None:
+            return float(cycle.get("bounce_zone_pct", DEFAULT_BOUNCE_ZONE_PCT))
+    except Exception:
+        pass
+    return DEFAULT_BOUNCE_ZONE_PCT
+
+
+def _values(df, col, default=np.nan):
+    if col in df.columns:
+        return df[col].to_numpy(dtype=float, na_value=np.nan)
+    return np.full(len(df), default, dtype=float)
+
+
+def _shift(values, periods=1):
+    out = np.full_like(values, np.nan)
+    out[periods:] = values[:-periods]
+    return out
+
+
+def _adx_threshold(score):
+    """Umbral ADX escalonado por score (mismo escalado que detect_trend)."""
+    return np.select([score >= 7, score >= 6, score >= 5], [12, 15, 18], 20)
+
+
+def _htf_positions(htf, ltf):
+    """Posición de la última vela HTF con timestamp <= cada vela LTF (-1 si no hay)."""
+    h_index, l_index = htf.index, ltf.index
+    if isinstance(h_index, pd.DatetimeIndex) and isinstance(l_index, pd.DatetimeIndex):
+        if (h_index.tz is None) != (l_index.tz is None):
+            h_index = h_index.tz_localize('UTC') if h_index.tz is None else h_index
+            l_index = l_index.tz_localize('UTC') if l_index.tz is None else l_index
+    return h_index.searchsorted(l_index, side='right') - 1
+
+
+def generate_signals(htf, ltf=None, bounce_zone_pct=None):
+    """
+    Señal, score y código de razón de detect_trend para cada vela LTF.
+
+    htf/ltf: DataFrames con índice Datetime ordenado y las columnas de
+    calculate_indicators. Sin ltf se evalúa htf contra sí mismo.
+    """
+    same_frame = ltf is None
+    ltf = htf if same_frame else ltf
+    if bounce_zone_pct is None:
+        bounce_zone_pct = load_bounce_zone_pct()
+    n = len(ltf)
+    rows = np.arange(n)
+    pos = rows if same_frame else _htf_positions(htf, ltf)
+    valid = (pos >= MIN_HTF_ROWS - 1) & (rows >= MIN_LTF_ROWS - 1)
+    at = np.clip(pos, 0, None)
+    at_prev = np.clip(pos - 1, 0, None)
+
+    # --- HTF: columnas y derivados sobre todo el frame, alineados a cada fila LTF ---
+    h_close_all = _values(htf, 'Close')
+    h_volume_all = _values(htf, 'Volume')
+    h_volume = pd.Series(h_volume_all)
+    h_volume_mean_all = h_volume.expanding().mean().to_numpy()
+    h_volume_roll10_all = h_volume.rolling(10).mean().to_numpy()
+    h_support_all = htf['Low'].rolling(SR_WINDOW, min_periods=1).min().to_numpy(dtype=float)
+    h_resistance_all = htf['High'].rolling(SR_WINDOW, min_periods=1).max().to_numpy(dtype=float)
+
+    def h(col, default=np.nan, prev=False):
+        return _values(htf, col, default)[at_prev if prev else at]
+
+    h_close, h_close_1, h_close_2 = h_close_all[at], h_close_all[at_prev], h_close_all[np.clip(pos - 2, 0, None)]
+    h_volume_now = h_volume_all[at]
+    h_volume_mean = h_volume_mean_all[at]
+    h_volume_roll10 = np.where(pos + 1 >= 10, h_volume_roll10_all[at], h_volume_mean)
+    h_ema20, h_ema50, h_ema20_prev = h('EMA_20'), h('EMA_50'), h('EMA_20', prev=True)
+    h_rsi, h_rsi7, h_rsi7_prev = h('RSI'), h('RSI_7'), h('RSI_7', prev=True)
+    h_hist, h_hist_prev = h('MACD_Histogram'), h('MACD_Histogram', prev=True)
+    h_adx = h('ADX', 0.)
+    support, resistance = h_support_all[at], h_resistance_all[at]
+
+    # --- LTF: vela actual y anterior ---
+    l_close, l_high = _values(ltf, 'Close'), _values(ltf, 'High')
+    l_close_prev, l_high_prev = _shift(l_close), _shift(l_high)
+    l_volume = _values(ltf, 'Volume')
+    l_volume_mean = pd.Series(l_volume).expanding().mean().to_numpy()
+    l_rsi, l_rsi7 = _values(ltf, 'RSI'), _values(ltf, 'RSI_7')
+    l_rsi_prev, l_rsi7_prev = _shift(l_rsi), _shift(l_rsi7)
+    l_hist = _values(ltf, 'MACD_Histogram')
+    l_hist_prev = _shift(l_hist)
+    l_macd, l_macd_signal = _values(ltf, 'MACD'), _values(ltf, 'MACD_Signal')
+    l_ema20, l_ema50 = _values(ltf, 'EMA_20'), _values(ltf, 'EMA_50')
+    l_adx = _values(ltf, 'ADX', 0.)
+    l_obv_trend = _values(ltf, 'OBV_Trend', 0.)
+    l_volume_ratio = _values(ltf, 'Volume_Ratio', 0.)
+    if 'Market_Regime' in ltf.columns:
+        regime = ltf['Market_Regime'].astype(object).to_numpy()
+    else:
+        regime = np.full(n, 'CHOPPY', dtype=object)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 🎯 Soportes y resistencias
+        price = l_close
+        dist_support = (price - support) / support * 100
+        dist_resistance = (resistance - price) / price * 100
+        zona_critica = dist_support <= 0.5
+        zona_cercana = (dist_support > 0.5) & (dist_support <= 1.5)
+        zona_rebote = dist_support <= 2.0
+        resistencia_critica = dist_resistance <= 0.5
+        soporte_roto = price < support
+
+        # 📉📈 Microtendencias
+        micro_down = l_close < l_close_prev
+        micro_up = ~micro_down & (l_close > l_close_prev)
+        impulse_down = micro_down & (l_hist < 0) & (l_hist < l_hist_prev)
+        impulse_up = micro_up & (l_hist > 0) & (l_hist > l_hist_prev)
+
+        # 🚀 Tendencia confirmada (HTF)
+        volume_ok = h_volume_now > h_volume_roll10
+        bullish = (h_ema20 > h_ema50) & (h_close > h_ema50) & (h_ema20 > h_ema20_prev) & volume_ok & (h_rsi > 50)
+        bearish = ~bullish & (h_ema20 < h_ema50) & (h_close < h_ema50) & (h_ema20 < h_ema20_prev) & volume_ok & (h_rsi < 50)
+
+        # 📌 Rebote desde soporte / reversión en resistencia
+        support_zone = zona_rebote & (h_rsi7 < 45)
+        rebote_fuerte = (support_zone & (h_close_2 < h_close_1) & (h_close_1 < h_close) & (h_hist > 0)
+                         & (h_rsi7 > h_rsi7_prev) & (h_volume_now > h_volume_mean * 1.2))
+        rebote_temprano = (support_zone & ~rebote_fuerte & zona_critica & (h_rsi7 < 35) & (l_close > l_close_prev)
+                           & (l_hist > l_hist_prev) & (l_volume > l_volume_mean * 0.8))
+        reversion = (~support_zone & resistencia_critica & (l_rsi7 > 60) & (h_close_2 > h_close_1)
+                     & (h_close_1 > l_close) & (l_hist < 0) & (l_rsi7 < l_rsi7_prev) & (l_volume > h_volume_mean))
+
+        candidate = np.zeros(n, dtype=np.int8)          # 1 BUY, -1 SELL, 0 ninguno
+        code = np.full(n, 'SIN_SENAL', dtype=object)
+
+        def propose(mask, side, reason):
+            candidate[mask] = side
+            code[mask] = reason
+
+        propose(rebote_fuerte, 1, 'REBOTE_FUERTE')
+        propose(rebote_temprano, 1, 'REBOTE_TEMPRANO')
+        propose(reversion, -1, 'REVERSION_CONFIRMADA')
+
+        # 🎯 Regla 1: tendencia bajista confirmada
+        drenado = (bearish & (h_ema20 < h_ema50) & (h_adx > 25) & (l_close < l_close_prev)
+                   & (l_high < l_high_prev) & (l_rsi7 > 30))
+        rule1 = bearish & ~drenado
+        optimo = rule1 & rebote_fuerte & (l_rsi7 < 40) & (l_hist > l_hist_prev) & (l_volume > h_volume_mean * 1.3)
+        agresiva = (rule1 & ~optimo & (l_rsi < 38) & (l_macd > l_macd_signal) & (l_hist > l_hist_prev)
+                    & (l_volume > h_volume_mean * 1.3))
+        piso = (rule1 & ~optimo & ~agresiva & (h_close_2 < h_close_1) & (h_close_1 < h_close) & (l_rsi < 40)
+                & (l_rsi > l_rsi_prev) & (l_hist > 0) & (l_volume > h_volume_mean * 1.0))
+        sin_reversion = rule1 & ~(optimo | agresiva | piso | micro_up) & (candidate == 0)
+        propose(optimo, 1, 'REBOTE_OPTIMO')
+        propose(agresiva, 1, 'ENTRADA_AGRESIVA')
+        propose(piso, 1, 'PISO_3_VELAS')
+        propose(sin_reversion, -1, 'BAJISTA_SIN_REVERSION')
+
+        # 🎯 Regla 2: tendencia alcista confirmada
+        cerca_resistencia = np.abs(price - resistance) / resistance <= 0.005
+        reversion_res = (bullish & reversion & cerca_resistencia & (l_rsi7 > 55) & (l_hist < l_hist_prev)
+                         & (l_volume > h_volume_mean * 1.2))
+        alcista = bullish & ~reversion_res & ~micro_down & (candidate == 0)
+        propose(reversion_res, -1, 'REVERSION_RESISTENCIA')
+        propose(alcista, 1, 'ALCISTA_CONFIRMADA')
+
+        # 🎯 Regla 3: sin tendencia confirmada, microtendencias con impulso
+        no_trend = ~bullish & ~bearish
+        propose(no_trend & impulse_up, 1, 'MICRO_ALCISTA_FUERTE')
+        propose(no_trend & impulse_down, -1, 'MICRO_BAJISTA_FUERTE')
+
+        # 📊 Score unificado
+        volume_pts_buy = np.where((l_obv_trend == 1) & (l_volume_ratio > 1.1), 2, np.where(l_volume_ratio > 0.8, 1, 0))
+        volume_pts_sell = np.where((l_obv_trend == -1) & (l_volume_ratio > 1.1), 2, np.where(l_volume_ratio > 0.8, 1, 0))
+        regime_pts = np.where((regime == 'TRENDING') & (l_adx > 25), 1,
+                              np.where((regime == 'RANGING') | (regime == 'CHOPPY'), -1, 0))
+        buy_score = (2 * (l_ema20 > l_ema50) + 2 * ((l_rsi7 > 30) & (l_rsi7 < 65)) + (l_hist > 0)
+                     + volume_pts_buy + regime_pts - 4 * soporte_roto - 6 * (bearish & (h_adx > 25)))
+        sell_score = (2 * (l_ema20 < l_ema50)
+                      + np.where((l_rsi7 > 30) & (l_rsi7 < 70), 2, np.where(l_rsi7 <= 30, -1, 0))
+                      + (l_hist < 0) + volume_pts_sell
+                      + np.where(dist_support <= 1.0, -3, np.where(zona_cercana, -1, np.where(~zona_rebote, 1, 0)))
+                      + regime_pts - 6 * (bullish & (h_adx > 25)))
+        score = np.where(candidate == 1, buy_score, np.where(candidate == -1, sell_score, 0)).astype(np.int16)
+
+        # Umbral ADX escalonado (ADX HTF)
+        adx_low = (candidate != 0) & (h_adx < _adx_threshold(score))
+        emit = (candidate != 0) & ~adx_low & (score >= 4)
+        signal = np.where(emit, np.where(candidate == 1, BUY, SELL), HOLD).astype(object)
+        code[adx_low] = 'ADX_BAJO'
+        code[(candidate != 0) & ~adx_low & (score < 4)] = 'SCORE_BAJO'
+
+        bias = np.where(bullish, BUY, np.where(bearish, SELL, None)).astype(object)
+
+        # 🚨 Extensión extrema sobre la EMA20 HTF
+        ext_pct = np.where(h_ema20 > 0, (h_close - h_ema20) / h_ema20 * 100, 0)
+        extension = ((signal == BUY) | (bias == BUY)) & (ext_pct > 3.0) & (h_rsi > 68) & (h_hist < h_hist_prev)
+        bias[extension] = 'EXTENSION_ALCISTA'
+        giro = extension & (h_hist < 0)
+        blocked = extension & ~giro & (signal == BUY)
+        signal[giro], code[giro] = SELL, 'EXTENSION_SELL'
+        signal[blocked], code[blocked] = HOLD, 'EXTENSION_HOLD'
+
+        # 🚫 RSI extremo en LTF
+        rsi_extreme = (signal == BUY) & ((l_rsi > 90) | (l_rsi < 10))
+        signal[rsi_extreme], code[rsi_extreme] = HOLD, 'RSI_EXTREMO'
+
+        # 🚫 SELL en zona de rebote (salvo ADX HTF alto con score fuerte)
+        bounce = (signal == SELL) & (dist_support <= bounce_zone_pct) & ~((h_adx > 28) & (score >= 5))
+        signal[bounce], code[bounce] = HOLD, 'ZONA_REBOTE'
+
+        # 📉 Drenado: score propio y retorno anticipado (sin filtros finales)
+        drain_score = (2 * (l_ema20 < l_ema50) + 2 * ((l_rsi7 > 30) & (l_rsi7 < 70)) + (l_hist < 0)
+                       + 2 * (h_adx > 25) + (dist_support > 2.0))
+        drain_ok = (drain_score >= 4) & (h_adx >= _adx_threshold(drain_score))
+        signal[drenado] = np.where(drain_ok, SELL, HOLD)[drenado]
+        code[drenado] = np.where(drain_ok, 'DRENADO', np.where(drain_score < 4, 'SCORE_BAJO', 'ADX_BAJO'))[drenado]
+        score[drenado] = drain_score[drenado]
+        bias[drenado] = SELL
+
+    signal[~valid], code[~valid], bias[~valid] = HOLD, 'DATOS_INSUFICIENTES', None
+    score[~valid] = 0
+    return pd.DataFrame({'signal': signal, 'score': score, 'reason_code': code, 'market_bias': bias},
+                        index=ltf.index)
+
+
+def summarize(signals):
+    """Recuento de señales y códigos de razón."""
+    return {
+        'rows': len(signals),
+        'signals': signals['signal'].value_counts().to_dict(),
+        'reasons': signals['reason_code'].value_counts().to_dict(),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Señales de detect_trend sobre todo el histórico del almacén')
+    parser.add_argument('--reports', default=None, help='Directorio Reports (por defecto Demos/Reports)')
+    parser.add_argument('--same-frame', action='store_true', help='Evaluar el HTF contra sí mismo (sin LTF)')
+    parser.add_argument('--out', default=None, help='Guardar las columnas de señal en este Parquet')
+    args = parser.parse_args()
+
+    from DataLoader import DataLoader
+    loader = DataLoader(args.reports)
+    htf = loader.load_frame("HTF")
+    ltf = None if args.same_frame else loader.load_frame("LTF")
+    t0 = time.perf_counter()
+    result = generate_signals(htf, ltf)
+    elapsed = time.perf_counter() - t0
+    summary = summarize(result)
+    print(f"[INFO] ⚡ {summary['rows']} velas evaluadas en {elapsed:.2f}s")
+    print(f"[INFO] 🏁 Señales: {summary['signals']}")
+    print(f"[INFO] 📋 Razones: {summary['reasons']}")
+    if args.out:
+        result.to_parquet(args.out)
+        print(f"[INFO] 💾 Señales guardadas en {args.out}")
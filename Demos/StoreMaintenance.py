@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+StoreMaintenance - Mantenimiento del almacén de velas (Reports/candles) en streaming.
+
+Recorre cada dataset (HTF mensual, LTF diario) partición a partición, con sólo
+una partición en memoria, y en una única pasada:
+
+    - verifica el CRC32 de cada archivo contra el manifiesto
+    - elimina timestamps duplicados y reordena
+    - compacta particiones fragmentadas (más grupos de filas de los necesarios
+      tras muchos appends) o con dtypes distintos del esquema compacto
+    - borra archivos huérfanos (.parquet fuera del manifiesto, .tmp abandonados)
+    - comprueba invariantes OHLC (High >= max(Open, Close), Low <= min(Open, Close),
+      precios positivos, volumen no negativo)
+    - recalcula los indicadores con IndicatorEngine (estado O(1) que pasa de una
+      partición a la siguiente) y los compara con los guardados
+
+Sustituye para el almacén a dedupe_and_replace_reports.py, inspect_mismatches.py
+y verify_indicators.py, que cargan todo en pandas. La memoria no depende de la
+longitud del historial, así que puede ejecutarse cada noche junto al bot: la
+partición abierta (la que escribe DataEth) sólo se revisa, y una partición sólo
+se reescribe si su entrada del manifiesto no cambió desde que se leyó.
+
+Uso: python StoreMaintenance.py [--reports DIR] [--dry-run] [--warmup N]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from CandleSchema import apply_schema
+from CandleStore import CandleStore, ROW_GROUP_ROWS, file_checksum
+from IndicatorEngine import IndicatorEngine, INDICATOR_COLUMNS, OHLCV, REWIND_CANDLES
+
+REPORT_NAME = 'maintenance_report.json'
+WARMUP_CANDLES = 1000      # Velas iniciales sin comparar: el cálculo guardado partió de más historial
+TOL_ABS = 1e-6             # Mismas tolerancias que verify_indicators.compare_frames
+TOL_REL = 1e-4
+ORPHAN_MAX_AGE = 3600      # Segundos antes de considerar abandonado un archivo fuera del manifiesto
+MAX_EXAMPLES = 5
+# OBV es una suma acumulada desde la primera vela: depende del inicio, no es verificable
+VERIFY_COLUMNS = [c for c in INDICATOR_COLUMNS if c != 'OBV']
+
+
+def ohlc_violations(frame):
+    """{regla: nº de velas que la incumplen} + ejemplos (timestamps)."""
+    if not set(['Open', 'High', 'Low', 'Close']).issubset(frame.columns):
+        return {}, []
+    o, h, l, c = (frame[col].to_numpy(dtype=float) for col in ('Open', 'High', 'Low', 'Close'))
+    with np.errstate(invalid='ignore'):
+        rules = {
+            'nan_price': np.isnan(o) | np.isnan(h) | np.isnan(l) | np.isnan(c),
+            'non_positive': (o <= 0) | (h <= 0) | (l <= 0) | (c <= 0),
+            'high_below_body': h < np.maximum(o, c),
+            'low_above_body': l > np.minimum(o, c),
+        }
+        if 'Volume' in frame.columns:
+            rules['negative_volume'] = frame['Volume'].to_numpy(dtype=float) < 0
+    counts = {rule: int(mask.sum()) for rule, mask in rules.items() if mask.any()}
+    bad = np.zeros(len(frame), dtype=bool)
+    for mask in rules.values():
+        bad |= mask
+    examples = [str(ts) for ts in frame.index[bad][:MAX_EXAMPLES]]
+    return counts, examples
+
+
+class IndicatorVerifier:
+    """Recalcula indicadores partición a partición con el estado de IndicatorEngine."""
+
+    def __init__(self, warmup=WARMUP_CANDLES):
+        self.engine = IndicatorEngine(max_rows=REWIND_CANDLES)
+        self.warmup = warmup
+        self.previous = None       # Última vela OHLCV de la partición anterior (enlace del estado)
+        self.seen = 0
+        self.columns = {}          # columna -> {'checked', 'mismatches', 'max_abs_diff'}
+        self.examples = []
+
+    def verify(self, frame):
+        if not set(OHLCV).issubset(frame.columns) or frame.empty:
+            return
+        ohlcv = frame[OHLCV].astype(float)
+        series = ohlcv if self.previous is None else pd.concat([self.previous, ohlcv])
+        recomputed = self.engine.calculate(series)
+        if self.previous is not None:
+            recomputed = recomputed.iloc[1:]
+        self.previous = ohlcv.iloc[-1:]
+
+        skip = max(0, min(len(frame), self.warmup - self.seen))
+        self.seen += len(frame)
+        if skip == len(frame):
+            return
+        stored, recomputed = frame.iloc[skip:], recomputed.iloc[skip:]
+        for col in VERIFY_COLUMNS + ['Market_Regime']:
+            if col not in stored.columns:
+                continue
+            entry = self.columns.setdefault(col, {'checked': 0, 'mismatches': 0, 'max_abs_diff': 0.0})
+            if col == 'Market_Regime':
+                bad = stored[col].astype(str).to_numpy() != recomputed[col].astype(str).to_numpy()
+            else:
+                a = stored[col].to_numpy(dtype=float)
+                b = recomputed[col].to_numpy(dtype=float)
+                bad = ~np.isclose(a, b, rtol=TOL_REL, atol=TOL_ABS, equal_nan=True)
+                if len(a):
+                    diff = np.abs(a - b)
+                    entry['max_abs_diff'] = max(entry['max_abs_diff'], float(np.nanmax(diff)) if np.isfinite(diff).any() else 0.0)
+            entry['checked'] += len(stored)
+            entry['mismatches'] += int(bad.sum())
+            for ts in stored.index[bad][:MAX_EXAMPLES - len(self.examples)]:
+                self.examples.append({'column': col, 'datetime': str(ts)})
+
+    def summary(self):
+        return {'verified_from_candle': self.warmup, 'columns': self.columns,
+                'mismatches': sum(c['mismatches'] for c in self.columns.values()),
+                'examples': self.examples}
+
+
+def _row_groups(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    return pq.ParquetFile(path).metadata.num_row_groups
+
+
+def _orphans(store, manifest):
+    """Archivos del directorio que el manifiesto no referencia y llevan un rato sin tocarse."""
+    referenced = {meta['file'] for meta in manifest['partitions'].values()}
+    now = time.time()
+    found = []
+    for path in glob.glob(os.path.join(store.root, '*.parquet')) + glob.glob(os.path.join(store.root, '*.tmp')):
+        if os.path.basename(path) in referenced:
+            continue
+        try:
+            if now - os.path.getmtime(path) >= ORPHAN_MAX_AGE:
+                found.append(path)
+        except OSError:
+            pass
+    return found
+
+
+def maintain_store(store, dry_run=False, warmup=WARMUP_CANDLES):
+    """Revisa (y repara salvo dry_run) un dataset; retorna su informe."""
+    report = {'partitions': 0, 'rows': 0, 'max_partition_rows': 0, 'duplicates_removed': 0,
+              'unsorted_partitions': [], 'fragmented_partitions': [], 'schema_drift_partitions': [],
+              'rewritten_partitions': [], 'skipped_rewrites': [], 'checksum_mismatches': [],
+              'ohlc_violations': {}, 'ohlc_examples': [], 'orphans_removed': []}
+    if not store.exists():
+        report['exists'] = False
+        return report
+    manifest = store.load_manifest()
+    open_name = max(manifest['partitions']) if manifest['partitions'] else None
+    verifier = IndicatorVerifier(warmup)
+
+    for name, meta, frame in store.iter_partitions():
+        path = os.path.join(store.root, meta['file'])
+        checksum = file_checksum(path)
+        if meta.get('checksum') and meta['checksum'] != checksum:
+            report['checksum_mismatches'].append(name)
+
+        report['partitions'] += 1
+        report['max_partition_rows'] = max(report['max_partition_rows'], len(frame))
+        reasons = []
+        duplicated = frame.index.duplicated(keep='last')
+        if duplicated.any():
+            report['duplicates_removed'] += int(duplicated.sum())
+            frame = frame[~duplicated]
+            reasons.append('duplicates')
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index()
+            report['unsorted_partitions'].append(name)
+            reasons.append('unsorted')
+        groups = _row_groups(path)
+        if groups is not None and groups > max(1, -(-len(frame) // ROW_GROUP_ROWS)):
+            report['fragmented_partitions'].append(name)
+            reasons.append('fragmented')
+        compact = apply_schema(frame)
+        if any(compact[c].dtype != frame[c].dtype for c in frame.columns):
+            report['schema_drift_partitions'].append(name)
+            reasons.append('schema')
+        frame = compact
+        report['rows'] += len(frame)
+
+        counts, examples = ohlc_violations(frame)
+        for rule, count in counts.items():
+            report['ohlc_violations'][rule] = report['ohlc_violations'].get(rule, 0) + count
+        report['ohlc_examples'].extend(examples[:MAX_EXAMPLES - len(report['ohlc_examples'])])
+        verifier.verify(frame)
+
+        if reasons and not dry_run:
+            # La partición abierta la escribe DataEth: no competir con él
+            if name == open_name or not store.replace_partition(name, frame, expected_checksum=meta.get('checksum')):
+                report['skipped_rewrites'].append(name)
+            else:
+                report['rewritten_partitions'].append({'partition': name, 'reasons': reasons})
+
+    with store.lock():   # Con el lock del dataset ningún escritor tiene temporales en vuelo
+        for path in _orphans(store, store.load_manifest()):
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            report['orphans_removed'].append(os.path.basename(path))
+
+    report['indicators'] = verifier.summary()
+    report['ok'] = not (report['checksum_mismatches'] or report['ohlc_violations'] or report['indicators']['mismatches'])
+    return report
+
+
+def run_maintenance(reports_dir=None, dry_run=False, warmup=WARMUP_CANDLES):
+    """Mantenimiento de HTF y LTF; guarda Reports/maintenance_report.json y lo retorna."""
+    if reports_dir is None:
+        reports_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Reports')
+    started = time.monotonic()
+    report = {'timestamp': datetime.now(timezone.utc).isoformat(), 'dry_run': dry_run, 'datasets': {}}
+    for timeframe, partition in (('HTF', 'month'), ('LTF', 'day')):
+        store = CandleStore(os.path.join(reports_dir, 'candles', timeframe.lower()), partition=partition)
+        report['datasets'][timeframe] = maintain_store(store, dry_run=dry_run, warmup=warmup)
+    report['duration_s'] = round(time.monotonic() - started, 2)
+    report['ok'] = all(d.get('ok', True) for d in report['datasets'].values())
+
+    os.makedirs(reports_dir, exist_ok=True)
+    path = os.path.join(reports_dir, REPORT_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+    return report
+
+
+def _print_summary(report):
+    for timeframe, d in report['datasets'].items():
+        if d.get('exists') is False:
+            print(f"[INFO] {timeframe}: sin almacén")
+            continue
+        print(f"[INFO] 🧹 {timeframe}: {d['partitions']} particiones, {d['rows']} velas "
+              f"(máx. {d['max_partition_rows']} en memoria) | duplicados {d['duplicates_removed']} | "
+              f"reescritas {len(d['rewritten_partitions'])} | huérfanos {len(d['orphans_removed'])}")
+        if d['checksum_mismatches']:
+            print(f"[ERROR] ❌ {timeframe}: CRC32 distinto del manifiesto en {d['checksum_mismatches']}")
+        if d['ohlc_violations']:
+            print(f"[WARNING] ⚠️ {timeframe}: invariantes OHLC incumplidos {d['ohlc_violations']} (ej. {d['ohlc_examples']})")
+        ind = d['indicators']
+        if ind['mismatches']:
+            bad = {c: v['mismatches'] for c, v in ind['columns'].items() if v['mismatches']}
+            print(f"[WARNING] ⚠️ {timeframe}: indicadores distintos del recálculo {bad}")
+        else:
+            checked = max((v['checked'] for v in ind['columns'].values()), default=0)
+            print(f"[INFO] ✅ {timeframe}: indicadores verificados en {checked} velas")
+    status = "✅ OK" if report['ok'] else "❌ CON INCIDENCIAS"
+    print(f"[INFO] Mantenimiento {status} en {report['duration_s']}s{' (dry-run)' if report['dry_run'] else ''}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compactación e integridad del almacén de velas (Reports/candles)')
+    parser.add_argument('--reports', default=None, help='Directorio Reports (por defecto Demos/Reports)')
+    parser.add_argument('--dry-run', action='store_true', help='Sólo revisar e informar, sin reescribir ni borrar')
+    parser.add_argument('--warmup', type=int, default=WARMUP_CANDLES,
+                        help=f'Velas iniciales sin comparar indicadores (por defecto {WARMUP_CANDLES})')
+    args = parser.parse_args()
+    result = run_maintenance(args.reports, dry_run=args.dry_run, warmup=args.warmup)
+    _print_summary(result)
+    sys.exit(0 if result['ok'] else 1)
@@ -0,0 +1,193 @@
+"""
+TimeframeViews - Vistas 4H / 1D / 1W derivadas del HTF (HOUR) con indicadores cacheados.
+
+EthStrategy.decide remuestreaba todo el HTF a diario y recalculaba la EMA200
+diaria en cada decisión. Aquí cada vista guarda:
+
+    - las barras cerradas (OHLCV) y el estado recursivo de sus indicadores
+      (EMA_20/50/200 y RSI_14, mismas recurrencias que IndicatorEngine)
+    - la barra en curso, agregada desde las velas HTF de ese periodo
+
+Al llegar velas HTF nuevas sólo se reagrega la barra en curso; cuando una barra
+se cierra se incorpora al estado. Si el HTF crece más que las velas posteriores
+a la última procesada (sync_missing rellenó un hueco anterior) las vistas se
+reconstruyen. Los valores actuales (barra en curso incluida,
+como resample(...).last() + ewm sobre todo el histórico) se sirven desde un dict
+ya calculado.
+
+Uso:
+    timeframe_views.update(historical_data)
+    daily = timeframe_views.get("1D")     # {'Close', 'EMA_200', 'bars', ...} o None
+"""
+import copy
+from threading import Lock
+
+import pandas as pd
+
+from IndicatorEngine import _Ewm, _Rsi
+
+TIMEFRAMES = {
+    '4H': '4h',
+    '1D': '1D',
+    '1W': 'W-MON',      # Semanas de lunes a domingo
+}
+EMA_SPANS = (20, 50, 200)
+RSI_WINDOW = 14
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def bar_start(ts, rule):
+    """Inicio de la barra `rule` que contiene ts."""
+    if rule.startswith('W'):
+        day = ts.normalize()
+        return day - pd.Timedelta(days=day.weekday())
+    return ts.floor(rule)
+
+
+def resample_bars(htf, rule):
+    """Barras OHLCV de `rule` etiquetadas por su inicio (sin periodos vacíos)."""
+    kwargs = {'label': 'left', 'closed': 'left'} if rule.startswith('W') else {}
+    cols = {c: f for c, f in OHLCV_AGG.items() if c in htf.columns}
+    return htf[list(cols)].resample(rule, **kwargs).agg(cols).dropna(subset=['Close'])
+
+
+def _aggregate(frame):
+    """Una barra OHLCV a partir de las velas HTF de su periodo."""
+    bar = {'Open': frame['Open'].iloc[0], 'High': frame['High'].max(), 'Low': frame['Low'].min(),
+           'Close': frame['Close'].iloc[-1]}
+    if 'Volume' in frame.columns:
+        bar['Volume'] = frame['Volume'].sum()
+    return {c: float(v) for c, v in bar.items() if c in frame.columns}
+
+
+class _BarState:
+    """Indicadores recursivos sobre los cierres de las barras cerradas."""
+    def __init__(self):
+        self.ema = {span: _Ewm(span=span) for span in EMA_SPANS}
+        self.rsi = _Rsi(RSI_WINDOW)
+        self.prev_close = float('nan')
+        self.bars = 0
+
+    def update(self, close):
+        out = {f'EMA_{span}': ema.update(close) for span, ema in self.ema.items()}
+        out[f'RSI_{RSI_WINDOW}'] = self.rsi.update(close - self.prev_close)
+        self.prev_close = close
+        self.bars += 1
+        return out
+
+
+class TimeframeView:
+    """Una temporalidad mayor derivada del HTF."""
+
+    def __init__(self, name, rule):
+        self.name = name
+        self.rule = rule
+        self.reset()
+
+    def reset(self):
+        self.state = _BarState()          # Hasta la última barra cerrada
+        self.closed = pd.DataFrame()      # Barras cerradas (OHLCV)
+        self.current_start = None         # Inicio de la barra en curso
+        self.values = None                # Valores actuales servidos por get()
+        self.refreshes = 0                # Barras cerradas incorporadas (diagnóstico)
+
+    def _close_bars(self, bars):
+        for close in bars['Close'].to_numpy(dtype=float).tolist():
+            self.state.update(close)
+        self.closed = pd.concat([self.closed, bars]) if not self.closed.empty else bars
+        self.refreshes += len(bars)
+
+    def update(self, htf):
+        """Sincroniza con el HTF (índice Datetime UTC ordenado)."""
+        last_ts = htf.index[-1]
+        start = bar_start(last_ts, self.rule)
+        if self.current_start is None or start < self.current_start:
+            self.reset()
+            bars = resample_bars(htf, self.rule)
+            self._close_bars(bars[bars.index < start])
+        elif start > self.current_start:
+            # Se cerraron una o más barras: incorporar sólo esas
+            pending = htf.loc[(htf.index >= self.current_start) & (htf.index < start)]
+            if not pending.empty:
+                self._close_bars(resample_bars(pending, self.rule))
+        self.current_start = start
+
+        # Barra en curso: sólo las velas HTF de este periodo
+        current = htf.iloc[int(htf.index.searchsorted(start)):]
+        bar = _aggregate(current)
+        state = copy.deepcopy(self.state)
+        indicators = state.update(bar['Close'])
+        self.values = {
+            'timeframe': self.name,
+            'bar_start': start,
+            'bars': state.bars,
+            'closed_bars': self.state.bars,
+            **bar,
+            **indicators,
+        }
+        return self.values
+
+
+class TimeframeViews:
+    """Servicio de vistas multi-temporalidad sobre el HTF."""
+
+    def __init__(self, timeframes=None):
+        self.views = {name: TimeframeView(name, rule) for name, rule in (timeframes or TIMEFRAMES).items()}
+        self.lock = Lock()
+        self.key = None          # (última vela, su OHLCV, longitud) del HTF ya procesado
+        self.last_ts = None      # Última vela procesada y longitud del HTF (índice UTC)
+        self.rows = 0
+
+    def update(self, historical_data):
+        """Refresca las vistas si el HTF cambió desde la última llamada; retorna True si lo hizo."""
+        if historical_data is None or historical_data.empty or 'Close' not in historical_data.columns:
+            return False
+        last = historical_data.iloc[-1]
+        key = (historical_data.index[-1], tuple(float(last[c]) for c in OHLCV_AGG if c in historical_data.columns),
+               len(historical_data))
+        with self.lock:
+            if key == self.key:
+                return False
+            htf = historical_data
+            if not isinstance(htf.index, pd.DatetimeIndex):
+                htf = htf.copy(deep=False)
+                htf.index = pd.to_datetime(htf.index, utc=True, errors='coerce')
+                htf = htf[htf.index.notna()]
+                if htf.empty:
+                    return False
+            if htf.index.tz is None:
+                htf = htf.tz_localize('UTC')
+            if self.last_ts is not None:
+                new = len(htf) - int(htf.index.searchsorted(self.last_ts, side='right'))
+                if len(htf) - self.rows > new:
+                    # Velas insertadas antes de la última procesada (relleno de huecos)
+                    for view in self.views.values():
+                        view.reset()
+            for view in self.views.values():
+                view.update(htf)
+            self.key = key
+            self.last_ts, self.rows = htf.index[-1], len(htf)
+            return True
+
+    def get(self, timeframe):
+        """Valores actuales de la temporalidad (barra en curso incluida) o None."""
+        view = self.views.get(timeframe)
+        return view.values if view is not None else None
+
+    def context_fields(self, price=None):
+        """Campos multi-temporalidad para market_context.json."""
+        fields = {}
+        daily = self.get('1D')
+        if daily and daily['bars'] >= 200:
+            ema200d = daily['EMA_200']
+            ref = price if price else daily['Close']
+            fields['ema200_daily'] = round(ema200d, 2)
+            fields['price_vs_ema200_daily_pct'] = round((ref - ema200d) / ema200d * 100, 2) if ema200d > 0 else None
+        for name in ('4H', '1W'):
+            view = self.get(name)
+            if view and view['bars'] >= 50:
+                fields[f'trend_{name.lower()}'] = 'UP' if view['EMA_20'] > view['EMA_50'] else 'DOWN'
+        return fields
+
+
+timeframe_views = TimeframeViews()
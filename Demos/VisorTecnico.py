@@ -11,6 +11,8 @@ import time
 from threading import Thread
 import matplotlib.pyplot as plt
 
+import IndicatorKernels
+
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from PyQt5.QtGui import QPainter, QColor
 from PyQt5.QtCore import Qt
@@ -103,23 +105,22 @@ class TechnicalAnalysis(QObject):
         if 'Close' not in data.columns or len(data) < period:
             raise ValueError("Datos insuficientes o columna 'Close' faltante para calcular RSI.")
 
-        # Calcular cambios diarios
-        delta = data['Close'].diff()
-
-        # Calcular ganancias y pérdidas
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
+        # Cambios, ganancias y pérdidas sobre el array contiguo de cierres
+        close = data['Close'].to_numpy(dtype=float)
+        delta = np.diff(close, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = -np.where(delta < 0, delta, 0.0)
 
         # Promedio de ganancias/pérdidas
-        avg_gain = gain.rolling(window=period, min_periods=1).mean()
-        avg_loss = loss.rolling(window=period, min_periods=1).mean()
+        avg_gain = IndicatorKernels.rolling_mean(gain, period, min_periods=1)
+        avg_loss = IndicatorKernels.rolling_mean(loss, period, min_periods=1)
 
         # Cálculo del RSI
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
 
         # Suavizado adicional
-        smoothed_rsi = rsi.rolling(window=smooth_factor, min_periods=1).mean()
+        smoothed_rsi = pd.Series(IndicatorKernels.rolling_mean(rsi, smooth_factor, min_periods=1), index=data.index)
 
         return smoothed_rsi
 
@@ -127,11 +128,8 @@ class TechnicalAnalysis(QObject):
     @staticmethod
     def calculate_macd(data, fast=12, slow=26, signal_period=9):
         """Calcula el MACD y su señal."""
-        macd_fast = data['Close'].ewm(span=fast, adjust=False).mean()
-        macd_slow = data['Close'].ewm(span=slow, adjust=False).mean()
-        macd = macd_fast - macd_slow
-        signal = macd.ewm(span=signal_period, adjust=False).mean()
-        return macd, signal
+        macd, signal, _ = IndicatorKernels.macd(data['Close'].to_numpy(dtype=float), fast, slow, signal_period, warmup=False)
+        return pd.Series(macd, index=data.index), pd.Series(signal, index=data.index)
 
     @staticmethod
     def calculate_fibonacci_levels(data):
@@ -17,6 +17,7 @@ from datetime import datetime
 from EthStrategy import Strategia
 from EthSession import CapitalOP
 from Evaluador import evaluate_positions
+from DataLoader import DataLoader
 
 # ============================================================================
 # CONFIGURACIÓN DEL BACKTEST - SEMANA COMPLETA
@@ -206,8 +207,9 @@ def run_backtest():
     print(f"\n📂 Cargando datos desde {DATA_FILE}...")
 
     if DATA_FILE.endswith('.parquet'):
-        # 🔄 NUEVO: Cargar datos parquet de 7 días
-        df = pd.read_parquet(DATA_FILE)
+        # 🔄 NUEVO: Cargar datos parquet de 7 días (almacén particionado o archivo único legacy)
+        loader = DataLoader(os.path.dirname(os.path.abspath(DATA_FILE)))
+        df = loader.load_frame("LTF")
 
         # El índice es timestamp, resetear para tener columna Datetime
         df.reset_index(inplace=True)
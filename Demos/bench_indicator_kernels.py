@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de IndicatorKernels contra ta/pandas.
+Mide cada indicador sobre 43.800 velas (ventana HTF) y 10.080 velas (ventana LTF).
+
+Uso: python bench_indicator_kernels.py [repeticiones]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator, StochasticOscillator
+from ta.trend import ADXIndicator, MACD
+from ta.volatility import AverageTrueRange, BollingerBands
+from ta.volume import OnBalanceVolumeIndicator
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import IndicatorKernels as K
+from DataEth import HTF_WINDOW, LTF_WINDOW
+
+
+def _candles(n):
+    rng = np.random.default_rng(0)
+    close = 3000 + np.cumsum(rng.normal(0, 8, n))
+    return pd.DataFrame({
+        'High': close + rng.uniform(0, 6, n),
+        'Low': close - rng.uniform(0, 6, n),
+        'Close': close,
+        'Volume': rng.uniform(1, 100, n),
+    })
+
+
+def _best(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(n, repeat):
+    df = _candles(n)
+    h, l, c, v = (df[col].to_numpy() for col in ('High', 'Low', 'Close', 'Volume'))
+    cases = [
+        ("RSI(14)", lambda: RSIIndicator(df['Close'], 14).rsi(), lambda: K.rsi(c, 14)),
+        ("EMA(200)", lambda: df['Close'].ewm(span=200, adjust=False).mean(), lambda: K.ema(c, span=200)),
+        ("MACD", lambda: MACD(df['Close']).macd_signal(), lambda: K.macd(c)),
+        ("ATR(14)", lambda: AverageTrueRange(df['High'], df['Low'], df['Close'], 14).average_true_range(),
+         lambda: K.atr(h, l, c, 14)),
+        ("ADX/DI(14)", lambda: ADXIndicator(df['High'], df['Low'], df['Close'], 14).adx(), lambda: K.adx(h, l, c, 14)),
+        ("STOCH(14,3)", lambda: StochasticOscillator(df['High'], df['Low'], df['Close'], 14, 3).stoch_signal(),
+         lambda: K.stochastic(h, l, c, 14, 3)),
+        ("BB width(20)", lambda: BollingerBands(df['Close'], 20, 2).bollinger_wband(), lambda: K.bollinger_wband(c, 20, 2)),
+        ("OBV", lambda: OnBalanceVolumeIndicator(df['Close'], df['Volume']).on_balance_volume(), lambda: K.obv(c, v)),
+    ]
+    print(f"\n📊 {n} velas (mejor de {repeat})")
+    print(f"{'Indicador':<14}{'ta/pandas':>12}{'NumPy':>12}{'Speedup':>10}")
+    print("-" * 48)
+    total_ref = total_np = 0.0
+    for name, ref, fast in cases:
+        t_ref, t_np = _best(ref, repeat), _best(fast, repeat)
+        total_ref += t_ref
+        total_np += t_np
+        print(f"{name:<14}{t_ref * 1000:>10.2f}ms{t_np * 1000:>10.2f}ms{t_ref / t_np:>9.1f}x")
+    print("-" * 48)
+    print(f"{'TOTAL':<14}{total_ref * 1000:>10.2f}ms{total_np * 1000:>10.2f}ms{total_ref / total_np:>9.1f}x")
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for rows in (HTF_WINDOW, LTF_WINDOW):
+        bench(rows, repeat)
@@ -20,92 +20,68 @@ import json
 import pandas as pd
 from datetime import datetime, timezone, timedelta
 import DataEth
+from DataLoader import DataLoader
+from JsonExport import write_json_export, LEGACY_FORMAT
+from CandleSchema import apply_schema
+from ParallelBackfill import backfill_indicators
 
 def log(msg):
     # Escapar emojis para compatibilidad con cp1252
     safe = msg.encode('ascii', 'replace').decode('ascii')
     print(safe, flush=True)
 
-log("=== EJECUTANDO DATAETH ===")
-
-try:
-    end_date = datetime.now(timezone.utc)
-    htf_start = end_date - timedelta(days=5 * 365)
-    ltf_start = end_date - timedelta(days=7)
-
-    log(f"HTF: {htf_start.date()} -> {end_date.date()} (HOUR)")
-    log(f"LTF: {ltf_start.date()} -> {end_date.date()} (MINUTE)")
-
-    log("1. Descargando datos HTF (HOUR)...")
-    htf_data, htf_meta = DataEth.download_data_capital('ETHUSD', 'HOUR', htf_start, end_date)
-    log(f"   HTF: {len(htf_data)} registros descargados")
-
-    log("2. Descargando datos LTF (MINUTE)...")
-    ltf_data, ltf_meta = DataEth.download_data_capital('ETHUSD', 'MINUTE', ltf_start, end_date)
-    log(f"   LTF: {len(ltf_data)} registros descargados")
-
-    log("3. Calculando indicadores HTF...")
-    htf_data = DataEth.calculate_indicators(htf_data, buffer_days=30, recent_days=None)
-    log(f"   HTF con indicadores: {len(htf_data)} registros")
-
-    log("4. Calculando indicadores LTF...")
-    ltf_data = DataEth.calculate_ltf_indicators(ltf_data)
-    log(f"   LTF con indicadores: {len(ltf_data)} registros")
-
-    reports_dir = os.path.join(script_dir, "Reports")
-    os.makedirs(reports_dir, exist_ok=True)
-
-    # Guardar JSON legacy
-    log("5. Exportando JSON legacy...")
-    export_data = {'historical_data': [], 'ltf_data': []}
-
-    for idx, row in htf_data.iterrows():
-        record = {
-            'timestamp': idx.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
-            'Open': float(row['Open']), 'High': float(row['High']),
-            'Low': float(row['Low']), 'Close': float(row['Close']), 'Volume': float(row['Volume'])
-        }
-        for col in row.index:
-            if col not in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                try:
-                    record[col] = float(row[col]) if pd.notna(row[col]) else 0.0
-                except Exception:
-                    record[col] = 0.0
-        export_data['historical_data'].append(record)
-
-    for idx, row in ltf_data.iterrows():
-        record = {
-            'timestamp': idx.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
-            'Open': float(row['Open']), 'High': float(row['High']),
-            'Low': float(row['Low']), 'Close': float(row['Close']), 'Volume': float(row['Volume'])
-        }
-        for col in row.index:
-            if col not in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                try:
-                    record[col] = float(row[col]) if pd.notna(row[col]) else 0.0
-                except Exception:
-                    record[col] = 0.0
-        export_data['ltf_data'].append(record)
-
-    json_path = os.path.join(reports_dir, "ETHUSD_CapitalData.json")
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, indent=2)
-    log(f"   JSON: {len(export_data['historical_data'])} HTF + {len(export_data['ltf_data'])} LTF -> {json_path}")
-
-    # Guardar Parquet
-    log("6. Guardando Parquet...")
-    htf_parquet = os.path.join(reports_dir, "ethusd_htf_immutable.parquet")
-    htf_data.to_parquet(htf_parquet, engine='pyarrow', compression='snappy')
-    log(f"   HTF Parquet: {htf_parquet} ({len(htf_data)} velas)")
-
-    ltf_parquet = os.path.join(reports_dir, "ethusd_ltf_7d.parquet")
-    ltf_data.to_parquet(ltf_parquet, engine='pyarrow', compression='snappy')
-    log(f"   LTF Parquet: {ltf_parquet} ({len(ltf_data)} velas)")
-
-    log("DATAETH COMPLETADO EXITOSAMENTE")
-
-except Exception as e:
-    log(f"ERROR en DataEth: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+# Guardado: ParallelBackfill arranca procesos hijos (spawn) que reimportan este módulo
+if __name__ == "__main__":
+    log("=== EJECUTANDO DATAETH ===")
+
+    try:
+        end_date = datetime.now(timezone.utc)
+        htf_start = end_date - timedelta(days=5 * 365)
+        ltf_start = end_date - timedelta(days=7)
+
+        log(f"HTF: {htf_start.date()} -> {end_date.date()} (HOUR)")
+        log(f"LTF: {ltf_start.date()} -> {end_date.date()} (MINUTE)")
+
+        log("1. Descargando datos HTF (HOUR)...")
+        htf_data, htf_meta = DataEth.download_data_capital('ETHUSD', 'HOUR', htf_start, end_date)
+        log(f"   HTF: {len(htf_data)} registros descargados")
+
+        log("2. Descargando datos LTF (MINUTE)...")
+        ltf_data, ltf_meta = DataEth.download_data_capital('ETHUSD', 'MINUTE', ltf_start, end_date)
+        log(f"   LTF: {len(ltf_data)} registros descargados")
+
+        log("3. Calculando indicadores HTF...")
+        htf_data = backfill_indicators(htf_data)
+        log(f"   HTF con indicadores: {len(htf_data)} registros")
+
+        log("4. Calculando indicadores LTF...")
+        ltf_data = DataEth.calculate_ltf_indicators(ltf_data)
+        log(f"   LTF con indicadores: {len(ltf_data)} registros")
+        htf_data = apply_schema(htf_data, "HTF")
+        ltf_data = apply_schema(ltf_data, "LTF")
+
+        reports_dir = os.path.join(script_dir, "Reports")
+        os.makedirs(reports_dir, exist_ok=True)
+
+        # Guardar JSON legacy
+        log("5. Exportando JSON legacy...")
+        json_path = os.path.join(reports_dir, "ETHUSD_CapitalData.json")
+        counts = write_json_export(json_path, [('historical_data', htf_data), ('ltf_data', ltf_data)], **LEGACY_FORMAT)
+        log(f"   JSON: {counts['historical_data']} HTF + {counts['ltf_data']} LTF -> {json_path}")
+
+        # Guardar Parquet
+        log("6. Guardando Parquet...")
+        loader = DataLoader(reports_dir)
+        loader.htf_store.write(htf_data, rewrite=True)
+        log(f"   HTF Parquet: {loader.htf_store.root} ({len(htf_data)} velas)")
+
+        loader.ltf_store.write(ltf_data, rewrite=True)
+        log(f"   LTF Parquet: {loader.ltf_store.root} ({len(ltf_data)} velas)")
+
+        log("DATAETH COMPLETADO EXITOSAMENTE")
+
+    except Exception as e:
+        log(f"ERROR en DataEth: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test de la paginación de los adaptadores de ApiProviders (sin red).
+Simula cada API con su límite de velas por llamada y verifica que un rango
+se devuelva completo con el mínimo de llamadas.
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ApiProviders import BinanceAdapter, KrakenAdapter, CryptoCompareAdapter
+
+START = pd.Timestamp('2026-01-01 00:00', tz='UTC')
+END = pd.Timestamp('2026-01-02 00:00', tz='UTC')   # 1441 velas MINUTE
+
+
+def _candle(t):
+    return [t, 100.0, 101.0, 99.0, 100.5, 10.0]
+
+
+def test_binance_paginates_minute_day():
+    calls = []
+
+    def fake_get(params, url=None):
+        calls.append(params)
+        first = params['startTime'] // 1000
+        last = min(params['endTime'] // 1000, first + (params['limit'] - 1) * 60)
+        return [[t * 1000, *map(str, _candle(t)[1:])] for t in range(first, last + 1, 60)]
+
+    adapter = BinanceAdapter()
+    adapter._get = fake_get
+    df = adapter.fetch_range(START, END, 'MINUTE')
+    assert len(df) == 1441, f"❌ Binance perdió velas: {len(df)}"
+    assert len(calls) == adapter.calls_needed(START, END, 'MINUTE') == 2, f"❌ Llamadas: {len(calls)}"
+    print(f"✅ Binance: {len(df)} velas en {len(calls)} llamadas")
+
+
+def test_cryptocompare_pages_backwards():
+    calls = []
+
+    def fake_get(params, url=None):
+        calls.append(params)
+        to_ts = params['toTs']
+        times = range(to_ts - params['limit'] * 3600, to_ts + 1, 3600)
+        return {'Response': 'Success', 'Data': {'Data': [
+            {'time': t, 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volumefrom': 3.0} for t in times
+        ]}}
+
+    adapter = CryptoCompareAdapter()
+    adapter._get = fake_get
+    start = END - pd.Timedelta(hours=4999)
+    df = adapter.fetch_range(start, END, 'HOUR')
+    assert len(df) == 5000, f"❌ CryptoCompare perdió velas: {len(df)}"
+    assert len(calls) == 3, f"❌ Llamadas: {len(calls)}"
+    assert df.index.is_monotonic_increasing and not df.index.duplicated().any(), "❌ Orden/duplicados"
+    print(f"✅ CryptoCompare: {len(df)} velas en {len(calls)} llamadas")
+
+
+def test_kraken_respects_end_date():
+    def fake_get(params, url=None):
+        first = params['since'] + 1
+        page = [[t, '1', '2', '0.5', '1.5', '1.2', '3', 5] for t in range(first, first + 720 * 60, 60)]
+        return {'error': [], 'result': {'XETHZUSD': page, 'last': page[-1][0]}}
+
+    adapter = KrakenAdapter()
+    adapter._get = fake_get
+    end = START + pd.Timedelta(minutes=99)
+    df = adapter.fetch_range(START, end, 'MINUTE')
+    assert len(df) == 100 and df.index[-1] == end, f"❌ Kraken ignoró end_date: {len(df)}"
+    assert not adapter.can_serve(START - pd.Timedelta(days=365), END, 'HOUR'), "❌ Kraken no tiene 1 año de HOUR"
+    print(f"✅ Kraken: rango recortado a end_date ({len(df)} velas)")
+
+
+if __name__ == '__main__':
+    try:
+        test_binance_paginates_minute_day()
+        test_cryptocompare_pages_backwards()
+        test_kraken_respects_end_date()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
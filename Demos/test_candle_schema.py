@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test del esquema compacto de velas (CandleSchema).
+Verifica los dtypes, el informe de memoria y que el esquema sobreviva al
+almacén Parquet y a la caché compartida sin volver a float64/object.
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from CandleSchema import apply_schema, json_default, memory_report
+from DataLoader import DataLoader
+
+
+def _frame(n=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2025-01-01', periods=n, freq='h', tz='UTC', name='Datetime')
+    close = 3000 + np.cumsum(rng.normal(0, 5, n))
+    adx = rng.uniform(10, 40, n)
+    return pd.DataFrame({'Open': close, 'High': close + 2, 'Low': close - 2, 'Close': close,
+                         'Volume': rng.uniform(1, 10, n), 'EMA_20': close, 'RSI': rng.uniform(0, 100, n),
+                         'ADX': adx, 'Volume_Ratio': rng.uniform(0, 3, n),
+                         'OBV_Trend': rng.choice([-1, 0, 1], n),
+                         'Market_Regime': np.where(adx > 25, 'TRENDING', np.where(adx > 20, 'RANGING', 'CHOPPY'))},
+                        index=idx)
+
+
+def test_schema_dtypes_and_report():
+    df = _frame()
+    compact = apply_schema(df, "TEST")
+    assert compact['Close'].dtype == np.float64 and compact['EMA_20'].dtype == np.float64, "❌ Precios deben seguir en float64"
+    assert compact['RSI'].dtype == np.float32 and compact['ADX'].dtype == np.float32, "❌ Osciladores en float32"
+    assert compact['OBV_Trend'].dtype == np.int8, "❌ OBV_Trend en int8"
+    assert isinstance(compact['Market_Regime'].dtype, pd.CategoricalDtype), "❌ Market_Regime categórico"
+    assert df['RSI'].dtype == np.float64, "❌ El original no debe modificarse"
+    assert np.allclose(compact['RSI'], df['RSI'], rtol=1e-6), "❌ Precisión float32"
+    assert (compact['Market_Regime'].astype(str) == df['Market_Regime']).all(), "❌ Regímenes alterados"
+    assert apply_schema(compact) is compact, "❌ Aplicar dos veces no debería copiar"
+    assert memory_report['TEST']['after_mb'] < memory_report['TEST']['before_mb'], "❌ Sin reducción de memoria"
+    print(f"✅ Dtypes compactos: -{memory_report['TEST']['saved_pct']}% de memoria")
+
+    odd = df.iloc[:3].copy()
+    odd['Market_Regime'] = ['TRENDING', 'UNKNOWN', None]
+    kept = apply_schema(odd)['Market_Regime']
+    assert list(kept.iloc[:2]) == ['TRENDING', 'UNKNOWN'] and kept.isna().iloc[2], "❌ Valores no previstos perdidos"
+
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        apply_schema(odd, "TINY")                                       # 3 filas: las categorías pesan más
+    assert memory_report['TINY']['saved_pct'] < 0 and '(+' in out.getvalue() and '--' not in out.getvalue(), \
+        f"❌ Signo del informe: {out.getvalue().strip()}"
+
+    row = compact.iloc[-1]
+    dumped = json.loads(json.dumps({'RSI': row['RSI'], 'OBV': row['OBV_Trend']}, default=json_default))
+    assert abs(dumped['RSI'] - float(row['RSI'])) < 1e-9, "❌ json_default"
+    print("✅ Categorías extra conservadas y escalares float32 serializables")
+
+
+def test_schema_survives_store_and_shared_cache():
+    root = tempfile.mkdtemp()
+    try:
+        loader = DataLoader(root)
+        loader.save_to_parquet(_frame(), _frame(300, seed=6), update_mode="full")
+        expected = apply_schema(_frame())
+
+        stored = loader.htf_store.read()
+        shared = loader.shared.attach("HTF")
+        for name, frame in (("Parquet", stored), ("caché compartida", shared)):
+            assert frame['RSI'].dtype == np.float32 and frame['OBV_Trend'].dtype == np.int8, f"❌ Dtypes en {name}"
+            assert list(frame['Market_Regime'].cat.categories[:3]) == ['TRENDING', 'RANGING', 'CHOPPY'], f"❌ Categorías en {name}"
+            assert np.array_equal(frame['RSI'].to_numpy(), expected['RSI'].to_numpy()), f"❌ Valores en {name}"
+        assert loader.htf_store.load_manifest()['schema']['RSI'] == 'float32', "❌ Esquema en el manifiesto"
+        print("✅ Esquema conservado en Parquet y en la caché compartida")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_schema_dtypes_and_report()
+        test_schema_survives_store_and_shared_cache()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
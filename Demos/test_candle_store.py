@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test del almacén Parquet particionado (CandleStore).
+Verifica lectura idéntica a lo escrito, que una actualización rutinaria sólo
+toque la partición abierta, el relleno de huecos en particiones selladas y la
+retención por particiones completas; y que el manifiesto (totales, esquema,
+CRC32) baste para las estadísticas sin abrir Parquet; y que varios escritores
+(hilos con su propia instancia y otros procesos) no pierdan particiones.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from CandleStore import CandleStore, file_checksum
+
+
+def _candles(start, periods, freq='h'):
+    idx = pd.date_range(start, periods=periods, freq=freq, tz='UTC', name='Datetime')
+    close = 3000 + np.arange(periods, dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                         'Close': close, 'Volume': np.ones(periods)}, index=idx)
+
+
+def test_incremental_write_and_retention():
+    root = tempfile.mkdtemp()
+    try:
+        store = CandleStore(os.path.join(root, 'htf'), partition='month')
+        data = _candles('2025-01-01', 24 * 80)          # enero, febrero y 21 días de marzo
+        written = store.write(data, rewrite=True)
+        assert written == ['2025-01', '2025-02', '2025-03'], "❌ Particiones mensuales"
+        pd.testing.assert_frame_equal(store.read(), data, check_freq=False)
+        print(f"✅ Escritura completa en {len(written)} particiones y lectura idéntica")
+
+        # Actualización rutinaria: una vela nueva sólo toca la partición abierta
+        version = store.load_manifest()['version']
+        updated = pd.concat([data, _candles(data.index[-1] + pd.Timedelta(hours=1), 1)])
+        assert store.write(updated) == ['2025-03'], "❌ Debería escribirse sólo la partición abierta"
+        assert store.load_manifest()['version'] == version + 1, "❌ El manifiesto debería avanzar de versión"
+        assert len(store.read()) == len(updated), "❌ Falta la vela añadida"
+        print("✅ Actualización rutinaria: 1 partición escrita")
+
+        # Relleno de hueco en una partición sellada
+        gapped = updated.drop(updated.index[100:110])
+        store.write(gapped, rewrite=True)
+        assert store.write(updated) == ['2025-01', '2025-03'], "❌ El hueco rellenado debería reescribir enero"
+        print("✅ Relleno de huecos reescribe sólo la partición sellada afectada")
+
+        # Retención: la ventana empieza en febrero → enero se borra entero
+        window = updated.loc['2025-02-10':]
+        store.write(window)
+        manifest = store.load_manifest()
+        assert '2025-01' not in manifest['partitions'], "❌ Enero debería haberse eliminado"
+        assert not os.path.exists(os.path.join(store.root, '2025-01.parquet')), "❌ Archivo de enero no borrado"
+        pd.testing.assert_frame_equal(store.read(), window, check_freq=False)
+        print("✅ Retención por particiones completas")
+
+        # Append de velas sueltas (LTF diario) con recorte de ventana
+        ltf = CandleStore(os.path.join(root, 'ltf'), partition='day')
+        ltf.append(_candles('2025-03-01', 3 * 1440, freq='min'))
+        ltf.append(_candles('2025-03-04', 10, freq='min'), keep_from=pd.Timestamp('2025-03-02', tz='UTC'))
+        parts = sorted(ltf.load_manifest()['partitions'])
+        assert parts == ['2025-03-02', '2025-03-03', '2025-03-04'], f"❌ Particiones LTF: {parts}"
+        assert len(ltf.read()) == 2 * 1440 + 10, "❌ Velas LTF tras append"
+        print("✅ Append LTF con retención diaria")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_manifest_stats():
+    root = tempfile.mkdtemp()
+    try:
+        store = CandleStore(os.path.join(root, 'htf'), partition='month', indicator_version=3)
+        data = _candles('2025-01-01', 24 * 80)
+        store.write(data)
+        manifest = store.load_manifest()
+        for meta in manifest['partitions'].values():
+            path = os.path.join(store.root, meta['file'])
+            assert meta['checksum'] == file_checksum(path), "❌ CRC32 de la partición"
+            assert meta['bytes'] == os.path.getsize(path), "❌ Tamaño de la partición"
+        assert manifest['schema']['Close'] == 'float64' and manifest['indicator_version'] == 3, "❌ Esquema/versión"
+
+        # Sin particiones en disco, summary() sigue respondiendo: no abre Parquet
+        for meta in manifest['partitions'].values():
+            os.remove(os.path.join(store.root, meta['file']))
+        now = data.index[-1] + pd.Timedelta(minutes=90)
+        summary = store.summary(now=now)
+        assert summary['rows'] == len(data) and summary['partitions'] == 3, f"❌ Totales: {summary}"
+        assert pd.Timestamp(summary['oldest']) == data.index[0], "❌ Primera vela"
+        assert pd.Timestamp(summary['newest']) == data.index[-1] and summary['age_minutes'] == 90, "❌ Frescura"
+        print(f"✅ Estadísticas desde el manifiesto: {summary['rows']} velas, {summary['age_minutes']} min")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _append_days(root, first, days):
+    # Una instancia nueva por escritura, como DataLoader.save_to_parquet
+    for day in range(first, first + days):
+        candle = _candles('2025-01-01', 1)
+        candle.index = candle.index + pd.Timedelta(days=day)
+        CandleStore(root, partition='day').append(candle, keep_from='2025-01-01')
+
+
+def test_concurrent_writers():
+    root = tempfile.mkdtemp()
+    try:
+        path = os.path.join(root, 'htf')
+        here = os.path.dirname(os.path.abspath(__file__))
+        script = ("import sys; sys.path.insert(0, {here!r})\n"
+                  "from test_candle_store import _append_days\n"
+                  "_append_days({root!r}, {first}, 15)")
+        procs = [subprocess.Popen([sys.executable, '-c', script.format(here=here, root=path, first=first)])
+                 for first in (0, 15)]
+        threads = [threading.Thread(target=_append_days, args=(path, first, 15)) for first in (30, 45)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for p in procs:
+            assert p.wait(timeout=120) == 0, "❌ Proceso escritor falló"
+
+        manifest = CandleStore(path, partition='day').load_manifest()
+        assert len(manifest['partitions']) == 60 and manifest['rows'] == 60, \
+            f"❌ Particiones perdidas: {len(manifest['partitions'])}/60"
+        leftovers = [f for f in os.listdir(path) if f.endswith('.tmp')]
+        assert not leftovers, f"❌ Temporales abandonados: {leftovers}"
+        print("✅ 2 procesos + 2 hilos escribiendo el mismo dataset: 60/60 particiones en el manifiesto")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_incremental_write_and_retention()
+        test_manifest_stats()
+        test_concurrent_writers()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test del bus de contexto en memoria (ContextBus).
+Verifica snapshots versionados servidos desde memoria, la persistencia atómica
+en segundo plano (sólo la última versión pendiente) y el vigilante de archivo
+para procesos que no publican (recarga sólo si el JSON cambia).
+"""
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ContextBus import ContextBus
+
+
+def test_publish_and_persist():
+    with tempfile.TemporaryDirectory() as tmp:
+        bus = ContextBus(base_dir=tmp)
+        assert bus.get("market_context") is None, "❌ Sin publicar ni archivo no hay snapshot"
+        assert bus.data("market_context", {}) == {}, "❌ default cuando no hay snapshot"
+
+        ctx = {"state": "squeeze", "squeeze_pct": 3.2, "price": 3000.0}
+        assert bus.publish("market_context", ctx) == 1, "❌ Primera versión"
+        ctx["state"] = "mutado"                                   # El snapshot no comparte el dict
+        snap = bus.get("market_context")
+        assert snap.version == 1 and snap.source == 'memory', f"❌ Snapshot en memoria: {snap}"
+        assert snap.data["state"] == "squeeze", "❌ El snapshot debe copiar los datos publicados"
+        assert bus.get("market_context", max_age=900) is snap, "❌ Snapshot reciente dentro del TTL"
+        assert bus.get("market_context", max_age=0) is None, "❌ TTL vencido"
+
+        for i in range(200):
+            bus.publish("market_context", {"state": "ranging", "price": 3000.0 + i})
+        assert bus.flush(), "❌ El sink no terminó"
+        path = os.path.join(tmp, "market_context.json")
+        with open(path) as f:
+            assert json.load(f)["price"] == 3199.0, "❌ El archivo debe tener la última versión"
+        assert bus.get("market_context").version == 201, "❌ Versión tras 201 publicaciones"
+        assert bus.writes <= 201, "❌ Escrituras de más"
+        assert not os.path.exists(path + ".tmp"), "❌ Temporal abandonado"
+        print(f"✅ 201 versiones publicadas en memoria, {bus.writes} escrituras en disco")
+
+
+def test_file_watcher():
+    with tempfile.TemporaryDirectory() as tmp:
+        producer = ContextBus(base_dir=tmp)
+        consumer = ContextBus(base_dir=tmp, watch_interval=0)     # Otro proceso: sólo lee el archivo
+        producer.publish("market_context", {"state": "ranging", "adx": 22.0})
+        producer.flush()
+
+        snap = consumer.get("market_context")
+        assert snap.source == 'file' and snap.data["adx"] == 22.0, f"❌ Snapshot desde archivo: {snap}"
+        for _ in range(20):
+            consumer.get("market_context")
+        watcher = consumer.watchers["market_context"]
+        assert watcher.reloads == 1, "❌ Sin cambios no debe reparsear"
+
+        producer.publish("market_context", {"state": "breakout_up", "adx": 31.25})
+        producer.flush()
+        assert consumer.data("market_context")["state"] == "breakout_up", "❌ Cambio del archivo no detectado"
+        assert watcher.reloads == 2 and consumer.get("market_context").version == 2, "❌ Versión del vigilante"
+
+        with open(os.path.join(tmp, "market_context.json"), "w") as f:
+            f.write('{"state": "sque')                             # Escritura a medias de otro proceso
+        assert consumer.data("market_context")["state"] == "breakout_up", "❌ JSON corrupto debe conservar el anterior"
+
+        slow = ContextBus(base_dir=tmp, watch_interval=60)
+        with open(os.path.join(tmp, "cycle_context.json"), "w") as f:
+            json.dump({"bounce_zone_pct": 5.0}, f)
+        assert slow.data("cycle_context")["bounce_zone_pct"] == 5.0, "❌ cycle_context desde archivo"
+        os.remove(os.path.join(tmp, "cycle_context.json"))
+        assert slow.data("cycle_context") is not None, "❌ Dentro del intervalo no debe volver a mirar el archivo"
+        slow.reset()
+        assert slow.data("cycle_context") is None, "❌ Archivo borrado tras reset"
+        print("✅ Vigilante de archivo: recarga sólo al cambiar, tolera escrituras a medias")
+
+
+if __name__ == '__main__':
+    try:
+        test_publish_and_persist()
+        test_file_watcher()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
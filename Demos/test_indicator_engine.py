@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test del motor incremental de indicadores (IndicatorEngine).
+Verifica que las columnas sean idénticas bit a bit a calculate_indicators,
+tanto en la carga inicial como al añadir velas, corregir la última y
+recortar el inicio de la serie.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from DataEth import calculate_indicators
+from IndicatorEngine import IndicatorEngine, _RollingExtreme
+
+
+def _candles(n, seed=7):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2025-01-01', periods=n, freq='h', tz='UTC', name='Datetime')
+    close = 3000 + np.cumsum(rng.normal(0, 8, n))
+    close[100:110] = close[100]                      # tramo plano (ventanas constantes)
+    volume = rng.uniform(1, 100, n)
+    volume[50] = 0.0
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 1, n),
+        'High': close + rng.uniform(0, 6, n),
+        'Low': close - rng.uniform(0, 6, n),
+        'Close': close,
+        'Volume': volume,
+    }, index=idx)
+
+
+def _assert_identical(got, expected, label):
+    assert list(got.columns) == list(expected.columns), f"❌ {label}: columnas distintas"
+    for col in expected.columns:
+        a, b = got[col].to_numpy(), expected[col].to_numpy()
+        assert a.dtype == b.dtype and np.array_equal(a, b), f"❌ {label}: {col} difiere"
+
+
+def test_engine_matches_batch():
+    data = _candles(1500)
+    engine = IndicatorEngine()
+    _assert_identical(engine.calculate(data), calculate_indicators(data), "carga inicial")
+    print("✅ Carga inicial idéntica a calculate_indicators")
+
+    # Velas nuevas + la última vela previa corregida (la cola se vuelve a descargar)
+    more = _candles(1510).iloc[1500:]
+    updated = pd.concat([data, more])
+    updated.iloc[1499, updated.columns.get_loc('Close')] += 2.5
+    _assert_identical(engine.calculate(updated), calculate_indicators(updated), "incremental")
+    print("✅ Incremental con última vela corregida idéntico")
+
+    # Inicio recortado: las velas conservan los valores del flujo completo
+    trimmed = engine.calculate(updated.iloc[200:])
+    _assert_identical(trimmed, calculate_indicators(updated).iloc[200:], "recorte")
+    print("✅ Recorte del inicio sin recalcular")
+
+
+
+def test_rolling_extreme_deque():
+    rng = np.random.default_rng(3)
+    values = rng.normal(0, 1, 600)
+    values[rng.choice(600, 60, replace=False)] = np.nan
+    values[200:230] = 1.5                            # empates
+    series = pd.Series(values)
+    for window, min_periods in ((75, 1), (14, 14), (5, 3)):
+        for func, expected in ((min, series.rolling(window, min_periods).min()),
+                               (max, series.rolling(window, min_periods).max())):
+            state = _RollingExtreme(window, min_periods, func)
+            got = np.array([state.update(v) for v in values])
+            assert np.array_equal(got, expected.to_numpy(), equal_nan=True), \
+                f"❌ Deque monótona {func.__name__}({window}, {min_periods}) difiere de pandas"
+
+    data = calculate_indicators(_candles(300))
+    assert data['Support_75'].iloc[-1] == data['Low'].tail(75).min(), "❌ Support_75 != mínimo de 75 velas"
+    assert data['Resistance_75'].iloc[-1] == data['High'].tail(75).max(), "❌ Resistance_75 != máximo de 75 velas"
+    assert data['Volume_Mean_10'].iloc[-1] == data['Volume'].rolling(10).mean().iloc[-1], "❌ Volume_Mean_10"
+    print("✅ Mínimos/máximos con deque monótona == pandas (con NaN y empates)")
+
+
+if __name__ == '__main__':
+    try:
+        test_engine_matches_batch()
+        test_rolling_extreme_deque()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
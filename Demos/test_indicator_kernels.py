@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Paridad de IndicatorKernels contra la librería `ta` (dentro de tolerancia).
+Cada kernel NumPy se compara con el indicador equivalente de ta sobre una
+serie sintética con tramos planos y volumen cero.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator, StochasticOscillator
+from ta.trend import ADXIndicator, EMAIndicator, MACD
+from ta.volatility import AverageTrueRange, BollingerBands
+from ta.volume import OnBalanceVolumeIndicator
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import IndicatorKernels as K
+
+RTOL = 1e-9
+ATOL = 1e-7
+
+
+def _candles(n=5000, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 3000 + np.cumsum(rng.normal(0, 8, n))
+    close[300:320] = close[300]
+    volume = rng.uniform(1, 100, n)
+    volume[40] = 0.0
+    return pd.DataFrame({
+        'High': close + rng.uniform(0, 6, n),
+        'Low': close - rng.uniform(0, 6, n),
+        'Close': close,
+        'Volume': volume,
+    })
+
+
+def _check(name, got, expected):
+    expected = np.asarray(expected, dtype=float)
+    assert got.shape == expected.shape, f"❌ {name}: forma {got.shape} != {expected.shape}"
+    assert np.array_equal(np.isnan(got), np.isnan(expected)), f"❌ {name}: NaN en posiciones distintas"
+    assert np.allclose(got, expected, rtol=RTOL, atol=ATOL, equal_nan=True), \
+        f"❌ {name}: diferencia máxima {np.nanmax(np.abs(got - expected)):.3e}"
+
+
+def test_kernels_match_ta():
+    df = _candles()
+    h, l, c, v = (df[col].to_numpy() for col in ('High', 'Low', 'Close', 'Volume'))
+
+    for window in (5, 7, 10, 14):
+        _check(f"RSI({window})", K.rsi(c, window), RSIIndicator(df['Close'], window=window).rsi())
+    for span in (3, 20, 200):
+        _check(f"EMA({span})", K.ema(c, span=span, min_periods=span), EMAIndicator(df['Close'], window=span).ema_indicator())
+
+    ref = MACD(df['Close'])
+    line, signal, hist = K.macd(c)
+    _check("MACD", line, ref.macd())
+    _check("MACD signal", signal, ref.macd_signal())
+    _check("MACD diff", hist, ref.macd_diff())
+
+    _check("ATR", K.atr(h, l, c, 14), AverageTrueRange(df['High'], df['Low'], df['Close'], window=14).average_true_range())
+
+    ref = ADXIndicator(df['High'], df['Low'], df['Close'], window=14)
+    adx, di_pos, di_neg = K.adx(h, l, c, 14)
+    _check("ADX", adx, ref.adx())
+    _check("DI+", di_pos, ref.adx_pos())
+    _check("DI-", di_neg, ref.adx_neg())
+
+    ref = StochasticOscillator(df['High'], df['Low'], df['Close'], window=14, smooth_window=3)
+    k, d = K.stochastic(h, l, c, 14, 3)
+    _check("STOCH %K", k, ref.stoch())
+    _check("STOCH %D", d, ref.stoch_signal())
+
+    _check("BB width", K.bollinger_wband(c, 20, 2), BollingerBands(df['Close'], window=20, window_dev=2).bollinger_wband())
+    _check("OBV", K.obv(c, v), OnBalanceVolumeIndicator(df['Close'], df['Volume']).on_balance_volume())
+    print("✅ RSI, EMA, MACD, ATR, ADX/DI, Estocástico, BB width y OBV coinciden con ta")
+
+
+def test_linear_recurrence_long_series():
+    x = np.random.default_rng(3).normal(size=43800)
+    expected = np.empty_like(x)
+    y = 1.5
+    for i, xi in enumerate(x):
+        y = 0.9 * y + xi
+        expected[i] = y
+    assert np.allclose(K.linear_recurrence(x, 0.9, 1.5), expected, rtol=1e-10, atol=1e-10), "❌ Recurrencia por bloques"
+    print("✅ linear_recurrence estable en 43.800 velas")
+
+
+if __name__ == '__main__':
+    try:
+        test_kernels_match_ta()
+        test_linear_recurrence_long_series()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
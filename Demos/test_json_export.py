@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test de la exportación columnar del JSON legacy (JsonExport).
+Compara contra el serializador con iterrows() que reemplaza y verifica el
+escritor en segundo plano (sólo se escribe la última exportación encolada).
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import JsonExport
+from JsonExport import EPOCH_FORMAT, LEGACY_FORMAT, JsonExportWriter, write_json_export
+
+
+def _frame(n=12):
+    idx = pd.date_range('2025-03-01', periods=n, freq='h', tz='UTC', name='Datetime')
+    close = 3000 + np.arange(n, dtype=float) / 3
+    df = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                       'Volume': np.ones(n), 'RSI': np.linspace(20, 80, n),
+                       'Market_Regime': ['trend', 'range'] * (n // 2)}, index=idx)
+    df.iloc[0, df.columns.get_loc('RSI')] = np.nan
+    return df
+
+
+def _iterrows_records(df):
+    """Serializador previo (referencia)."""
+    records = []
+    for idx, row in df.iterrows():
+        record = {'timestamp': idx.strftime('%Y-%m-%dT%H:%M:%S+00:00')}
+        for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
+            record[col] = float(row[col])
+        for col in row.index:
+            if col not in ['Open', 'High', 'Low', 'Close', 'Volume']:
+                try:
+                    record[col] = float(row[col]) if pd.notna(row[col]) else 0.0
+                except Exception:
+                    record[col] = 0.0
+        records.append(record)
+    return records
+
+
+def test_legacy_export_matches_iterrows():
+    root = tempfile.mkdtemp()
+    try:
+        df = _frame()
+        path = os.path.join(root, 'ETHUSD_CapitalData.json')
+        counts = write_json_export(path, [('historical_data', df), ('ltf_data', df.iloc[:0])],
+                                   chunk_rows=5, **LEGACY_FORMAT)
+        with open(path) as f:
+            exported = json.load(f)
+        assert counts == {'historical_data': 12, 'ltf_data': 0}, f"❌ Conteos: {counts}"
+        assert exported['historical_data'] == _iterrows_records(df), "❌ Registros distintos al serializador iterrows"
+        assert exported['ltf_data'] == [], "❌ LTF vacío debería exportarse como []"
+        print("✅ Exportación columnar idéntica a iterrows (por bloques)")
+
+        write_json_export(path, [('historical_data', df), ('data', df)], **EPOCH_FORMAT)
+        with open(path) as f:
+            first = json.load(f)['data'][0]
+        assert first['Datetime'] == int(df.index[0].timestamp() * 1000), "❌ Datetime en ms"
+        assert first['Market_Regime'] == 'trend' and first['RSI'] is None, "❌ Formato epoch debe conservar valores"
+        print("✅ Formato epoch (prepare_for_export)")
+
+        replaced = []
+        real_replace = JsonExport.os.replace
+        JsonExport.os.replace = lambda src, dst: (replaced.append(src), real_replace(src, dst))
+        try:
+            write_json_export(path, [('historical_data', df)])
+        finally:
+            JsonExport.os.replace = real_replace
+        assert replaced == [f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"], f"❌ Temporal sin pid/hilo: {replaced}"
+        print("✅ Temporal único por proceso e hilo")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_background_writer_keeps_latest():
+    root = tempfile.mkdtemp()
+    try:
+        writer = JsonExportWriter()
+        path = os.path.join(root, 'out.json')
+        for n in (4, 6, 8):
+            writer.submit(path, [('historical_data', _frame(n))], **LEGACY_FORMAT)
+        assert writer.flush(timeout=10), "❌ El escritor no terminó"
+        with open(path) as f:
+            assert len(json.load(f)['historical_data']) == 8, "❌ Debería quedar la última exportación"
+        assert writer.stats['errors'] == 0, "❌ Errores en el escritor"
+        print(f"✅ Escritor en segundo plano: {writer.stats}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_legacy_export_matches_iterrows()
+        test_background_writer_keeps_latest()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test del buffer circular binario de velas live (LiveRing).
+Verifica el orden tras dar la vuelta, la sobrescritura de la última vela,
+que latest() nunca devuelva una vela a medio escribir (copia validada con la
+secuencia), la recuperación tras un escritor interrumpido y el merge con el
+LTF en DataLoader.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from DataLoader import DataLoader
+from LiveRing import CandleRing
+
+MINUTE_MS = 60_000
+
+
+def _records(start, n):
+    ts = (start + np.arange(n)) * MINUTE_MS
+    close = 3000 + np.arange(start, start + n, dtype=float)
+    return np.column_stack([ts, close, close + 1, close - 1, close, np.ones(n)])
+
+
+def test_ring_wraps_and_overwrites():
+    root = tempfile.mkdtemp()
+    try:
+        ring = CandleRing(os.path.join(root, 'live.ring'), capacity=10)
+        assert ring.append(_records(0, 7)) == 7, "❌ Deberían escribirse 7 velas"
+        assert np.array_equal(ring.latest()[:, 0], np.arange(7) * MINUTE_MS), "❌ Orden antes de dar la vuelta"
+
+        ring.append(_records(7, 8))                       # 15 velas en capacidad 10
+        latest = ring.latest()
+        assert np.array_equal(latest[:, 0], np.arange(5, 15) * MINUTE_MS), "❌ Orden tras dar la vuelta"
+        ring.append(_records(15, 1))
+        assert latest[-1, 0] == 14 * MINUTE_MS, "❌ latest() debe ser una copia, no una vista del archivo"
+        assert np.array_equal(ring.latest(3)[:, 0], np.arange(13, 16) * MINUTE_MS), "❌ latest(n)"
+        print("✅ Orden cronológico contiguo tras dar la vuelta")
+
+        update = _records(15, 1)
+        update[0, 4] = 9999.0                             # la vela abierta cambia de cierre
+        ring.append(np.vstack([_records(3, 1), update]))  # la vela vieja se ignora
+        assert ring.header()[1] == 16 and ring.latest(1)[0, 4] == 9999.0, "❌ La última vela debería sobrescribirse"
+        print("✅ Última vela sobrescrita en su sitio; velas antiguas ignoradas")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_recovers_after_interrupted_write():
+    root = tempfile.mkdtemp()
+    try:
+        ring = CandleRing(os.path.join(root, 'live.ring'), capacity=10)
+        ring.append(_records(0, 5))
+        write_header = ring._write_header
+        calls = []
+
+        def crash_on_commit(f, capacity, total, seq):
+            calls.append(seq)
+            if len(calls) == 2:
+                raise OSError("escritor interrumpido")     # muere antes de la cabecera final
+            write_header(f, capacity, total, seq)
+
+        ring._write_header = crash_on_commit
+        try:
+            ring.append(_records(5, 1))
+            assert False, "❌ La escritura simulada debería fallar"
+        except OSError:
+            pass
+        ring._write_header = write_header
+        assert ring.header()[2] % 2 == 1, "❌ Tras el fallo la secuencia queda impar"
+
+        for start in (6, 7, 8):
+            ring.append(_records(start, 1))
+            assert ring.header()[2] % 2 == 0, f"❌ Secuencia impar tras recuperar: {ring.header()}"
+            assert ring.latest(1)[0, 0] == start * MINUTE_MS, "❌ latest() tras recuperar"
+        expected = np.r_[0:5, 6:9] * MINUTE_MS                # La vela interrumpida no llegó a confirmarse
+        assert np.array_equal(ring.latest()[:, 0], expected), "❌ Velas tras recuperar"
+        print("✅ Escritor interrumpido: la siguiente vela restablece la secuencia par")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_reader_never_sees_torn_candle():
+    root = tempfile.mkdtemp()
+    try:
+        ring = CandleRing(os.path.join(root, 'live.ring'), capacity=10)
+        ring.append(np.zeros((1, 6)))
+        stop = threading.Event()
+
+        def writer():
+            k = 0
+            while not stop.is_set():
+                k += 1
+                ring.append(np.array([[0, k, k, k, k, k]], dtype=float))   # Misma vela, todos los campos = k
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            reads = 0
+            deadline = time.monotonic() + 1.0
+            while time.monotonic() < deadline:
+                row = ring.latest(1)[0]
+                assert (row[1:] == row[1]).all(), f"❌ Vela mezclada de dos escrituras: {row}"
+                reads += 1
+        finally:
+            stop.set()
+            thread.join()
+        print(f"✅ {reads} lecturas concurrentes con un escritor, ninguna vela mezclada")
+
+        # Escritor muerto con la secuencia impar: reintentos con espera y luego error
+        with open(ring.path, 'r+b') as f:
+            capacity, total, seq = ring._read_header(f)
+            ring._write_header(f, capacity, total, seq | 1)
+        t0 = time.monotonic()
+        try:
+            ring.latest(retries=4)
+            assert False, "❌ Con la secuencia impar latest() debería rendirse"
+        except RuntimeError:
+            pass
+        assert time.monotonic() - t0 >= 0.007, "❌ Los reintentos deberían esperar entre sí"
+        print("✅ Secuencia impar: reintentos con espera creciente")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_dataloader_merges_ring():
+    root = tempfile.mkdtemp()
+    try:
+        loader = DataLoader(root)
+        idx = pd.date_range('2025-01-01', periods=60, freq='min', tz='UTC', name='Datetime')
+        ltf = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0, 'RSI': 50.0}, index=idx)
+        live = pd.DataFrame({'Open': 2.0, 'High': 2.0, 'Low': 2.0, 'Close': 2.0, 'Volume': 2.0},
+                            index=pd.date_range(idx[-2], periods=4, freq='min', tz='UTC', name='Datetime'))
+        loader.update_live_cache(live)
+        merged = loader._merge_live_data(ltf)
+        assert len(merged) == 62 and merged.index.is_monotonic_increasing, "❌ Merge del buffer live"
+        assert (merged['Close'].iloc[-4:] == 2.0).all() and merged['Close'].iloc[-5] == 1.0, "❌ Prioridad del live"
+        assert loader.get_stats()['live_ring']['candles'] == 4, "❌ Stats del buffer live"
+        print("✅ DataLoader mezcla el buffer live sólo sobre la cola del LTF")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_ring_wraps_and_overwrites()
+        test_recovers_after_interrupted_write()
+        test_reader_never_sees_torn_candle()
+        test_dataloader_merges_ring()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test de la caché de DataLoader.load_historical_data.
+Sin cambios en disco se sirve de memoria (hit); cualquier escritura del
+almacén o del live JSON se detecta en la siguiente llamada (miss).
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import DataLoader as dl_module
+from DataLoader import DataLoader
+
+
+def _candles(n, freq='h'):
+    idx = pd.date_range('2025-01-01', periods=n, freq=freq, tz='UTC', name='Datetime')
+    close = 3000 + np.arange(n, dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                         'Close': close, 'Volume': np.ones(n)}, index=idx)
+
+
+def test_cache_follows_file_changes():
+    root = tempfile.mkdtemp()
+    try:
+        loader = DataLoader(root)
+        loader.save_to_parquet(_candles(200), _candles(60, 'min'), update_mode="full")
+        DataLoader.invalidate_cache()
+        stats = dl_module.cache_stats
+        hits, misses = stats['hits'], stats['misses']
+
+        htf, ltf = loader.load_historical_data()
+        htf['Extra'] = 1.0                                   # no debe contaminar la caché
+        htf2, _ = DataLoader(root).load_historical_data()
+        assert (stats['hits'] - hits, stats['misses'] - misses) == (1, 1), "❌ Segunda carga debería ser hit"
+        assert 'Extra' not in htf2.columns, "❌ La caché devolvió el objeto modificado"
+        print("✅ Sin cambios en disco: hit sin E/S")
+
+        loader.save_to_parquet(_candles(201), _candles(60, 'min'), update_mode="incremental")
+        htf3, _ = loader.load_historical_data()
+        assert len(htf3) == 201 and stats['misses'] - misses == 2, "❌ Escritura del almacén no detectada"
+        print("✅ Escritura del almacén detectada al instante")
+
+        with open(loader.live_json, 'w') as f:
+            json.dump([{'Datetime': int(pd.Timestamp('2025-01-01 01:00', tz='UTC').timestamp() * 1000),
+                        'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}], f)
+        _, ltf4 = loader.load_historical_data()
+        assert stats['misses'] - misses == 3 and len(ltf4) == 61, "❌ Cambio del live JSON no detectado"
+        assert DataLoader.cache_info()['hit_ratio'] > 0, "❌ hit_ratio"
+        print(f"✅ Live JSON detectado | {DataLoader.cache_info()['hits']} hits / {DataLoader.cache_info()['misses']} misses")
+    finally:
+        DataLoader.invalidate_cache()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_cache_follows_file_changes()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
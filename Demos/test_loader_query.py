@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test de las lecturas parciales de DataLoader.query / CandleStore.tail.
+Verifica que cola, rango y columnas coincidan con la carga completa y que
+la cola sólo abra los últimos grupos de filas de la última partición.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from DataLoader import DataLoader
+
+
+def _candles(n, freq='h', seed=3):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-01', periods=n, freq=freq, tz='UTC', name='Datetime')
+    close = 3000 + np.cumsum(rng.normal(0, 5, n))
+    return pd.DataFrame({'Open': close, 'High': close + 2, 'Low': close - 2, 'Close': close,
+                         'Volume': rng.uniform(1, 10, n), 'ADX': rng.uniform(10, 40, n),
+                         'RSI': rng.uniform(0, 100, n),
+                         'Market_Regime': np.where(np.arange(n) % 3, 'trend', 'range')}, index=idx)
+
+
+def test_query_pushdown():
+    root = tempfile.mkdtemp()
+    try:
+        loader = DataLoader(root)
+        htf = _candles(24 * 400)                               # ~13 particiones mensuales
+        loader.htf_store.write(htf, rewrite=True)              # sin publicar caché compartida
+        store = loader.htf_store
+
+        last = loader.query("HTF", columns=['ADX', 'Market_Regime', 'Missing'], tail=1)
+        assert list(last.columns) == ['ADX', 'Market_Regime'], f"❌ Columnas: {list(last.columns)}"
+        assert last.index[0] == htf.index[-1] and last['ADX'].iloc[0] == htf['ADX'].iloc[-1], "❌ Última vela"
+        assert store.stats['partitions'] == 1 and store.stats['row_groups'] == 1, f"❌ E/S de la cola: {store.stats}"
+        print(f"✅ Última vela: {store.stats['rows']} filas leídas de {len(htf)}")
+
+        tail = loader.query("HTF", columns=['Low', 'High'], tail=800)   # cruza particiones
+        pd.testing.assert_frame_equal(tail, htf[['Low', 'High']].iloc[-800:], check_freq=False)
+        print("✅ Cola que cruza particiones idéntica a la carga completa")
+
+        before = dict(store.stats)
+        start, end = htf.index[5000], htf.index[5100]
+        window = loader.query("HTF", columns=['Close'], start=start, end=end)
+        pd.testing.assert_frame_equal(window, htf[['Close']].loc[start:end], check_freq=False)
+        assert store.stats['rows'] - before['rows'] < 24 * 31, f"❌ Rango leyó demasiadas filas: {store.stats}"
+        print(f"✅ Rango filtrado en el lector ({store.stats['rows'] - before['rows']} filas)")
+
+        loader.publish_shared("HTF", htf)
+        shared = loader.query("HTF", columns=['RSI'], tail=75)
+        assert np.array_equal(shared['RSI'].to_numpy(), htf['RSI'].iloc[-75:].to_numpy()), "❌ Cola desde la caché compartida"
+        print("✅ Cola servida desde la caché compartida")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_ltf_query_includes_live():
+    root = tempfile.mkdtemp()
+    try:
+        loader = DataLoader(root)
+        ltf = _candles(600, freq='min')
+        loader.ltf_store.write(ltf, rewrite=True)
+        live = ltf[['Open', 'High', 'Low', 'Close', 'Volume']].iloc[-2:].copy()
+        live.index = live.index + pd.Timedelta(minutes=2)
+        loader.update_live_cache(live)
+
+        last = loader.query("LTF", columns=['Close'], tail=3)
+        assert list(last.index) == [ltf.index[-1], *live.index], "❌ Velas live no incluidas"
+        without = loader.query("LTF", columns=['Close'], tail=3, live=False)
+        assert without.index[-1] == ltf.index[-1], "❌ live=False debería ignorar el buffer"
+        print("✅ LTF: cola con velas live")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_query_pushdown()
+        test_ltf_query_includes_live()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
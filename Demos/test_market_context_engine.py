@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test del contexto de mercado incremental (MarketContextEngine).
+Verifica que el snapshot coincida con el cálculo completo sobre todo el HTF
+(BB, squeeze, DI, ADX, EMAs, volumen), que cada vela nueva se procese en O(1)
+y que la corrección de la vela en curso no acumule error; y que un relleno de
+huecos anterior a la última vela reconstruya el estado.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import IndicatorKernels
+from DataEth import calculate_indicators
+from MarketContextEngine import MarketContextEngine
+
+
+def _htf(n=900, seed=8):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2025-01-01', periods=n, freq='h', tz='UTC', name='Datetime')
+    close = 3000 + np.cumsum(rng.normal(0, 8, n))
+    open_ = close + rng.normal(0, 2, n)
+    return pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close) + rng.uniform(0, 5, n),
+                         'Low': np.minimum(open_, close) - rng.uniform(0, 5, n), 'Close': close,
+                         'Volume': rng.uniform(1, 100, n)}, index=idx)
+
+
+def _full_context(df):
+    """Valores de referencia recalculados sobre todo el DataFrame (cálculo anterior)."""
+    close = df['Close'].to_numpy(dtype=float)
+    mid = IndicatorKernels.rolling_mean(close, 20)
+    std = IndicatorKernels.rolling_std(close, 20)
+    widths = (mid + 2 * std) - (mid - 2 * std)
+    adx, di_pos, di_neg = IndicatorKernels.adx(df['High'].to_numpy(float), df['Low'].to_numpy(float), close, 14)
+    vol = df['Volume']
+    return {
+        'bb_upper': mid[-1] + 2 * std[-1],
+        'bb_lower': mid[-1] - 2 * std[-1],
+        'squeeze': widths[-1] / np.nanmean(widths[-min(100, len(df)):]) * 100,
+        'ema200': df['Close'].ewm(span=200, adjust=False).mean().iloc[-1],
+        'vol_ratio': vol.tail(3).mean() / vol.tail(30).mean(),
+        'adx': adx[-1], 'di_plus': di_pos[-1], 'di_minus': di_neg[-1],
+    }
+
+
+def _check(ctx, ref, where):
+    assert abs(ctx['bb_upper'] - ref['bb_upper']) <= 0.006, f"❌ BB superior {where}"
+    assert abs(ctx['bb_lower'] - ref['bb_lower']) <= 0.006, f"❌ BB inferior {where}"
+    assert abs(ctx['squeeze_pct'] - ref['squeeze']) <= 0.051, f"❌ Squeeze {where}"
+    assert abs(ctx['ema200'] - ref['ema200']) <= 0.006, f"❌ EMA200 {where}"
+    assert abs(ctx['vol_ratio'] - ref['vol_ratio']) <= 0.006, f"❌ Ratio de volumen {where}"
+    assert abs(ctx['adx'] - ref['adx']) <= 0.051, f"❌ ADX {where}"
+    assert abs(ctx['di_plus'] - ref['di_plus']) <= 0.051, f"❌ DI+ {where}"
+    assert abs(ctx['di_minus'] - ref['di_minus']) <= 0.051, f"❌ DI- {where}"
+
+
+def test_incremental_matches_full():
+    data = _htf()
+    engine = MarketContextEngine()
+    assert engine.update(data.iloc[:600]) == 600, "❌ Primera carga"
+    for end in range(601, len(data) + 1):
+        frame = data.iloc[:end]
+        assert engine.update(frame) == 1, "❌ Cada vela nueva debería procesarse sola"
+        _check(engine.snapshot(float(frame['Close'].iloc[-1])), _full_context(frame), f"en vela {end}")
+    assert engine.update(data) == 0, "❌ Sin velas nuevas no debería procesar nada"
+    print(f"✅ {len(data) - 600} velas incrementales == cálculo completo")
+
+    revised = data.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] += 40        # Vela HTF en curso actualizada
+    revised.iloc[-1, revised.columns.get_loc('High')] += 45
+    assert engine.update(revised) == 1, "❌ Corrección de la última vela"
+    _check(engine.snapshot(float(revised['Close'].iloc[-1])), _full_context(revised), "tras corregir")
+    print("✅ Corrección de la vela en curso sin recálculo completo")
+
+    closed = revised.copy()                                          # Refetch: corrige la vela recién cerrada
+    closed.iloc[-2, closed.columns.get_loc('Volume')] *= 3
+    closed.iloc[-2, closed.columns.get_loc('Low')] -= 30
+    assert engine.update(closed) == 2, "❌ Debe reprocesar desde la penúltima vela corregida"
+    _check(engine.snapshot(float(closed['Close'].iloc[-1])), _full_context(closed), "tras corregir la penúltima")
+    print("✅ Corrección de velas cerradas recientes sin recálculo completo")
+
+    shifted = closed.iloc[100:]                                       # Ventana recortada por el inicio
+    assert engine.update(shifted) == 0, "❌ Recorte por el inicio no debería reprocesar"
+    assert len(engine.seen) == len(shifted), "❌ Los timestamps procesados deben limitarse a la ventana"
+
+
+def test_gap_fill_rebuilds():
+    data = _htf()
+    gapped = data.drop(data.index[300:312])                          # 12 velas sin descargar
+    engine = MarketContextEngine()
+    engine.update(gapped.iloc[:-1])
+    assert engine.update(data) == len(data), "❌ Un hueco rellenado debe reconstruir el estado"
+    _check(engine.snapshot(float(data['Close'].iloc[-1])), _full_context(data), "tras rellenar el hueco")
+    assert engine.update(data) == 0, "❌ Sin cambios tras la reconstrucción"
+
+    trimmed = data.iloc[50:].drop(data.index[700])                   # Vela borrada (misma última vela)
+    assert engine.update(trimmed) == len(trimmed), "❌ Una vela eliminada debe reconstruir el estado"
+    _check(engine.snapshot(float(trimmed['Close'].iloc[-1])), _full_context(trimmed), "tras borrar una vela")
+    print("✅ Relleno de huecos / velas borradas detectados: estado reconstruido")
+
+
+def test_precomputed_columns_preferred():
+    data = calculate_indicators(_htf(400))
+    engine = MarketContextEngine()
+    engine.update(data)
+    last = data.iloc[-1]
+    ctx = engine.snapshot(float(last['Close']))
+    assert ctx['ema200'] == round(float(last['EMA_200']), 2), "❌ EMA_200 pre-calculada"
+    assert ctx['vol_ratio'] == round(float(last['Volume_Ratio']), 2), "❌ Volume_Ratio pre-calculado"
+    assert ctx['adx'] == round(float(last['ADX']), 1), "❌ ADX pre-calculado"
+    assert ctx['state'] in ('squeeze', 'breakout_up', 'breakout_down', 'ranging', 'choppy'), "❌ Estado"
+
+    short = MarketContextEngine()
+    short.update(data.iloc[:10])
+    assert short.snapshot(3000.0)['bb_upper'] is None, "❌ Con <20 velas debe devolver el contexto vacío"
+    print(f"✅ Columnas pre-calculadas priorizadas (estado {ctx['state']}, bias {ctx['bias']})")
+
+
+if __name__ == '__main__':
+    try:
+        test_incremental_matches_full()
+        test_gap_fill_rebuilds()
+        test_precomputed_columns_preferred()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -21,6 +21,7 @@ import DataEth
 DataEth.ATTEMPT_COOLDOWN_HOURS = 24
 DataEth.MAX_ATTEMPTS_PER_RANGE = 3
 
+from MissingRanges import MissingRangeIndex
 from DataEth import _load_missing_ranges, _save_missing_ranges, _should_skip_range, _register_missing_range, _clear_missing_range
 
 REPORTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Reports')
@@ -28,6 +29,7 @@ MISSING_FILE = os.path.join(REPORTS, 'missing_ranges.json')
 
 def cleanup():
     """Limpiar archivo de test previo"""
+    DataEth.flush_missing_ranges()
     if os.path.exists(MISSING_FILE):
         # Hacer backup
         backup = MISSING_FILE + '.bak'
@@ -36,6 +38,8 @@ def cleanup():
 
 def restore():
     """Restaurar backup si existe"""
+    # Escribir antes los cambios pendientes del test para que no pisen el backup al salir
+    DataEth.flush_missing_ranges()
     backup = MISSING_FILE + '.bak'
     if os.path.exists(backup):
         os.rename(backup, MISSING_FILE)
@@ -108,6 +112,33 @@ def test_missing_ranges():
     assert key2 not in missing_after, "❌ Rango no eliminado"
     print("✅ Test 5 PASADO: Rango limpiado correctamente")
 
+    # Test 6: Tramos desplazados o solapados con uno permanente también se saltan
+    print("\n--- Test 6: Consulta por solapamiento ---")
+    inner_s, inner_e = start + timedelta(hours=1), end - timedelta(hours=1)
+    skip, reason = _should_skip_range(inner_s, inner_e)
+    assert skip and "max_attempts" in reason, f"❌ Sub-rango no detectado: {reason}"
+    skip, _ = _should_skip_range(start + timedelta(hours=2), end + timedelta(hours=3))
+    assert not skip, "❌ Un rango sólo cubierto en parte no debe saltarse"
+    print("✅ Test 6 PASADO: Sub-rango saltado, rango parcial permitido")
+
+    # Test 7: Fusión de tramos adyacentes (tools/manage_missing_ranges.py merge)
+    print("\n--- Test 7: Fusión de tramos adyacentes ---")
+    index = MissingRangeIndex.from_entries(_load_missing_ranges())
+    index.register(end - timedelta(hours=1), end + timedelta(hours=2))           # Solapa con el permanente
+    assert index.merge_adjacent(tolerance_seconds=3600) == 1, "❌ Tramos solapados no fusionados"
+    merged = index.as_dict()
+    assert list(merged) == [f"{start.isoformat()}->{(end + timedelta(hours=2)).isoformat()}"], f"❌ Fusión incorrecta: {list(merged)}"
+    assert merged[list(merged)[0]]['attempts'] == 3, "❌ Solapados: la fusión debe conservar el máximo de intentos"
+
+    index.register(end + timedelta(hours=3), end + timedelta(hours=6))           # Separado por 1h sin intentar
+    assert index.merge_adjacent() == 0, "❌ Sin tolerancia no se une un hueco"
+    assert index.merge_adjacent(tolerance_seconds=3600) == 1, "❌ Tramos separados por la tolerancia no fusionados"
+    bridged = list(index.as_dict().values())[0]
+    assert bridged['end'] == (end + timedelta(hours=6)).isoformat(), f"❌ Fusión con hueco incorrecta: {bridged}"
+    assert bridged['attempts'] == 0 and bridged['last_attempt'] is None, \
+        f"❌ Un tramo que une horas nunca intentadas no puede quedar permanente: {bridged}"
+    print("✅ Test 7 PASADO: Solapados conservan intentos; los que unen un hueco vuelven a 0")
+
     # Mostrar contenido final
     print("\n--- Contenido final de missing_ranges.json ---")
     final = _load_missing_ranges()
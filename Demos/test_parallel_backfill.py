@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test del recálculo de indicadores por bloques (ParallelBackfill).
+Verifica que el resultado cosido coincida con calculate_indicators en serie
+dentro de tolerancia, que el OBV continúe entre bloques y que el informe de
+costuras detecte un calentamiento insuficiente.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from DataEth import calculate_indicators
+from ParallelBackfill import SEAM_ATOL, SEAM_RTOL, backfill_indicators, backfill_report
+
+
+def _htf(n=24 * 1000, seed=21):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2022-01-01', periods=n, freq='h', tz='UTC', name='Datetime')
+    close = 3000 + np.cumsum(rng.normal(0, 8, n))
+    open_ = close + rng.normal(0, 2, n)
+    return pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close) + rng.uniform(0, 5, n),
+                         'Low': np.minimum(open_, close) - rng.uniform(0, 5, n), 'Close': close,
+                         'Volume': rng.uniform(1, 100, n)}, index=idx)
+
+
+def test_backfill_matches_serial():
+    data = _htf()
+    serial = calculate_indicators(data)
+    parallel = backfill_indicators(data, workers=3, chunk_rows=6000)
+
+    assert backfill_report['chunks'] == 4 and len(backfill_report['seams']) == 3, f"❌ Bloques: {backfill_report}"
+    assert backfill_report['ok'], f"❌ Costuras: {backfill_report['seams']}"
+    assert parallel.index.equals(serial.index), "❌ Índice cosido distinto"
+    assert list(parallel.columns) == list(serial.columns), "❌ Columnas distintas"
+    for col in serial.columns:
+        if col == 'Market_Regime':
+            assert (parallel[col] == serial[col]).all(), "❌ Market_Regime distinto"
+        else:
+            assert np.allclose(parallel[col], serial[col], rtol=SEAM_RTOL, atol=SEAM_ATOL), f"❌ {col} distinto"
+    print(f"✅ 4 bloques en paralelo == serie (costuras: "
+          f"{max(s['max_abs_diff'] for s in backfill_report['seams']):.2e})")
+
+    short = backfill_indicators(data.iloc[:500], workers=4)
+    assert backfill_report['chunks'] == 1, "❌ Histórico corto debería ir en serie"
+    pd.testing.assert_frame_equal(short, calculate_indicators(data.iloc[:500]))
+    print("✅ Histórico corto calculado en serie")
+
+
+def test_short_warmup_detected():
+    data = _htf(n=24 * 400)
+    backfill_indicators(data, workers=2, chunk_rows=4800, warmup=50)
+    bad = [s for s in backfill_report['seams'] if s['mismatched']]
+    assert not backfill_report['ok'] and bad, "❌ Calentamiento insuficiente no detectado"
+    assert 'EMA_200' in bad[0]['mismatched'], f"❌ Columnas fuera de tolerancia: {bad[0]['mismatched']}"
+    print(f"✅ Costura con calentamiento corto detectada ({bad[0]['mismatched']})")
+
+
+if __name__ == '__main__':
+    try:
+        test_backfill_matches_serial()
+        test_short_warmup_detected()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
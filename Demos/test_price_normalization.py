@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test de la normalización vectorizada de precios (DataEth.normalize_prices).
+Compara contra la conversión celda a celda original (_extract_price) con
+precios numéricos, strings y dicts bid/ask legados de Capital.com.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from DataEth import normalize_prices
+
+
+def _extract_price(x):
+    """Conversión por celda previa a la vectorización (referencia)."""
+    if isinstance(x, dict):
+        bid = x.get('bid')
+        ask = x.get('ask')
+        if bid is not None and ask is not None:
+            try:
+                return (float(bid) + float(ask)) / 2.0
+            except Exception:
+                return np.nan
+        for k in ('close', 'price', 'last'):
+            if k in x:
+                try:
+                    return float(x.get(k))
+                except Exception:
+                    return np.nan
+        return np.nan
+    try:
+        return float(x)
+    except Exception:
+        return np.nan
+
+
+def test_numeric_columns_pass_through():
+    data = pd.DataFrame({'Close': [1.0, 2.0], 'Open': [1.5, 2.5], 'Volume': [3, 4]})
+    assert normalize_prices(data) is data, "❌ Columnas float64 no deberían copiarse"
+    ints = normalize_prices(pd.DataFrame({'Close': [1, 2]}))
+    assert ints['Close'].dtype == np.float64, "❌ Enteros deberían pasar a float64"
+    print("✅ Columnas numéricas sin recorrer celda a celda")
+
+
+def test_mixed_object_column_matches_per_cell():
+    cells = [
+        {'bid': 10.0, 'ask': 12.0},
+        {'bid': '1.5', 'ask': '2.5'},
+        {'bid': 'x', 'ask': 1.0},
+        {'bid': 1.0},
+        {'bid': 1.0, 'ask': None, 'price': 7.0},
+        {'close': None, 'price': 5.0},
+        {'last': '9.25'},
+        {'other': 1.0},
+        {},
+        3.5, '4.25', 'abc', None, 7,
+    ]
+    data = pd.DataFrame({'Close': pd.Series(cells, dtype=object), 'High': [1.0] * len(cells)})
+    got = normalize_prices(data)
+    expected = np.array([_extract_price(c) for c in cells])
+    assert got['Close'].dtype == np.float64, "❌ Close debería quedar en float64"
+    assert np.array_equal(got['Close'].to_numpy(), expected, equal_nan=True), "❌ Difiere de _extract_price"
+    assert data['Close'].dtype == object, "❌ El DataFrame de entrada no debe modificarse"
+    print("✅ Dicts bid/ask y escalares convertidos en bloque igual que _extract_price")
+
+
+if __name__ == '__main__':
+    try:
+        test_numeric_columns_pass_through()
+        test_mixed_object_column_matches_per_cell()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
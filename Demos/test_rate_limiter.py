@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test del token bucket por host (RateLimiter).
+Verifica que la ráfaga no espere, que el exceso espere sólo lo justo y que
+un 429 bloquee el host, y que `http` use una sesión por hilo con los mismos
+buckets.
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from RateLimiter import RateLimiter, ThreadLocalHttp, TokenBucket
+
+
+def test_burst_then_wait():
+    bucket = TokenBucket(rate=10.0, capacity=5)
+    waits = [bucket.reserve() for _ in range(5)]
+    assert all(w == 0 for w in waits), f"❌ La ráfaga no debería esperar: {waits}"
+    wait = bucket.reserve()
+    assert 0.09 <= wait <= 0.11, f"❌ Espera incorrecta tras agotar la ráfaga: {wait:.3f}s"
+    print(f"✅ Ráfaga de 5 sin espera, la 6ª espera {wait:.3f}s")
+
+
+def test_hosts_are_independent():
+    limiter = RateLimiter({'a.example': (1.0, 1), 'b.example': (1.0, 1)})
+    assert limiter.acquire("https://a.example/x") == 0
+    assert limiter.bucket('a.example').reserve() > 0, "❌ a.example debería estar agotado"
+    assert limiter.acquire("https://b.example/y") == 0, "❌ b.example no comparte cuota con a.example"
+    print("✅ Un bucket por host")
+
+
+def test_penalize_blocks_host():
+    limiter = RateLimiter({'c.example': (100.0, 100)})
+    limiter.penalize("https://c.example/z", 2.0)
+    wait = limiter.bucket('c.example').reserve()
+    assert 1.9 <= wait <= 2.0, f"❌ El 429 debería bloquear ~2s: {wait:.3f}s"
+    print(f"✅ 429 bloquea el host {wait:.2f}s")
+
+
+def test_session_per_thread():
+    limiter = RateLimiter({'d.example': (1.0, 1)})
+    http = ThreadLocalHttp(limiter)
+    main = http.session()
+    assert http.session() is main, "❌ El mismo hilo debería reutilizar su sesión"
+    others = []
+    threads = [threading.Thread(target=lambda: others.append(http.session())) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(s) for s in others + [main]}) == 4, "❌ Cada hilo necesita su propia requests.Session"
+    assert all(s.limiter is limiter for s in others), "❌ Las sesiones deben compartir el RateLimiter"
+    print("✅ Una sesión HTTP por hilo sobre los mismos buckets")
+
+
+if __name__ == '__main__':
+    try:
+        test_burst_then_wait()
+        test_hosts_are_independent()
+        test_penalize_blocks_host()
+        test_session_per_thread()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
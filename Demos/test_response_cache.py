@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test de la caché de respuestas de proveedores (ResponseCache, sin red).
+Verifica que un bloque cerrado se descargue una sola vez, que un rango
+desplazado se sirva desde disco, que el bloque abierto no se guarde y que
+el modo offline nunca llame al proveedor; y que segmentos vecinos
+descargados a la vez no pidan dos veces el bloque que comparten.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ApiProviders import BinanceAdapter
+from ResponseCache import ResponseCache
+
+
+class FakeBinance(BinanceAdapter):
+    """Binance simulado: genera una vela por hora y cuenta las descargas."""
+    def __init__(self, latency=0.0):
+        self.calls = []
+        self.latency = latency
+
+    def fetch_range(self, start, end, interval):
+        self.calls.append((start, end))
+        time.sleep(self.latency)
+        idx = pd.date_range(start, end, freq='h', name='Datetime')
+        close = idx.asi8 // 10**9 / 3600.0
+        return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1.0}, index=idx)
+
+
+def test_closed_blocks_are_served_from_disk():
+    with tempfile.TemporaryDirectory() as root:
+        adapter = FakeBinance()
+        cache = ResponseCache(root=root, offline=False)
+        start = pd.Timestamp('2025-03-05 07:00', tz='UTC')
+        end = start + pd.Timedelta(hours=200)
+
+        first = cache.fetch(adapter, start, end, 'HOUR')
+        assert len(first) == 201 and first.index[0] == start and first.index[-1] == end, f"❌ Rango incorrecto: {len(first)}"
+        downloads = len(adapter.calls)
+
+        shifted = cache.fetch(adapter, start + pd.Timedelta(hours=13), end - pd.Timedelta(hours=5), 'HOUR')
+        assert len(adapter.calls) == downloads, "❌ El rango desplazado no debería tocar el proveedor"
+        pd.testing.assert_frame_equal(shifted, first.loc[shifted.index[0]:shifted.index[-1]])
+        assert cache.stats['hits'] >= 1 and cache.stats['stored'] == downloads
+        print(f"✅ {downloads} bloque(s) descargados una vez; rango desplazado servido desde disco")
+
+        offline = ResponseCache(root=root, offline=True)
+        replay = offline.fetch(adapter, start, end, 'HOUR')
+        assert len(adapter.calls) == downloads, "❌ El modo offline llamó al proveedor"
+        pd.testing.assert_frame_equal(replay, first)
+        assert offline.fetch(adapter, start - pd.Timedelta(days=400), start, 'HOUR') is None, "❌ Falta de caché offline debe retornar None"
+        print("✅ Replay offline idéntico y sin red")
+
+
+def test_open_block_is_not_cached():
+    with tempfile.TemporaryDirectory() as root:
+        adapter = FakeBinance()
+        cache = ResponseCache(root=root, offline=False)
+        end = pd.Timestamp.now(tz='UTC').floor('h')
+        df = cache.fetch(adapter, end - pd.Timedelta(hours=3), end, 'HOUR')
+        assert len(df) == 4, f"❌ Velas recientes incorrectas: {len(df)}"
+        cache.fetch(adapter, end - pd.Timedelta(hours=3), end, 'HOUR')
+        assert cache.stats['bypass'] == 2, f"❌ El bloque abierto debería descargarse siempre: {cache.stats}"
+        print("✅ Bloque abierto descargado directo, sin guardarse")
+
+
+def test_concurrent_segments_share_blocks():
+    with tempfile.TemporaryDirectory() as root:
+        adapter = FakeBinance(latency=0.05)
+        cache = ResponseCache(root=root, offline=False)
+        start = pd.Timestamp('2025-03-05 07:00', tz='UTC')
+        # Segmentos de 30 días como split_range: no alineados a los bloques de la caché
+        segments = [(start + pd.Timedelta(days=30 * i), start + pd.Timedelta(days=30 * (i + 1))) for i in range(4)]
+        barrier = threading.Barrier(len(segments))
+        results = [None] * len(segments)
+
+        def worker(i):
+            barrier.wait()
+            results[i] = cache.fetch(adapter, *segments[i], 'HOUR')
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(segments))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        repeated = {block: n for block, n in Counter(adapter.calls).items() if n > 1}
+        assert not repeated, f"❌ Bloques descargados más de una vez: {repeated}"
+        assert len(adapter.calls) == len(cache.blocks(int(start.timestamp()), int(segments[-1][1].timestamp()), 'HOUR'))
+        for (lo, hi), df in zip(segments, results):
+            assert df.index[0] == lo and df.index[-1] == hi and len(df) == (hi - lo) // pd.Timedelta(hours=1) + 1, \
+                f"❌ Segmento incompleto {lo} → {hi}"
+        assert not cache._inflight, "❌ Locks de bloque sin liberar"
+        print(f"✅ {len(segments)} segmentos concurrentes: {len(adapter.calls)} bloques descargados una vez cada uno")
+
+
+if __name__ == '__main__':
+    try:
+        test_closed_blocks_are_served_from_disk()
+        test_open_block_is_not_cached()
+        test_concurrent_segments_share_blocks()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test de la descarga concurrente de segmentos en DataEth.
+Reemplaza las APIs por generadores sintéticos (sin red) y verifica:
+1. Salida idéntica a la descarga secuencial (orden + deduplicado)
+2. Respeto del límite de peticiones simultáneas por proveedor
+3. Reparto de segmentos entre las 3 APIs
+4. Circuit breaker del router de APIs (los huecos vacíos no lo abren)
+"""
+import os
+import sys
+import time
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import DataEth
+
+_real_sleep = time.sleep
+_lock = threading.Lock()
+_active = {'binance': 0, 'kraken': 0, 'cryptocompare': 0}
+_peak = {'binance': 0, 'kraken': 0, 'cryptocompare': 0}
+_calls = {'binance': 0, 'kraken': 0, 'cryptocompare': 0}
+
+
+def _fake_provider(name):
+    def _download(start_date, end_date, interval='HOUR'):
+        with _lock:
+            _active[name] += 1
+            _calls[name] += 1
+            _peak[name] = max(_peak[name], _active[name])
+        try:
+            _real_sleep(0.01)
+            freq = 'h' if interval == 'HOUR' else 'min'
+            idx = pd.date_range(start_date, end_date, freq=freq, tz='UTC', name='Datetime')
+            close = idx.asi8 / 1e9 / 3600.0
+            return pd.DataFrame({
+                'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1.0
+            }, index=idx)
+        finally:
+            with _lock:
+                _active[name] -= 1
+    return _download
+
+
+def _serial_reference(start, end):
+    """Reproduce la descarga secuencial original (una API, un segmento a la vez)."""
+    records = []
+    current = start
+    while current < end:
+        seg_end = min(current + timedelta(days=30), end)
+        records.extend(_fake_provider('binance')(current, seg_end, 'HOUR').reset_index().to_dict('records'))
+        current = seg_end
+    df = pd.DataFrame(records)
+    df['Datetime'] = pd.to_datetime(df['Datetime'], utc=True)
+    df.set_index('Datetime', inplace=True)
+    df.sort_index(inplace=True)
+    return df[~df.index.duplicated(keep='last')]
+
+
+def test_parallel_segments():
+    print("\n" + "=" * 60)
+    print("TEST: Descarga concurrente de segmentos")
+    print("=" * 60 + "\n")
+
+    originals = (DataEth.download_binance, DataEth.download_kraken, DataEth.download_cryptocompare, DataEth.time.sleep)
+    DataEth.download_binance = _fake_provider('binance')
+    DataEth.download_kraken = _fake_provider('kraken')
+    DataEth.download_cryptocompare = _fake_provider('cryptocompare')
+    DataEth.time.sleep = lambda s: None
+    try:
+        start = datetime(2025, 1, 1, tzinfo=pytz.UTC)
+        end = start + timedelta(days=365)
+        htf, ltf = DataEth.download_data_capital('ETHUSD', 'HOUR', start, end)
+
+        expected = _serial_reference(start, end)
+        assert ltf.empty, "❌ HOUR no debería devolver LTF"
+        assert htf.index.is_monotonic_increasing, "❌ Segmentos fuera de orden"
+        assert not htf.index.duplicated().any(), "❌ Timestamps duplicados"
+        pd.testing.assert_frame_equal(htf, expected, check_freq=False)
+        print(f"✅ Salida idéntica a la secuencial: {len(htf)} velas")
+
+        for api, limit in DataEth.PROVIDER_CONCURRENCY.items():
+            assert _peak[api] <= limit, f"❌ {api}: {_peak[api]} peticiones simultáneas > {limit}"
+        print(f"✅ Límite por proveedor respetado: {_peak}")
+
+        # Kraken sólo sirve las últimas 720 velas: este rango histórico no le corresponde
+        assert _calls['binance'] > 0 and _calls['cryptocompare'] > 0, f"❌ Segmentos no repartidos: {_calls}"
+        assert _calls['kraken'] == 0, f"❌ Kraken no puede servir rangos antiguos: {_calls}"
+        print(f"✅ Segmentos repartidos entre APIs: {_calls}")
+    finally:
+        (DataEth.download_binance, DataEth.download_kraken,
+         DataEth.download_cryptocompare, DataEth.time.sleep) = originals
+
+
+def test_router_circuit_breaker():
+    print("\n--- Router: circuit breaker ---")
+    router = DataEth.ProviderRouter()
+    for _ in range(DataEth.CIRCUIT_FAILURE_THRESHOLD):
+        api = router.choose(exclude={'kraken', 'cryptocompare'})
+        assert api == 'binance', f"❌ Se esperaba binance, llegó {api}"
+        router.record(api, 0.1, None)
+
+    stats = router.get_stats()
+    assert stats['binance']['state'] == 'open', "❌ El circuito de binance debería estar abierto"
+    assert stats['binance']['errors'] == DataEth.CIRCUIT_FAILURE_THRESHOLD, "❌ Errores mal contados"
+    assert router.choose(exclude={'kraken', 'cryptocompare'}) is None, "❌ No debería reintentar binance"
+
+    api = router.choose()
+    assert api in ('kraken', 'cryptocompare'), f"❌ Debería elegir un proveedor sano, eligió {api}"
+    router.record(api, 0.2, pd.DataFrame({'Close': [1.0]}))
+    assert router.get_stats()[api]['latency_s'] == 0.2, "❌ Latencia no registrada"
+    print(f"✅ Circuito abierto para binance, tráfico desviado a {api}")
+
+
+def test_empty_gap_keeps_circuits_closed():
+    print("\n--- Router: hueco sin datos en todas las APIs ---")
+    empty = lambda start_date, end_date, interval='HOUR': pd.DataFrame(
+        columns=['Open', 'High', 'Low', 'Close', 'Volume'], index=pd.DatetimeIndex([], tz='UTC', name='Datetime'))
+    originals = (DataEth.download_binance, DataEth.download_kraken, DataEth.download_cryptocompare, DataEth.api_router)
+    DataEth.download_binance = DataEth.download_kraken = DataEth.download_cryptocompare = empty
+    DataEth.api_router = router = DataEth.ProviderRouter()
+    try:
+        end = datetime.now(pytz.UTC).replace(minute=0, second=0, microsecond=0)
+        for _ in range(2 * DataEth.CIRCUIT_FAILURE_THRESHOLD):
+            assert DataEth.download_with_rotation(end - timedelta(hours=6), end) is None, "❌ El hueco no tiene datos"
+
+        stats = router.get_stats()
+        for api, h in stats.items():
+            assert h['state'] == 'closed', f"❌ Respuestas vacías abrieron el circuito de {api}"
+            assert h['errors'] == 0 and h['empty'] == h['requests'] > 0, f"❌ Vacías mal contadas en {api}: {h}"
+            assert h['empty_rate'] > 0, f"❌ empty_rate de {api} sin actualizar"
+
+        router.record('binance', 0.1, None)
+        healthy = router.choose(exclude={'binance'})
+        router.record(healthy, 0.1, pd.DataFrame({'Close': [1.0]}))
+        assert router.get_stats()[healthy]['score'] < router.get_stats()['binance']['score'], \
+            "❌ empty_rate/errores deben seguir contando en el ranking"
+        print(f"✅ {2 * DataEth.CIRCUIT_FAILURE_THRESHOLD} huecos vacíos: circuitos cerrados, empty_rate {stats['binance']['empty_rate']}")
+    finally:
+        (DataEth.download_binance, DataEth.download_kraken,
+         DataEth.download_cryptocompare, DataEth.api_router) = originals
+
+
+if __name__ == '__main__':
+    try:
+        test_parallel_segments()
+        test_router_circuit_breaker()
+        test_empty_gap_keeps_circuits_closed()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test del generador vectorizado de señales (SignalEngine).
+Compara señal, score, bias y código de razón con EthStrategy.detect_trend
+en filas muestreadas (HTF + LTF y mismo frame) y comprueba que el HTF de
+cada fila no mire al futuro.
+"""
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from DataEth import calculate_indicators
+from SignalEngine import DEFAULT_BOUNCE_ZONE_PCT, REASON_CODES, generate_signals, load_bounce_zone_pct
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from EthStrategy import Strategia, capital_ops
+
+# Texto de detect_trend que corresponde a cada código (donde difiere de REASON_CODES)
+LIVE_TEXT = {
+    'DATOS_INSUFICIENTES': ('insuficiente', 'Se requieren'),
+    'ADX_BAJO': ('ADX demasiado bajo', 'ADX bajo ('),
+}
+
+
+def _candles(n, freq, seed, start='2025-01-01'):
+    """Paseo aleatorio con tramos de tendencia para cubrir las distintas reglas."""
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n, freq=freq, tz='UTC', name='Datetime')
+    drift = np.repeat(rng.choice([-6., -2., 0., 2., 6.], size=n // 60 + 1), 60)[:n]
+    close = 3000 + np.cumsum(rng.normal(drift, 12, n))
+    open_ = close - rng.normal(drift, 4, n)
+    return pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close) + rng.uniform(0, 8, n),
+                         'Low': np.minimum(open_, close) - rng.uniform(0, 8, n), 'Close': close,
+                         'Volume': rng.lognormal(3, 0.6, n)}, index=idx)
+
+
+def _live(strategy, htf, ltf):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = strategy.detect_trend(htf, ltf)
+    return {
+        'signal': result['signal'].split()[0],
+        'score': result.get('confianza_score', 0),
+        'market_bias': result.get('market_bias'),
+        'reason': result['reason'],
+    }
+
+
+def _compare(htf, ltf, signals, rows, positions):
+    # detect_trend lee el umbral de zona de rebote de cycle_context.json
+    assert load_bounce_zone_pct() == DEFAULT_BOUNCE_ZONE_PCT, "❌ cycle_context.json altera el umbral por defecto"
+    with contextlib.redirect_stdout(io.StringIO()):
+        strategy = Strategia(capital_ops)
+    mismatches = []
+    for i in rows:
+        expected = _live(strategy, htf.iloc[:positions[i] + 1], ltf.iloc[:i + 1])
+        got = signals.iloc[i]
+        texts = LIVE_TEXT.get(got['reason_code'], (REASON_CODES[got['reason_code']],))
+        if (got['signal'] != expected['signal'] or int(got['score']) != expected['score']
+                or got['market_bias'] != expected['market_bias']
+                or not any(t in expected['reason'] for t in texts)):
+            mismatches.append((i, dict(got), expected))
+    return mismatches
+
+
+def test_matches_detect_trend_htf_ltf():
+    htf = calculate_indicators(_candles(1500, 'h', seed=3))
+    ltf = calculate_indicators(_candles(5200, '15min', seed=5, start='2025-01-03'))
+    signals = generate_signals(htf, ltf, bounce_zone_pct=DEFAULT_BOUNCE_ZONE_PCT)
+    assert signals.index.equals(ltf.index), "❌ El resultado debe seguir el índice LTF"
+
+    positions = htf.index.searchsorted(ltf.index, side='right') - 1
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(np.arange(1, len(ltf)), size=500, replace=False))
+    mismatches = _compare(htf, ltf, signals, rows, positions)
+    assert not mismatches, f"❌ {len(mismatches)} diferencias con detect_trend, p. ej. {mismatches[0]}"
+
+    sampled = signals.iloc[rows]
+    assert {'BUY', 'SELL', 'HOLD'} <= set(sampled['signal']), f"❌ Muestra sin todas las señales: {sampled['signal'].value_counts()}"
+    assert sampled['reason_code'].nunique() >= 6, f"❌ Pocas reglas cubiertas: {sampled['reason_code'].value_counts()}"
+    print(f"✅ {len(rows)} filas == detect_trend (HTF + LTF); razones: {sampled['reason_code'].value_counts().to_dict()}")
+
+
+def test_matches_detect_trend_same_frame():
+    data = calculate_indicators(_candles(2500, 'h', seed=11))
+    signals = generate_signals(data)
+    rows = np.r_[0:8, np.random.default_rng(1).choice(np.arange(8, len(data)), size=300, replace=False)]
+    mismatches = _compare(data, data, signals, np.sort(rows), np.arange(len(data)))
+    assert not mismatches, f"❌ {len(mismatches)} diferencias en modo mismo frame, p. ej. {mismatches[0]}"
+    assert (signals['reason_code'].iloc[:5] == 'DATOS_INSUFICIENTES').all(), "❌ <6 velas HTF deben ser HOLD"
+    print(f"✅ {len(rows)} filas == detect_trend (mismo frame); señales: {signals['signal'].value_counts().to_dict()}")
+
+
+def test_no_lookahead():
+    htf = calculate_indicators(_candles(800, 'h', seed=7))
+    ltf = calculate_indicators(_candles(2400, '15min', seed=9, start='2025-01-05'))
+    full = generate_signals(htf, ltf, bounce_zone_pct=DEFAULT_BOUNCE_ZONE_PCT)
+    cut = ltf.index[1500]
+    partial = generate_signals(htf[htf.index <= cut], ltf.iloc[:1501], bounce_zone_pct=DEFAULT_BOUNCE_ZONE_PCT)
+    pd.testing.assert_frame_equal(partial, full.iloc[:1501])
+    print("✅ Las velas futuras no alteran las señales pasadas")
+
+
+if __name__ == '__main__':
+    try:
+        test_matches_detect_trend_htf_ltf()
+        test_matches_detect_trend_same_frame()
+        test_no_lookahead()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test del mantenimiento en streaming del almacén (StoreMaintenance).
+Verifica que un almacén sano pase limpio y que se detecten y reparen
+duplicados, desorden, invariantes OHLC, indicadores alterados y huérfanos
+sin tener más de una partición en memoria; y que una reescritura no pise el
+relleno de huecos que otro proceso hace en la misma partición.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from CandleSchema import apply_schema
+from DataEth import calculate_indicators
+from DataLoader import DataLoader
+from StoreMaintenance import maintain_store, run_maintenance
+
+
+def _htf(n=24 * 150, seed=11):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2025-01-01', periods=n, freq='h', tz='UTC', name='Datetime')
+    close = 3000 + np.cumsum(rng.normal(0, 8, n))
+    open_ = close + rng.normal(0, 2, n)
+    frame = pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close) + rng.uniform(0, 5, n),
+                          'Low': np.minimum(open_, close) - rng.uniform(0, 5, n), 'Close': close,
+                          'Volume': rng.uniform(1, 100, n)}, index=idx)
+    return apply_schema(calculate_indicators(frame))
+
+
+def _overwrite(store, name, frame):
+    """Reescribe una partición saltándose las comprobaciones (simula datos heredados)."""
+    manifest = store.load_manifest()
+    manifest['partitions'][name] = store._write_partition(name, frame)
+    store._save_manifest(manifest)
+
+
+def test_clean_store_passes():
+    root = tempfile.mkdtemp()
+    try:
+        DataLoader(root).htf_store.write(_htf(), rewrite=True)
+        report = run_maintenance(root, warmup=500)
+        htf = report['datasets']['HTF']
+        assert report['ok'], f"❌ Almacén sano con incidencias: {htf['indicators']['columns']}"
+        assert htf['max_partition_rows'] <= 31 * 24, "❌ Más de una partición en memoria"
+        assert htf['indicators']['columns']['RSI']['checked'] == len(_htf()) - 500, "❌ Velas verificadas"
+        assert not htf['rewritten_partitions'], "❌ No debería reescribir nada"
+        print(f"✅ Almacén sano: {htf['rows']} velas verificadas partición a partición")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_detects_and_repairs():
+    root = tempfile.mkdtemp()
+    try:
+        data = _htf()
+        store = DataLoader(root).htf_store
+        store.write(data, rewrite=True)
+
+        feb = data.loc['2025-02']
+        _overwrite(store, '2025-02', pd.concat([feb.iloc[100:], feb.iloc[:110]]))   # 10 duplicados + desorden
+        mar = data.loc['2025-03'].copy()
+        mar.iloc[5, mar.columns.get_loc('Open')] = mar['High'].iloc[5] + 1           # Apertura por encima del máximo
+        mar.iloc[50, mar.columns.get_loc('RSI')] += 20                               # Indicador alterado
+        _overwrite(store, '2025-03', mar)
+        orphan = os.path.join(store.root, '2024-12.parquet.tmp')
+        open(orphan, 'w').close()
+        os.utime(orphan, (time.time() - 7200, time.time() - 7200))
+
+        dry = run_maintenance(root, dry_run=True, warmup=500)['datasets']['HTF']
+        assert dry['duplicates_removed'] == 10 and dry['unsorted_partitions'] == ['2025-02'], "❌ Duplicados/desorden"
+        assert not dry['rewritten_partitions'] and os.path.exists(orphan), "❌ dry-run no debe tocar nada"
+
+        report = run_maintenance(root, warmup=500)
+        htf = report['datasets']['HTF']
+        assert not report['ok'], "❌ Debería informar incidencias"
+        assert htf['ohlc_violations'] == {'high_below_body': 1}, f"❌ OHLC: {htf['ohlc_violations']}"
+        assert htf['indicators']['columns']['RSI']['mismatches'] == 1, "❌ Indicador alterado no detectado"
+        assert htf['indicators']['mismatches'] == 1, f"❌ Falsos positivos: {htf['indicators']['columns']}"
+        assert [r['partition'] for r in htf['rewritten_partitions']] == ['2025-02'], "❌ Partición no reparada"
+        assert htf['orphans_removed'] == ['2024-12.parquet.tmp'] and not os.path.exists(orphan), "❌ Huérfano"
+        expected = pd.concat([data.loc[:'2025-02'], mar, data.loc['2025-04':]])   # Marzo se informa, no se toca
+        pd.testing.assert_frame_equal(store.read(), expected, check_freq=False)
+        print("✅ Duplicados, desorden y huérfanos reparados; OHLC e indicadores informados")
+
+        again = run_maintenance(root, warmup=500)['datasets']['HTF']
+        assert again['duplicates_removed'] == 0 and not again['rewritten_partitions'], "❌ No es idempotente"
+        print("✅ Segunda pasada sin cambios")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+GAP_FILLER = """
+import sys
+sys.path.insert(0, {here!r})
+import pandas as pd
+from CandleStore import CandleStore
+gap = pd.read_pickle({gap!r})
+print('ready', flush=True)
+CandleStore({root!r}, partition={partition!r}).append(gap)
+"""
+
+
+def test_rewrite_waits_for_concurrent_gap_fill():
+    root = tempfile.mkdtemp()
+    try:
+        data = _htf()
+        store = DataLoader(root).htf_store
+        store.write(data, rewrite=True)
+        feb = data.loc['2025-02']
+        gap = feb.iloc[[200]]
+        _overwrite(store, '2025-02', pd.concat([feb.iloc[:200], feb.iloc[201:], feb.iloc[:5]]))  # Hueco + duplicados
+        gap_path = os.path.join(root, 'gap.pkl')
+        gap.to_pickle(gap_path)
+
+        # Mientras maintain_store reescribe febrero, otro proceso rellena el hueco de esa partición
+        write_partition, filler = store._write_partition, []
+        def racing_write(name, frame):
+            if name == '2025-02' and not filler:
+                script = GAP_FILLER.format(here=os.path.dirname(os.path.abspath(__file__)), gap=gap_path,
+                                           root=store.root, partition=store.partition)
+                filler.append(subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, text=True))
+                assert filler[0].stdout.readline().strip() == 'ready', "❌ El proceso de relleno no arrancó"
+                time.sleep(1.0)   # Sin lock entre procesos el relleno terminaría aquí y se perdería
+            return write_partition(name, frame)
+        store._write_partition = racing_write
+
+        report = maintain_store(store, warmup=500)
+        assert [r['partition'] for r in report['rewritten_partitions']] == ['2025-02'], "❌ Febrero no reescrito"
+        assert filler and filler[0].wait(timeout=120) == 0, "❌ El proceso de relleno falló"
+
+        del store._write_partition
+        manifest = store.load_manifest()
+        assert manifest['partitions']['2025-02']['rows'] == len(feb), "❌ El relleno del hueco se perdió"
+        pd.testing.assert_frame_equal(store.read(), data, check_freq=False)
+        print("✅ La reescritura de mantenimiento y el relleno de otro proceso se serializan")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_clean_store_passes()
+        test_detects_and_repairs()
+        test_rewrite_waits_for_concurrent_gap_fill()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
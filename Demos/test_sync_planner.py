@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test del planificador de sincronización incremental (DataEth.plan_sync).
+Verifica que sólo se planifiquen huecos reales y la cola desde la última vela.
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from DataEth import plan_sync, merge_candles
+
+
+def test_plan_sync():
+    print("\n" + "=" * 60)
+    print("TEST: Planificador de huecos contra el store")
+    print("=" * 60 + "\n")
+
+    start = pd.Timestamp('2025-01-01 00:00', tz='UTC')
+    end = pd.Timestamp('2025-01-10 12:30', tz='UTC')
+    full = pd.date_range(start, pd.Timestamp('2025-01-10 10:00', tz='UTC'), freq='h')
+
+    # Store completo: sólo la cola
+    plan = plan_sync(full, start, end, 'HOUR')
+    assert plan == [(full[-1], end, 'tail')], f"❌ Plan inesperado: {plan}"
+    print("✅ Store completo → sólo cola")
+
+    # Dos huecos internos y cabecera faltante
+    holes = full.delete(list(range(0, 5)) + list(range(50, 53)) + [100])
+    plan = plan_sync(holes, start, end, 'HOUR')
+    kinds = [k for _, _, k in plan]
+    assert kinds == ['head', 'gap', 'gap', 'tail'], f"❌ Tipos inesperados: {kinds}"
+    assert plan[1][:2] == (full[49], full[53]), f"❌ Hueco 1 incorrecto: {plan[1]}"
+    assert plan[2][:2] == (full[99], full[101]), f"❌ Hueco 2 incorrecto: {plan[2]}"
+    print(f"✅ Huecos detectados: {len(plan) - 1} + cola")
+
+    # Store vacío: todo el rango
+    plan = plan_sync(pd.DatetimeIndex([]), start, end, 'HOUR')
+    assert plan == [(start, end, 'tail')], f"❌ Plan inesperado: {plan}"
+    print("✅ Store vacío → rango completo")
+
+
+def test_merge_candles():
+    idx = pd.date_range('2025-01-01', periods=5, freq='h', tz='UTC', name='Datetime')
+    existing = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0, 'RSI': 50.0}, index=idx)
+    fresh = pd.DataFrame({'Open': 2.0, 'High': 2.0, 'Low': 2.0, 'Close': 2.0, 'Volume': 2.0}, index=idx[3:].append(idx[-1:] + pd.Timedelta(hours=1)))
+
+    merged = merge_candles(existing, fresh, start_date=idx[1])
+    assert list(merged.columns) == ['Open', 'High', 'Low', 'Close', 'Volume'], "❌ Columnas no OHLCV"
+    assert len(merged) == 5 and merged.index[0] == idx[1], "❌ Recorte incorrecto"
+    assert merged['Close'].tolist() == [1.0, 1.0, 2.0, 2.0, 2.0], "❌ Las velas nuevas deben ganar"
+    print("✅ Merge: velas nuevas prevalecen y se recorta la ventana")
+
+
+if __name__ == '__main__':
+    try:
+        test_plan_sync()
+        test_merge_candles()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test de las vistas multi-temporalidad (TimeframeViews).
+Verifica que la EMA200 diaria y las barras 4H/1W coincidan con remuestrear
+todo el HTF en cada llamada, que el estado sólo avance al cerrar barras y
+que rellenar un hueco interior reconstruya las vistas.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from TimeframeViews import TimeframeViews, resample_bars
+
+
+def _htf(n=24 * 260, seed=4):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2025-01-01 03:00', periods=n, freq='h', tz='UTC', name='Datetime')
+    close = 3000 + np.cumsum(rng.normal(0, 8, n))
+    open_ = close + rng.normal(0, 2, n)
+    return pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close) + rng.uniform(0, 5, n),
+                         'Low': np.minimum(open_, close) - rng.uniform(0, 5, n), 'Close': close,
+                         'Volume': rng.uniform(1, 100, n)}, index=idx)
+
+
+def test_daily_ema200_matches_resample():
+    data = _htf()
+    views = TimeframeViews()
+    checked = 0
+    for end in range(24 * 205, len(data) + 1, 7):
+        frame = data.iloc[:end]
+        assert views.update(frame), "❌ HTF nuevo no procesado"
+        daily_close = frame['Close'].resample('1D').last().dropna()
+        daily = views.get('1D')
+        assert daily['bars'] == len(daily_close), f"❌ Barras diarias en vela {end}"
+        assert daily['Close'] == daily_close.iloc[-1], f"❌ Cierre diario en vela {end}"
+        expected = daily_close.ewm(span=200, adjust=False).mean().iloc[-1]
+        assert abs(daily['EMA_200'] - expected) < 1e-9, f"❌ EMA200 diaria en vela {end}"
+        checked += 1
+    views.update(data)
+    assert not views.update(data), "❌ Sin cambios no debería recalcular"
+    assert views.views['1D'].refreshes == len(data.resample('1D').last()) - 1, "❌ Barras cerradas incorporadas"
+    print(f"✅ EMA200 diaria == resample completo en {checked} puntos")
+
+    refreshes = views.views['1D'].refreshes
+    revised = data.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] += 25        # Vela HTF en curso corregida
+    assert views.update(revised), "❌ Corrección de la última vela no detectada"
+    expected = revised['Close'].resample('1D').last().dropna().ewm(span=200, adjust=False).mean().iloc[-1]
+    assert abs(views.get('1D')['EMA_200'] - expected) < 1e-9, "❌ EMA200 tras corregir la vela en curso"
+    assert views.views['1D'].refreshes == refreshes, "❌ No debería reprocesar días cerrados"
+    print("✅ Vela en curso corregida sin reprocesar días cerrados")
+
+
+def test_interior_gap_fill_rebuilds():
+    data = _htf()
+    gapped = data.drop(data.index[24 * 100:24 * 103 + 5])            # 3 días sin descargar
+    views = TimeframeViews()
+    views.update(gapped.iloc[:-2])
+    refreshes = views.views['1D'].refreshes
+    assert views.update(data), "❌ HTF con el hueco rellenado no procesado"
+    daily_close = data['Close'].resample('1D').last().dropna()
+    daily = views.get('1D')
+    assert daily['bars'] == len(daily_close), "❌ Barras diarias tras rellenar el hueco"
+    expected = daily_close.ewm(span=200, adjust=False).mean().iloc[-1]
+    assert abs(daily['EMA_200'] - expected) < 1e-9, f"❌ EMA200 diaria desviada {daily['EMA_200'] - expected:+.4f}"
+    assert views.views['1D'].refreshes > refreshes, "❌ Las vistas debían reconstruirse"
+
+    refreshes = views.views['1D'].refreshes
+    views.update(data.iloc[24 * 30:].copy())                           # Ventana recortada por el inicio
+    assert views.views['1D'].refreshes == refreshes, "❌ Recortar el inicio no debe reconstruir"
+    print("✅ Hueco interior rellenado: EMA200 diaria == resample completo")
+
+
+def test_4h_and_weekly_bars():
+    data = _htf(n=24 * 120)
+    views = TimeframeViews()
+    views.update(data.iloc[:-30])
+    views.update(data)
+    for name, rule in (('4H', '4h'), ('1W', 'W-MON')):
+        bars = resample_bars(data, rule)
+        view = views.get(name)
+        assert view['bar_start'] == bars.index[-1], f"❌ Inicio de barra {name}"
+        for col in ('Open', 'High', 'Low', 'Close'):
+            assert view[col] == bars[col].iloc[-1], f"❌ {col} {name}"
+        assert abs(view['Volume'] - bars['Volume'].iloc[-1]) < 1e-6, f"❌ Volumen {name}"
+        assert abs(view['EMA_20'] - bars['Close'].ewm(span=20, adjust=False).mean().iloc[-1]) < 1e-9, f"❌ EMA_20 {name}"
+    assert views.get('1W')['bar_start'].day_name() == 'Monday', "❌ Semanas deben empezar en lunes"
+
+    fields = views.context_fields(float(data['Close'].iloc[-1]))
+    assert 'trend_4h' in fields and 'ema200_daily' not in fields, f"❌ Campos de contexto: {fields}"
+    print(f"✅ Barras 4H/1W == resample completo; contexto: {fields}")
+
+
+if __name__ == '__main__':
+    try:
+        test_daily_ema200_matches_resample()
+        test_interior_gap_fill_rebuilds()
+        test_4h_and_weekly_bars()
+        print("\n✅ TODOS LOS TESTS PASARON\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FALLÓ: {e}\n")
+        sys.exit(1)
@@ -9,6 +9,9 @@ import json
 from datetime import datetime
 import pytz
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MissingRanges import MissingRangeIndex
+
 REPORTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Reports')
 MISSING_FILE = os.path.join(REPORTS, 'missing_ranges.json')
 
@@ -19,9 +22,10 @@ def load():
         return json.load(f)
 
 def save(m):
-    os.makedirs(REPORTS, exist_ok=True)
-    with open(MISSING_FILE, 'w') as f:
-        json.dump(m, f, indent=2, default=str)
+    """Escritura atómica (tmp + os.replace) para no corromper el archivo si el bot lo lee"""
+    index = MissingRangeIndex(MISSING_FILE)
+    index.replace(m)
+    index.flush()
 
 def show():
     """Muestra todos los rangos registrados"""
@@ -123,6 +127,29 @@ def stats():
     for reason, count in sorted(by_reason.items()):
         print(f"  {reason}: {count} rango(s)")
 
+def compact():
+    """Elimina rangos duplicados o contenidos dentro de otro rango"""
+    index = MissingRangeIndex(MISSING_FILE)
+    before = len(index.as_dict())
+    removed = index.merge_adjacent(contained_only=True)
+    if not removed:
+        print(f"✅ Nada que compactar ({before} rango(s))")
+        return
+    index.flush()
+    print(f"✅ Compactado: {before} → {before - removed} rango(s) ({removed} contenidos en otros)")
+
+def merge(gap_hours=1.0):
+    """Fusiona rangos solapados o separados por <= gap_hours horas (los que unen un hueco vuelven a 0 intentos)"""
+    index = MissingRangeIndex(MISSING_FILE)
+    before = len(index.as_dict())
+    removed = index.merge_adjacent(tolerance_seconds=gap_hours * 3600)
+    if not removed:
+        print(f"✅ No hay rangos adyacentes (tolerancia {gap_hours}h, {before} rango(s))")
+        return
+    index.flush()
+    print(f"✅ Fusionados: {before} → {before - removed} rango(s) (tolerancia {gap_hours}h; "
+          f"los tramos que unen un hueco vuelven a 0 intentos)")
+
 def help_menu():
     print("""
 🛠️  Utilidad de gestión de missing_ranges.json
@@ -135,12 +162,16 @@ Comandos:
   clear-all     Limpiar todos los rangos
   clear-maxed   Limpiar solo rangos con max attempts (>=3)
   reset         Resetear contador de intentos a 0
+  compact       Eliminar rangos duplicados o contenidos en otro
+  merge [h]     Fusionar rangos solapados o separados por <= h horas (default 1;
+                los que unen un hueco se reintentan desde 0 intentos)
   help          Mostrar este mensaje
 
 Ejemplos:
   python3 tools/manage_missing_ranges.py show
   python3 tools/manage_missing_ranges.py stats
   python3 tools/manage_missing_ranges.py clear-maxed
+  python3 tools/manage_missing_ranges.py merge 2
 """)
 
 if __name__ == '__main__':
@@ -160,6 +191,10 @@ if __name__ == '__main__':
         clear_maxed()
     elif cmd == 'reset':
         reset_attempts()
+    elif cmd == 'compact':
+        compact()
+    elif cmd == 'merge':
+        merge(float(sys.argv[2]) if len(sys.argv) > 2 else 1.0)
     elif cmd == 'help':
         help_menu()
     else:
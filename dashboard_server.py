@@ -22,6 +22,7 @@ try:
     ETHSESSION_AVAILABLE = True
 except ImportError:
     ETHSESSION_AVAILABLE = False
+from ContextBus import context_bus  # market_context.json vigilado (sólo se reparsea si cambia)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DEMOS_DIR = os.path.join(BASE_DIR, "Demos")  # EthBoy escribe sus datos aquí
@@ -29,6 +30,7 @@ PORT = 8765
 DEBT_RATE_PER_HOUR = 0.01 / 24.0  # $ flat por posición por hora (sync con Evaluador.py)
 
 DASHBOARD_HTML = os.path.join(BASE_DIR, "dashboard.html")
+CANDLES_DIR = os.path.join(DEMOS_DIR, "Reports", "candles")  # Almacén Parquet (manifest.json por timeframe)
 
 # 🔹 INSTANCIA GLOBAL DE CAPITAL_OPS
 # Se inicializa una sola vez al arrancar el servidor
@@ -623,12 +625,57 @@ def parse_funds_csv():
     }
 
 
+def _manifest_health(timeframe, now):
+    """Resumen de un dataset de velas desde su manifest.json (no abre Parquet)."""
+    path = os.path.join(CANDLES_DIR, timeframe.lower(), "manifest.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception:
+        return {"exists": False}
+    partitions = manifest.get("partitions", {})
+    names = sorted(partitions)
+    last = manifest.get("last") or (partitions[names[-1]]["last"] if names else None)
+    age_minutes = None
+    if last:
+        try:
+            age_minutes = round((now - datetime.fromisoformat(last)).total_seconds() / 60, 1)
+        except ValueError:
+            pass
+    return {
+        "exists": True,
+        "rows": manifest.get("rows", sum(p.get("rows", 0) for p in partitions.values())),
+        "oldest": manifest.get("first") or (partitions[names[0]]["first"] if names else None),
+        "newest": last,
+        "age_minutes": age_minutes,
+        "partitions": len(names),
+        "size_mb": round(manifest.get("bytes", 0) / 1024 / 1024, 2),
+        "columns": len(manifest.get("columns") or []),
+        "indicator_version": manifest.get("indicator_version"),
+        "version": manifest.get("version"),
+        "updated": manifest.get("updated"),
+    }
+
+
+def build_data_health():
+    """Salud de los datos: manifiestos HTF/LTF + última ejecución de DataEth."""
+    now = datetime.now(timezone.utc)
+    runs = read_json("dataeth_health.json")
+    last_run = runs[-1] if isinstance(runs, list) and runs else None
+    return {
+        "timestamp": now.isoformat(),
+        "htf": _manifest_health("HTF", now),
+        "ltf": _manifest_health("LTF", now),
+        "last_run": last_run,
+    }
+
+
 def build_capital_protection():
     """Construye el estado del sistema de protección de capital."""
     capital = read_json("capital_state.json")
     cooldown = read_json("eth_trade_cooldown.json")
     positions = read_json("last_seen_positions.json")
-    mctx = read_json("market_context.json")
+    mctx = context_bus.data("market_context", {})
 
     # Datos de capital
     balance_total = 0
@@ -903,8 +950,14 @@ class Handler(http.server.BaseHTTPRequestHandler):
             data = build_growth_data()
             self._json_response(data)
         elif self.path == "/api/market_context":
-            data = read_json("market_context.json")
+            data = context_bus.data("market_context", {})
+            self._json_response(data or {})
+        elif self.path == "/api/data_providers":
+            data = read_json("api_router_stats.json")
             self._json_response(data or {})
+        elif self.path == "/api/data_health":
+            data = build_data_health()
+            self._json_response(data)
         elif self.path == "/api/capital_protection":
             data = build_capital_protection()
             self._json_response(data)